@@ -1,15 +1,130 @@
 from pydantic_settings import BaseSettings
 from dotenv import load_dotenv
-from typing import List, Union
+from typing import Dict, List, Union
 from pydantic import validator
 import os
+import tempfile
+import json
 
 load_dotenv()
 
 class Settings(BaseSettings):
    
     GEMINI_API_KEY : str = os.environ.get("GEMINI_API_KEY")
-    
+    # Connection pool of the shared Gemini client (one per worker process)
+    GEMINI_MAX_CONNECTIONS: int = int(os.environ.get("GEMINI_MAX_CONNECTIONS", 100))
+    GEMINI_MAX_KEEPALIVE_CONNECTIONS: int = int(os.environ.get("GEMINI_MAX_KEEPALIVE_CONNECTIONS", 20))
+    GEMINI_KEEPALIVE_EXPIRY: float = float(os.environ.get("GEMINI_KEEPALIVE_EXPIRY", 60))
+
+    # LLM response cache: in-process LRU/TTL tier and optional Mongo tier
+    LLM_CACHE_ENABLED: bool = os.environ.get("LLM_CACHE_ENABLED", "true").lower() == "true"
+    LLM_CACHE_MAXSIZE: int = int(os.environ.get("LLM_CACHE_MAXSIZE", 512))
+    LLM_CACHE_TTL: int = int(os.environ.get("LLM_CACHE_TTL", 6 * 60 * 60))
+    LLM_CACHE_PERSISTENT: bool = os.environ.get("LLM_CACHE_PERSISTENT", "false").lower() == "true"
+    LLM_CACHE_PERSISTENT_TTL: int = int(os.environ.get("LLM_CACHE_PERSISTENT_TTL", 7 * 24 * 60 * 60))
+    LLM_CACHE_COLLECTION: str = os.environ.get("LLM_CACHE_COLLECTION", "llm_cache")
+
+    # LLM scheduler budgets per worker process (0 disables the RPM/TPM limit)
+    LLM_MAX_CONCURRENCY: int = int(os.environ.get("LLM_MAX_CONCURRENCY", 32))
+    LLM_RPM: int = int(os.environ.get("LLM_RPM", 150))
+    LLM_TPM: int = int(os.environ.get("LLM_TPM", 2000000))
+    LLM_BACKGROUND_RESERVE: float = float(os.environ.get("LLM_BACKGROUND_RESERVE", 0.2))
+    LLM_OUTPUT_TOKEN_ESTIMATE: int = int(os.environ.get("LLM_OUTPUT_TOKEN_ESTIMATE", 2048))
+    LLM_MEDIA_TOKEN_ESTIMATE: int = int(os.environ.get("LLM_MEDIA_TOKEN_ESTIMATE", 2000))
+
+    # LLM resilience: per-task policy overrides as JSON, e.g. {"resume_match": {"timeout": 45, "hedge": false}}
+    LLM_POLICIES: Dict[str, dict] = json.loads(os.environ.get("LLM_POLICIES", "{}"))
+    LLM_BREAKER_FAILURE_THRESHOLD: int = int(os.environ.get("LLM_BREAKER_FAILURE_THRESHOLD", 5))
+    LLM_BREAKER_RESET_TIMEOUT: float = float(os.environ.get("LLM_BREAKER_RESET_TIMEOUT", 30))
+
+    # Per-task model routing. thinking_budget None keeps the model default (0 disables thinking on
+    # Flash models). fallback_model is used when the primary times out, is over quota or its
+    # circuit is open. LLM_TASK_ROUTE_OVERRIDES (JSON) overrides fields per task.
+    LLM_DEFAULT_MODEL: str = os.environ.get("LLM_DEFAULT_MODEL", "gemini-2.5-pro")
+    LLM_TASK_ROUTES: Dict[str, dict] = {
+        "resume_match": {"model": "gemini-2.5-pro", "thinking_budget": None, "fallback_model": "gemini-2.5-flash"},
+        "mcq_generation": {"model": "gemini-2.5-flash", "thinking_budget": 0, "fallback_model": "gemini-2.5-flash-lite"},
+        "coding_questions": {"model": "gemini-2.5-pro", "thinking_budget": 2048, "fallback_model": "gemini-2.5-flash"},
+        "text_questions": {"model": "gemini-2.5-flash", "thinking_budget": 1024, "fallback_model": "gemini-2.5-flash-lite"},
+        "transcription": {"model": "gemini-2.5-flash", "thinking_budget": 0, "fallback_model": "gemini-2.5-flash-lite"},
+        "answer_scoring": {"model": "gemini-2.5-flash", "thinking_budget": 512, "fallback_model": "gemini-2.5-flash-lite"},
+        "answer_analysis": {"model": "gemini-2.5-pro", "thinking_budget": 1024, "fallback_model": "gemini-2.5-flash"},
+        "fused_questions": {"model": "gemini-2.5-pro", "thinking_budget": 2048, "fallback_model": "gemini-2.5-flash"},
+    }
+    LLM_TASK_ROUTE_OVERRIDES: Dict[str, dict] = json.loads(os.environ.get("LLM_TASK_ROUTE_OVERRIDES", "{}"))
+
+    # Generate MCQ, coding and text questions in one structured call instead of three
+    QUIZ_FUSED_GENERATION: bool = os.environ.get("QUIZ_FUSED_GENERATION", "false").lower() == "true"
+
+    # Quiz readiness notifications (long-poll / SSE); Redis pub/sub reaches other workers when available
+    QUIZ_WAIT_TIMEOUT: int = int(os.environ.get("QUIZ_WAIT_TIMEOUT", 30))
+    QUIZ_WAIT_MAX: int = int(os.environ.get("QUIZ_WAIT_MAX", 60))
+    QUIZ_STREAM_TIMEOUT: int = int(os.environ.get("QUIZ_STREAM_TIMEOUT", 300))
+    QUIZ_STREAM_HEARTBEAT: int = int(os.environ.get("QUIZ_STREAM_HEARTBEAT", 15))
+    EVENTS_POLL_INTERVAL: float = float(os.environ.get("EVENTS_POLL_INTERVAL", 2.0))
+    EVENTS_REDIS_ENABLED: bool = os.environ.get("EVENTS_REDIS_ENABLED", "true").lower() == "true"
+
+    # Background jobs: "asyncio" runs them in the API worker, "celery" sends them to the questions queue
+    JOB_EXECUTOR: str = os.environ.get("JOB_EXECUTOR", "asyncio")
+    JOB_MAX_CONCURRENCY: int = int(os.environ.get("JOB_MAX_CONCURRENCY", 8))
+    JOB_MAX_ATTEMPTS: int = int(os.environ.get("JOB_MAX_ATTEMPTS", 3))
+    JOB_RETRY_BACKOFF: float = float(os.environ.get("JOB_RETRY_BACKOFF", 10))
+    JOB_HEARTBEAT_INTERVAL: int = int(os.environ.get("JOB_HEARTBEAT_INTERVAL", 30))
+    JOB_STALE_AFTER: int = int(os.environ.get("JOB_STALE_AFTER", 120))
+    CELERY_WORKER_CONCURRENCY: int = int(os.environ.get("CELERY_WORKER_CONCURRENCY", 32))
+    CELERY_RESULT_BACKEND: str = os.environ.get("CELERY_RESULT_BACKEND", "")
+    # Split quiz generation into one Celery subtask per section plus an aggregation step (needs a result backend)
+    CELERY_QUIZ_FANOUT: bool = os.environ.get("CELERY_QUIZ_FANOUT", "false").lower() == "true"
+    CELERY_SECTION_MAX_RETRIES: int = int(os.environ.get("CELERY_SECTION_MAX_RETRIES", 2))
+
+    # Answer transcription: clips up to this size are sent inline, larger ones via the Files API
+    TRANSCRIBE_INLINE_MAX_BYTES: int = int(os.environ.get("TRANSCRIBE_INLINE_MAX_BYTES", 14 * 1024 * 1024))
+    TRANSCRIBE_CONCURRENCY: int = int(os.environ.get("TRANSCRIBE_CONCURRENCY", 5))
+    # Transcripts cached by audio content hash and model; retention applies to the Mongo tier
+    TRANSCRIPT_CACHE_ENABLED: bool = os.environ.get("TRANSCRIPT_CACHE_ENABLED", "true").lower() == "true"
+    TRANSCRIPT_CACHE_MAXSIZE: int = int(os.environ.get("TRANSCRIPT_CACHE_MAXSIZE", 256))
+    TRANSCRIPT_CACHE_TTL: int = int(os.environ.get("TRANSCRIPT_CACHE_TTL", 60 * 60))
+    TRANSCRIPT_CACHE_PERSISTENT: bool = os.environ.get("TRANSCRIPT_CACHE_PERSISTENT", "true").lower() == "true"
+    TRANSCRIPT_CACHE_RETENTION: int = int(os.environ.get("TRANSCRIPT_CACHE_RETENTION", 30 * 24 * 60 * 60))
+    TRANSCRIPT_CACHE_COLLECTION: str = os.environ.get("TRANSCRIPT_CACHE_COLLECTION", "transcript_cache")
+    # How long /submit-all-answers waits for answers uploaded earlier to finish transcribing
+    ANSWER_TRANSCRIPT_WAIT: int = int(os.environ.get("ANSWER_TRANSCRIPT_WAIT", 60))
+
+    # Process pool for CPU-bound work (audio preprocessing, document parsing)
+    CPU_WORKERS: int = int(os.environ.get("CPU_WORKERS", 2))
+    DOCUMENT_WORKERS: int = int(os.environ.get("DOCUMENT_WORKERS", 2))
+
+    # Resume text extraction limits per document
+    RESUME_MAX_PAGES: int = int(os.environ.get("RESUME_MAX_PAGES", 30))
+    RESUME_EXTRACT_TIMEOUT: float = float(os.environ.get("RESUME_EXTRACT_TIMEOUT", 20))
+
+    # Upload limits, checked on the file Starlette already spooled; ZIP members are kept in memory up to UPLOAD_SPOOL_MEMORY and spooled to disk above
+    RESUME_MAX_BYTES: int = int(os.environ.get("RESUME_MAX_BYTES", 10 * 1024 * 1024))
+    AUDIO_MAX_BYTES: int = int(os.environ.get("AUDIO_MAX_BYTES", 25 * 1024 * 1024))
+    UPLOAD_SPOOL_MEMORY: int = int(os.environ.get("UPLOAD_SPOOL_MEMORY", 1024 * 1024))
+    # Any other request body (e.g. /submit-all-answers with every recording) is capped at this size
+    UPLOAD_MAX_REQUEST_BYTES: int = int(os.environ.get("UPLOAD_MAX_REQUEST_BYTES", 100 * 1024 * 1024))
+
+    # Bulk resume ingestion (/upload-bulk): request size, resumes per batch, Gemini analyses in flight, rows per bulk insert
+    BULK_MAX_BYTES: int = int(os.environ.get("BULK_MAX_BYTES", 200 * 1024 * 1024))
+    BULK_MAX_FILES: int = int(os.environ.get("BULK_MAX_FILES", 500))
+    BULK_ANALYSIS_CONCURRENCY: int = int(os.environ.get("BULK_ANALYSIS_CONCURRENCY", 8))
+    BULK_WRITE_SIZE: int = int(os.environ.get("BULK_WRITE_SIZE", 25))
+    BULK_PROGRESS_INTERVAL: float = float(os.environ.get("BULK_PROGRESS_INTERVAL", 1.0))
+    # Resumes of a batch are kept here until its job finishes; must be shared storage when Celery workers run elsewhere
+    BULK_STORAGE_DIR: str = os.environ.get("BULK_STORAGE_DIR", os.path.join(tempfile.gettempdir(), "taas-bulk"))
+
+    # Audio preprocessing before transcription: mono, resampled, silence-trimmed, re-encoded.
+    # Requires the ffmpeg binary on PATH for anything but WAV (checked and warned about at startup).
+    AUDIO_PREPROCESS_ENABLED: bool = os.environ.get("AUDIO_PREPROCESS_ENABLED", "true").lower() == "true"
+    AUDIO_SAMPLE_RATE: int = int(os.environ.get("AUDIO_SAMPLE_RATE", 16000))
+    AUDIO_VAD_THRESHOLD_DB: float = float(os.environ.get("AUDIO_VAD_THRESHOLD_DB", -45))
+    AUDIO_OPUS_BITRATE: str = os.environ.get("AUDIO_OPUS_BITRATE", "24k")
+    AUDIO_PREPROCESS_TIMEOUT: float = float(os.environ.get("AUDIO_PREPROCESS_TIMEOUT", 30))
+
+    # Startup index bootstrap from app/utils/mongo_indexes.py: "create", "verify" (log only) or "off"
+    MONGO_INDEXES: str = os.environ.get("MONGO_INDEXES", "create")
+
     MONGO_URI: str = os.environ.get("MONGO_URI")
     MONGO_DB_NAME: str = os.environ.get("MONGO_DB_NAME")
     REDIS_URL: str = os.environ.get("REDIS_URL")
@@ -2,6 +2,11 @@ import logging
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from .api import api_router
+from app.utils.audio import check_audio_tools
+from app.utils.jobs import recover_jobs
+from app.utils.mongo_indexes import bootstrap_indexes
+from app.utils.workers import shutdown_process_pool
+from app.utils.uploads import UploadLimitMiddleware, UploadTooLarge, upload_too_large_handler
 
 # Create a FastAPI instance
 app = FastAPI(
@@ -30,6 +35,10 @@ logger.addHandler(console_handler)
 
 app.include_router(api_router, prefix= "/api" )
 
+# Added before CORS so it runs inside it and 413 responses still carry CORS headers
+app.add_middleware(UploadLimitMiddleware)
+app.add_exception_handler(UploadTooLarge, upload_too_large_handler)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins= ["*"] ,
@@ -45,9 +54,16 @@ app.include_router(api_router, prefix= "/api" )
 async def startup_event():
     try:
         print( "Starting up..." )
+        check_audio_tools()
+        await bootstrap_indexes()
+        await recover_jobs()
     except Exception as e:
         print( "Error: " , e)
     
+@app.on_event( "shutdown" )
+async def shutdown_event():
+    shutdown_process_pool()
+
 @app.get( "/" )
 async def root():
     return { "status": 200, "message":"Server running" }
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field, validator , EmailStr
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 
 from app.utils.mongo import get_db
@@ -30,6 +30,13 @@ class AnalyzedData(BaseModel):
 
 
 class AddAnalyzedData(AnalyzedData):
+    # "pending" until the background pipeline of an async-mode upload stores the analysis, then "ready" or "failed"
+    resume_analysis: str = Field(default="ready")
+    quiz_sections: dict = Field(default_factory=lambda: {
+        "mcqs_questions": "pending",
+        "coding_questions": "pending",
+        "text_questions": "pending",
+    })
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
     is_deleted: bool = Field(default=False)
@@ -37,11 +44,15 @@ class AddAnalyzedData(AnalyzedData):
 
 class QuizQuestion(BaseModel):
     candidate_id: str
+    quiz_id: str
+    type: str
     question: str = Field(description="Quiz question text")
-    options: list[str] = Field(description="List of 4 options")
-    correct_answer: str = Field(description="Correct answer for the question")
+    options: Optional[list[str]] = Field(None, description="List of 4 options (MCQs only)")
+    correct_answer: Optional[str] = Field(None, description="Correct answer for the question")
 
 class AddQuizQuestions(QuizQuestion):
+    # Set on the questions of one store_quiz_section call; matches analyzed_data.quiz_claims of the run that stored them
+    generation_id: Optional[str] = Field(None)
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
     is_deleted: bool = Field(default=False)
@@ -51,4 +62,25 @@ class SingleQuizQuestion(BaseModel):
     type: str
     quiz_id: str
     candidate_uid: str
-    user_answer: str
\ No newline at end of file
+    user_answer: str
+
+class ResumeBatchItem(BaseModel):
+    index: int
+    filename: str
+    state: str = Field(default="queued")  # queued -> extracting -> analyzing -> saving -> done | duplicate | failed
+    candidate_id: Optional[str] = Field(None)
+    email: Optional[str] = Field(None)
+    error: Optional[str] = Field(None)
+
+
+class AddResumeBatch(BaseModel):
+    user_id: str
+    hr_name: Optional[str] = Field(None)
+    job_position: Optional[str] = Field(None)
+    job_description: str
+    state: str = Field(default="running")  # running -> finished
+    total: int
+    items: List[ResumeBatchItem]
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    finished_at: Optional[datetime] = Field(None)
@@ -0,0 +1,24 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Optional
+
+
+class AddJob(BaseModel):
+    kind: str
+    dedupe_key: str
+    payload: dict = Field(default_factory=dict)
+    state: str = Field(default="queued")  # queued -> running -> succeeded | failed
+    # Set only while the job is queued or running; a unique sparse index makes enqueueing idempotent.
+    active_key: Optional[str] = Field(None)
+    attempts: int = Field(default=0)
+    max_attempts: int = Field(default=3)
+    last_error: Optional[str] = Field(None)
+    worker: Optional[str] = Field(None)
+    # Earliest time a queued retry may run again (retry backoff); unset means now
+    next_run_at: Optional[datetime] = Field(None)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = Field(None)
+    heartbeat_at: Optional[datetime] = Field(None)
+    finished_at: Optional[datetime] = Field(None)
+    duration_seconds: Optional[float] = Field(None)
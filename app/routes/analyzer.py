@@ -1,25 +1,37 @@
-from fastapi import APIRouter,Depends, File, Form, UploadFile, Request, HTTPException, status, Query, Body, BackgroundTasks
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter,Depends, File, Form, UploadFile, Request, status, Query, Body, BackgroundTasks
+from fastapi.responses import JSONResponse, StreamingResponse
 from typing import List
 import os
-import tempfile
-import fitz  
+import json
+import logging
 import uuid
 import asyncio
-from app.utils.llm import analyze_resume_with_gemini, transcribe_audio, score_interview_answer, analyze_answer_with_gemini
+from app.utils.llm import analyze_resume_with_gemini, score_interview_answer, analyze_answer_with_gemini
+from app.utils.gemini import llm_stats
+from app.utils.events import notifier, quiz_topic, answers_topic, upload_topic
+from app.utils.jobs import job_service, submit_job
+from app.utils.documents import SUPPORTED_RESUME_SUFFIXES, extract_resume
+from app.utils.speech_metrics import answer_metrics, key_metrics
+from app.core.config import settings
 from app.models.analyzer import SingleQuizQuestion
-from app.utils.common import calculate_overall_score , extract_text_and_tables, convert_objectids, process_quiz_questions
+from app.utils.common import calculate_overall_score , convert_objectids, transcribe_answer_recording, transcribe_spooled, QUIZ_SECTIONS
+from app.utils.uploads import InvalidArchive, UploadRoute, UploadTooLarge, body_limit, expand_zip_upload, in_memory_uploads, spool_upload, upload_too_large_response
+from app.utils.bulk import batch_summary, fail_resume_batch, store_batch_files
 from app.services.analyzer import AnalyzerService
 from tasks import process_job_task
 from app.utils.auth import get_current_user
 from fastapi.encoders import jsonable_encoder
+from bson import ObjectId
+
 
+logger = logging.getLogger(__name__)
 
-analyze_router = APIRouter()
+analyze_router = APIRouter(route_class=UploadRoute)
 analyzer_service = AnalyzerService()
 
 
 @analyze_router.post("/upload")
+@body_limit("RESUME_MAX_BYTES")
 async def upload(
     request: Request,
     candidate_name: str = Form(...),
@@ -29,9 +41,14 @@ async def upload(
     job_position: str = Form(...),    
     job_description: str = Form(...),
     resume: UploadFile = File(...),
-    background_tasks: BackgroundTasks = BackgroundTasks(),
+    async_mode: bool = Form(False),
     current_user=Depends(get_current_user)
 ):
+    """
+    Analyze a resume against the job description and queue quiz generation. With async_mode the
+    candidate is stored right after text extraction and the request returns 202; the analysis and
+    the quiz then run as one background job, tracked by /upload-status and /upload-status/stream.
+    """
     try:
         candidate_data = await analyzer_service.get_candidate_by_email(email)
         user_id = str(current_user["_id"])
@@ -44,31 +61,34 @@ async def upload(
         
 
         suffix = os.path.splitext(resume.filename)[-1].lower()
-        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-            temp_file_path = tmp.name
-            content = await resume.read()
-            tmp.write(content)
-
-        extracted_text = ""
-
-        # Process based on file type
-        if suffix == ".pdf":
-            doc = fitz.open(temp_file_path)
-            extracted_text = "".join(page.get_text("text") for page in doc)
-            doc.close()
-
-        elif suffix == ".docx":
-            extracted_text = extract_text_and_tables(temp_file_path)
+        if suffix not in SUPPORTED_RESUME_SUFFIXES:
+            return JSONResponse(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                content={"status": False, "message": "Only PDF and DOCX resumes are supported right now."}
+            )
 
-        else:
-            os.remove(temp_file_path)
-            raise HTTPException(
-                status_code=400,
-                detail="Only PDF and DOCX resumes are supported right now."
+        # Size-checked in Starlette's spool file and parsed in the documents process pool
+        spooled = await spool_upload(resume, settings.RESUME_MAX_BYTES)
+        try:
+            extracted_text = await extract_resume(await spooled.read(), suffix)
+        except asyncio.TimeoutError:
+            return JSONResponse(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                content={"status": False, "message": "The resume took too long to process. Please upload a smaller file."}
+            )
+        except Exception as e:
+            logger.exception(f"Failed to extract resume text: {e!r}")
+            return JSONResponse(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                content={"status": False, "message": "The resume could not be read. Please upload a valid PDF or DOCX file."}
             )
+        finally:
+            spooled.close()
 
-        # Cleanup temp file
-        os.remove(temp_file_path)
+        if async_mode:
+            return await _upload_async(
+                user_id, candidate_name, email, phone, hr_name, job_position, job_description, extracted_text
+            )
 
         gemini_response = await analyze_resume_with_gemini(job_description,extracted_text)
         print(f"gemini_response: {gemini_response}")
@@ -105,7 +125,11 @@ async def upload(
         #     job_description,
         #     extracted_text
         # )
-        background_tasks.add_task(process_quiz_questions, candidate_id_str, job_description, extracted_text)
+        await submit_job("quiz_generation", candidate_id_str, {
+            "candidate_id": candidate_id_str,
+            "job_description": job_description,
+            "extracted_text": extracted_text
+        })
         input_data = {
             "candidate_id": candidate_id_str,
             "job_description": job_description,
@@ -142,6 +166,8 @@ async def upload(
             }
         )
 
+    except UploadTooLarge as e:
+        return upload_too_large_response(e)
     except Exception as e:
         import traceback
         traceback.print_exc()
@@ -153,35 +179,419 @@ async def upload(
             }
         )
     
+async def _upload_async(user_id: str, candidate_name: str, email: str, phone: str, hr_name: str,
+                        job_position: str, job_description: str, extracted_text: str) -> JSONResponse:
+    candidate_id = await analyzer_service.add_candidate_info({
+        "candidate_name": candidate_name,
+        "user_id": user_id,
+        "email": email,
+        "phone": phone,
+        "hr_name": hr_name,
+        "job_position": job_position
+    })
+    await analyzer_service.add_analyzed_data({
+        "candidate_id": candidate_id,
+        "user_id": user_id,
+        "resume_text": extracted_text,
+        "job_description": job_description,
+        "resume_analysis": "pending",
+    })
+    candidate_id_str = str(candidate_id)
+    await submit_job("resume_pipeline", candidate_id_str, {
+        "candidate_id": candidate_id_str,
+        "job_description": job_description,
+        "extracted_text": extracted_text
+    })
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content={
+            "status": True,
+            "data": {
+                "candidate_id": candidate_id_str,
+                "user_id": user_id,
+                "candidate_name": candidate_name,
+                "email": email,
+                "phone": phone,
+                "hr_name": hr_name,
+                "job_position": job_position,
+                "job_description": job_description,
+                "stages": {"resume_analysis": "pending", **{section: "pending" for section in QUIZ_SECTIONS}},
+            },
+            "message": "Resume received; analysis is running in the background"
+        }
+    )
+
+
+def _upload_stages(upload_status: dict) -> dict:
+    return {"resume_analysis": upload_status["resume_analysis"], **upload_status["sections"]}
+
+
+async def _upload_progress(candidate_uid: str):
+    """(data, complete) for /upload-status, or (None, False) if the candidate has no analyzed data."""
+    upload_status = await analyzer_service.get_upload_status(candidate_uid)
+    if upload_status is None:
+        return None, False
+    stages = _upload_stages(upload_status)
+    job = await job_service.get_latest_job("resume_pipeline", candidate_uid)
+    data = {
+        "candidate_id": candidate_uid,
+        "stages": stages,
+        "analysis": upload_status["analysis"],
+        "job": {
+            "state": job["state"],
+            "attempts": job["attempts"],
+            "last_error": job.get("last_error"),
+        } if job else None,
+    }
+    return data, all(state != "pending" for state in stages.values())
+
+
+@analyze_router.get("/upload-status")
+async def upload_status(
+    request: Request,
+    candidate_uid: str = Query(...),
+    wait: int = Query(None, ge=0),
+    current_user=Depends(get_current_user)
+):
+    """Stages of an async-mode upload. With `wait`, long-polls until every stage has finished (200) or returns 202."""
+    try:
+        if not ObjectId.is_valid(candidate_uid):
+            return JSONResponse(status_code=status.HTTP_404_NOT_FOUND, content={"status": False, "message": "Upload not found"})
+
+        async def finished():
+            data, complete = await _upload_progress(candidate_uid)
+            return data if data is None or complete else None
+
+        if wait:
+            await notifier.wait_until(upload_topic(candidate_uid), finished, min(wait, settings.QUIZ_WAIT_MAX))
+        data, complete = await _upload_progress(candidate_uid)
+        if data is None:
+            return JSONResponse(status_code=status.HTTP_404_NOT_FOUND, content={"status": False, "message": "Upload not found"})
+        return JSONResponse(
+            status_code=status.HTTP_200_OK if complete else status.HTTP_202_ACCEPTED,
+            content={
+                "status": True,
+                "data": jsonable_encoder(data),
+                "complete": complete,
+                "message": "Upload processed" if complete else "Upload is still being processed"
+            }
+        )
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return JSONResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            content={
+                "status": False,
+                "message": "Something went wrong"
+            }
+        )
+
+
+@analyze_router.get("/upload-status/stream")
+async def stream_upload_status(request: Request, candidate_uid: str = Query(...), current_user=Depends(get_current_user)):
+    """Server-Sent Events: one `stage` event per finished stage (the analysis with its result), then `complete` (or `timeout`)."""
+
+    def event(name: str, data) -> str:
+        return f"event: {name}\ndata: {json.dumps(jsonable_encoder(data))}\n\n"
+
+    async def events():
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.QUIZ_STREAM_TIMEOUT
+        last_sent = loop.time()
+        sent = set()
+        while True:
+            upload_status = await analyzer_service.get_upload_status(candidate_uid) if ObjectId.is_valid(candidate_uid) else None
+            if upload_status is None:
+                yield event("error", {"message": "Upload not found"})
+                return
+            stages = _upload_stages(upload_status)
+            for stage, state in stages.items():
+                if state != "pending" and stage not in sent:
+                    sent.add(stage)
+                    last_sent = loop.time()
+                    data = {"stage": stage, "state": state}
+                    if stage == "resume_analysis":
+                        data["analysis"] = upload_status["analysis"]
+                    yield event("stage", data)
+            if all(state != "pending" for state in stages.values()):
+                yield event("complete", {"stages": stages})
+                return
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                yield event("timeout", {"stages": stages})
+                return
+            if await request.is_disconnected():
+                return
+            await notifier.wait(upload_topic(candidate_uid), min(remaining, settings.EVENTS_POLL_INTERVAL))
+            if loop.time() - last_sent >= settings.QUIZ_STREAM_HEARTBEAT:
+                last_sent = loop.time()
+                yield ": keep-alive\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@analyze_router.post("/upload-bulk")
+@body_limit("BULK_MAX_BYTES")
+async def upload_bulk(
+    request: Request,
+    hr_name: str = Form(...),
+    job_position: str = Form(...),
+    job_description: str = Form(...),
+    resumes: List[UploadFile] = File(...),
+    current_user=Depends(get_current_user)
+):
+    """
+    Ingest many resumes (PDF/DOCX files and/or ZIP archives of them) for one job description.
+    Answers 202 with a batch id right away and processes the batch as a "resume_batch" job;
+    progress is available from /upload-bulk-status.
+    """
+    files = []
+    try:
+        user_id = str(current_user["_id"])
+        items = []
+        for resume in resumes:
+            suffix = os.path.splitext(resume.filename or "")[-1].lower()
+            if suffix == ".zip":
+                archive = await spool_upload(resume, settings.BULK_MAX_BYTES)
+                try:
+                    members = await expand_zip_upload(
+                        archive, SUPPORTED_RESUME_SUFFIXES, settings.BULK_MAX_FILES - len(files), settings.RESUME_MAX_BYTES
+                    )
+                finally:
+                    archive.close()
+                for member in members:
+                    files.append((len(items), member))
+                    items.append({"index": len(items), "filename": member.filename})
+            elif suffix in SUPPORTED_RESUME_SUFFIXES:
+                if len(files) >= settings.BULK_MAX_FILES:
+                    raise InvalidArchive(f"A batch can hold at most {settings.BULK_MAX_FILES} resumes.")
+                files.append((len(items), await spool_upload(resume, settings.RESUME_MAX_BYTES)))
+                items.append({"index": len(items), "filename": resume.filename})
+            else:
+                items.append({
+                    "index": len(items), "filename": resume.filename, "state": "failed",
+                    "error": "Only PDF and DOCX resumes are supported right now."
+                })
+
+        if not files:
+            return JSONResponse(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                content={"status": False, "message": "No PDF or DOCX resumes found in the upload."}
+            )
+
+        batch_id = await analyzer_service.create_resume_batch({
+            "user_id": user_id,
+            "hr_name": hr_name,
+            "job_position": job_position,
+            "job_description": job_description,
+            "total": len(items),
+            "items": items,
+        })
+        try:
+            await store_batch_files(batch_id, files)
+            await submit_job("resume_batch", batch_id, {"batch_id": batch_id})
+        except BaseException:
+            await fail_resume_batch(batch_id)
+            raise
+
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content={
+                "status": True,
+                "data": {"batch_id": batch_id, "total": len(items), "items": items},
+                "message": "Resumes received"
+            }
+        )
+    except UploadTooLarge as e:
+        return upload_too_large_response(e)
+    except InvalidArchive as e:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={"status": False, "message": str(e)}
+        )
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return JSONResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            content={
+                "status": False,
+                "message": "Something went wrong"
+            }
+        )
+    finally:
+        # The batch job works on the copies in BULK_STORAGE_DIR
+        for _, file in files:
+            file.close()
+
+
+@analyze_router.get("/upload-bulk-status")
+async def upload_bulk_status(request: Request, batch_id: str = Query(...), current_user=Depends(get_current_user)):
+    try:
+        batch = None
+        if ObjectId.is_valid(batch_id):
+            batch = await analyzer_service.get_resume_batch(batch_id, str(current_user["_id"]))
+        if not batch:
+            return JSONResponse(
+                status_code=status.HTTP_404_NOT_FOUND,
+                content={"status": False, "message": "Batch not found"}
+            )
+        return JSONResponse(
+            status_code=status.HTTP_200_OK,
+            content={"status": True, "data": batch_summary(batch), "message": "Batch status fetched successfully"}
+        )
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return JSONResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            content={
+                "status": False,
+                "message": "Something went wrong"
+            }
+        )
+
+
+def _audio_mime_type(recording: UploadFile) -> str:
+    return recording.content_type if (recording.content_type or "").startswith("audio/") else "audio/mpeg"
+
+
+@analyze_router.post("/submit-answer-recording")
+@body_limit("AUDIO_MAX_BYTES")
+@in_memory_uploads("AUDIO_MAX_BYTES")
+async def submit_answer_recording(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    candidate_id: str = Form(...),
+    question_index: int = Form(..., ge=0),
+    question_text: str = Form(...),
+    recording: UploadFile = File(...),
+    current_user=Depends(get_current_user)
+):
+    """Accept one answer as soon as it is recorded and transcribe it in the background."""
+    try:
+        user_id = str(current_user["_id"])
+        # The background task takes over the spooled file (the UploadFile is closed with the request) and closes it
+        spooled = await spool_upload(recording, settings.AUDIO_MAX_BYTES)
+        upload_id = str(uuid.uuid4())
+        try:
+            await analyzer_service.start_answer_recording(candidate_id, question_index, question_text, upload_id)
+        except BaseException:
+            spooled.close()
+            raise
+        background_tasks.add_task(
+            transcribe_answer_recording, candidate_id, question_index, upload_id, spooled, _audio_mime_type(recording)
+        )
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content={
+                "status": True,
+                "user_id": user_id,
+                "data": {"question_index": question_index, "state": "pending"},
+                "message": "Recording received"
+            }
+        )
+    except UploadTooLarge as e:
+        return upload_too_large_response(e)
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return JSONResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            content={
+                "status": False,
+                "message": "Something went wrong"
+            }
+        )
+
+
 @analyze_router.post("/submit-all-answers")
+@in_memory_uploads("AUDIO_MAX_BYTES")
 async def submit_all_answers(
     request: Request,
     candidate_id: str = Form(...),
-    question_texts: List[str] = Form(...), 
+    question_texts: List[str] = Form(None),
     recordings: List[UploadFile] = None,
     current_user=Depends(get_current_user)
 ):
+    """
+    Analyze every answer. Without recordings, the transcripts already produced by
+    /submit-answer-recording are used (waiting briefly for any still being transcribed).
+    """
     try:
         user_id = str(current_user["_id"])
 
-        answers_batch = []
-        temp_folder = "temp_audio"
-        os.makedirs(temp_folder, exist_ok=True)
-        for question,recording in zip(question_texts,recordings):
-            audio_content = await recording.read()
-            filename = f"{uuid.uuid4()}.mp3" 
-            filepath = os.path.join(temp_folder, filename)
-            with open(filepath, "wb") as f:
-                f.write(audio_content)
-            transcription = await transcribe_audio(filepath)
-            os.remove(filepath)
-            que_obj = {
-                "questions": question,
-                "answers": transcription
-            }
-            answers_batch.append(que_obj)
+        if recordings:
+            if not question_texts or len(question_texts) != len(recordings):
+                return JSONResponse(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    content={"status": False, "message": "Send one question_texts entry per recording"}
+                )
+            # Spool every recording, then transcribe them concurrently; each clip is read into memory only inside a transcription slot
+            pairs = list(zip(question_texts, recordings))
+            spooled = []
+            try:
+                for _, recording in pairs:
+                    spooled.append(await spool_upload(recording, settings.AUDIO_MAX_BYTES))
+                transcriptions = await asyncio.gather(*(
+                    transcribe_spooled(clip, _audio_mime_type(recording))
+                    for clip, (_, recording) in zip(spooled, pairs)
+                ))
+            finally:
+                for clip in spooled:
+                    clip.close()
+            answers_batch = [
+                {
+                    "questions": question,
+                    "answers": transcription
+                }
+                for (question, _), (transcription, _) in zip(pairs, transcriptions)
+            ]
+            metrics = key_metrics([answer_metrics(text, timing) for text, timing in transcriptions])
+        else:
+            expected = len(question_texts) if question_texts else None
+
+            async def transcribed():
+                answers = await analyzer_service.get_answer_recordings(candidate_id)
+                if expected is not None:
+                    answers = [a for a in answers if a["question_index"] < expected]
+                settled = answers and all(a["state"] != "pending" for a in answers)
+                return answers if settled and (expected is None or len(answers) == expected) else None
+
+            answers = await notifier.wait_until(answers_topic(candidate_id), transcribed, settings.ANSWER_TRANSCRIPT_WAIT)
+            if not answers:
+                answers = await analyzer_service.get_answer_recordings(candidate_id)
+                if expected is not None:
+                    answers = [a for a in answers if a["question_index"] < expected]
+            received = {a["question_index"] for a in answers}
+            missing = sorted(
+                [a["question_index"] for a in answers if a["state"] != "done"]
+                + [i for i in range(expected or 0) if i not in received]
+            )
+            if not answers or missing:
+                return JSONResponse(
+                    status_code=status.HTTP_409_CONFLICT,
+                    content={
+                        "status": False,
+                        "data": {"missing_question_indexes": missing},
+                        "message": "Some answers are not transcribed yet; upload them again or retry shortly"
+                    }
+                )
+            answers_batch = [
+                {
+                    "questions": question_texts[a["question_index"]] if question_texts else a["question"],
+                    "answers": a["transcript"]
+                }
+                for a in answers
+            ]
+            metrics = key_metrics([a["metrics"] for a in answers])
 
-        data = await analyze_answer_with_gemini(answers_batch)
+        data = await analyze_answer_with_gemini(answers_batch, metrics)
 
         await analyzer_service.add_communication_data(
             candidate_id = candidate_id,
@@ -197,6 +607,8 @@ async def submit_all_answers(
                 "message": "Answers analyzed successfully"
             }
         )
+    except UploadTooLarge as e:
+        return upload_too_large_response(e)
     except Exception as e:
         import traceback
         traceback.print_exc()
@@ -266,13 +678,55 @@ async def submit_single_answer(
             }
         )
     
+def _quiz_progress(quiz_status: dict):
+    sections = (quiz_status or {}).get("sections", {})
+    complete = bool(sections) and all(state != "pending" for state in sections.values())
+    return sections, complete
+
+
 @analyze_router.get("/get-quiz-questions")
-async def get_quiz_questions(request: Request, candidate_uid: str = Query(...),current_user=Depends(get_current_user)):
+async def get_quiz_questions(
+    request: Request,
+    candidate_uid: str = Query(...),
+    wait: int = Query(None, ge=0),
+    wait_for_all: bool = Query(False),
+    current_user=Depends(get_current_user)
+):
+    """
+    Long-poll: returns as soon as questions are stored (or, with wait_for_all, once every section is done),
+    or with 202 after `wait` seconds so the client can poll again.
+    """
     try:
-        data = await analyzer_service.get_quiz_questions(candidate_uid)
         user_id = str(current_user["_id"])
-        count = 0
-        if count > 5:
+        timeout = min(settings.QUIZ_WAIT_TIMEOUT if wait is None else wait, settings.QUIZ_WAIT_MAX)
+
+        async def ready():
+            quiz_status = await analyzer_service.get_quiz_status(candidate_uid)
+            sections, complete = _quiz_progress(quiz_status)
+            has_questions = bool(quiz_status and quiz_status["questions"])
+            if complete or (has_questions and not wait_for_all):
+                return quiz_status
+            return None
+
+        quiz_status = await notifier.wait_until(quiz_topic(candidate_uid), ready, timeout)
+        if not quiz_status:
+            quiz_status = await analyzer_service.get_quiz_status(candidate_uid)
+        sections, complete = _quiz_progress(quiz_status)
+
+        if quiz_status and quiz_status["questions"]:
+            # Sections are stored as soon as their generator finishes; the rest follow on later requests.
+            return JSONResponse(
+                status_code=status.HTTP_200_OK,
+                content={
+                    "status": True,
+                    "user_id": user_id,
+                    "data": quiz_status["questions"],
+                    "sections": sections,
+                    "complete": complete,
+                    "message": "Questions fetched successfully"
+                }
+            )
+        elif quiz_status is None or complete:
             return JSONResponse(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 content={
@@ -280,22 +734,84 @@ async def get_quiz_questions(request: Request, candidate_uid: str = Query(...),c
                     "message": "No questions found"
                 }
             )
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content={
+                "status": False,
+                "user_id": user_id,
+                "sections": sections,
+                "complete": False,
+                "message": "Questions are still being generated"
+            }
+        )
+
+    except Exception as e:
+        return JSONResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            content={
+                "status": False,
+                "message": "Something went wrong"
+            }
+        )
+
+@analyze_router.get("/quiz-questions/stream")
+async def stream_quiz_questions(request: Request, candidate_uid: str = Query(...), current_user=Depends(get_current_user)):
+    """Server-Sent Events: one `section` event per finished section, then `complete` (or `timeout`)."""
+
+    def event(name: str, data) -> str:
+        return f"event: {name}\ndata: {json.dumps(jsonable_encoder(data))}\n\n"
+
+    async def events():
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.QUIZ_STREAM_TIMEOUT
+        last_sent = loop.time()
+        sent = set()
         while True:
-            if data:
-                return JSONResponse(
-                    status_code=status.HTTP_200_OK,
-                    content={
-                        "status": True,
-                        "user_id": user_id,
-                        "data": data,
-                        "message": "Questions fetched successfully"
-                    }
-                )
-            else:
-                data = await analyzer_service.get_quiz_questions(candidate_uid)
-                count += 1
-                await asyncio.sleep(10)
-        
+            quiz_status = await analyzer_service.get_quiz_status(candidate_uid)
+            if quiz_status is None:
+                yield event("error", {"message": "No questions found"})
+                return
+            sections, complete = _quiz_progress(quiz_status)
+            for section, state in sections.items():
+                if state != "pending" and section not in sent:
+                    sent.add(section)
+                    last_sent = loop.time()
+                    yield event("section", {
+                        "section": section,
+                        "state": state,
+                        "questions": [q for q in quiz_status["questions"] if q.get("type") == section],
+                    })
+            if complete:
+                yield event("complete", {"sections": sections})
+                return
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                yield event("timeout", {"sections": sections})
+                return
+            if await request.is_disconnected():
+                return
+            await notifier.wait(quiz_topic(candidate_uid), min(remaining, settings.EVENTS_POLL_INTERVAL))
+            if loop.time() - last_sent >= settings.QUIZ_STREAM_HEARTBEAT:
+                last_sent = loop.time()
+                yield ": keep-alive\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@analyze_router.get("/llm-stats")
+async def get_llm_stats(request: Request, current_user=Depends(get_current_user)):
+    try:
+        return JSONResponse(
+            status_code=status.HTTP_200_OK,
+            content={
+                "status": True,
+                "data": llm_stats(),
+                "message": "LLM stats fetched successfully"
+            }
+        )
     except Exception as e:
         return JSONResponse(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -382,8 +898,8 @@ async def get_technical_data(request: Request, candidate_uid: str = Query(...),c
 
 
 
-        resume_score = analyze_answer_response.get("match_score")
-        communication_score = analyze_answer_response.get("communication_score")
+        resume_score = (analyze_answer_response or {}).get("match_score")
+        communication_score = (analyze_answer_response or {}).get("communication_score")
         main_score, fit  = await calculate_overall_score(resume=resume_score, communication=communication_score, technical=overall_score)
 
         final_data = {
@@ -1,8 +1,47 @@
 from app.utils.mongo import get_db
 from fastapi import HTTPException
-from app.models.analyzer import AddCandidate, AddAnalyzedData
-from bson import ObjectId
+from app.models.analyzer import AddCandidate, AddAnalyzedData, AddQuizQuestions, AddResumeBatch
 from bson import ObjectId
+from datetime import datetime
+from pymongo import DeleteOne, ReplaceOne, UpdateOne
+from typing import Optional
+import uuid
+
+# What the quiz endpoints see of a stored question (same shape as the former embedded array items)
+QUIZ_QUESTION_FIELDS = {"_id": 0, "quiz_id": 1, "type": 1, "question": 1, "options": 1, "correct_answer": 1, "score": 1}
+
+# The only parts of analyzed_data the dashboard shows
+SUMMARY_SOURCE_FIELDS = {
+    "candidate_id": 1,
+    "communication_data.communication_score": 1,
+    "analyze_answer_response.match_score": 1,
+    "technical_data.overall_score": 1,
+    "technical_data.technical_score": 1,
+    "technical_data.fit": 1,
+}
+
+
+def assessment_summary(candidate: dict, analyzed: Optional[dict]) -> dict:
+    """The assessment_summary document of one candidate: its dashboard row, keyed by the candidate _id."""
+    technical_data = (analyzed or {}).get("technical_data") or {}
+    return {
+        "_id": candidate["_id"],
+        "user_id": candidate.get("user_id"),
+        "is_deleted": candidate.get("is_deleted", False),
+        # Candidates without analyzed data never made it onto the dashboard
+        "analyzed": analyzed is not None,
+        "candidate_name": candidate.get("candidate_name"),
+        "email": candidate.get("email"),
+        "phone": candidate.get("phone"),
+        "hr_name": candidate.get("hr_name"),
+        "job_position": candidate.get("job_position"),
+        "communication_score": ((analyzed or {}).get("communication_data") or {}).get("communication_score"),
+        "resume_score": ((analyzed or {}).get("analyze_answer_response") or {}).get("match_score"),
+        "overall_score": technical_data.get("overall_score"),
+        "technical_score": technical_data.get("technical_score"),
+        "status": technical_data.get("fit"),
+        "created_at": candidate.get("created_at"),
+    }
 
 class AnalyzerService:
 
@@ -14,6 +53,7 @@ class AnalyzerService:
             candidate_data = AddCandidate(**candidate).dict()
             candidate_data['user_id'] = ObjectId(candidate_data['user_id'])
             result = await self._db().candidate.insert_one(candidate_data)
+            await self.sync_assessment_summaries([result.inserted_id])
             return str(result.inserted_id)
         except Exception as e:
             raise HTTPException(status_code=500, detail="Internal Server Error")
@@ -24,6 +64,7 @@ class AnalyzerService:
             analyzed_data['candidate_id'] = ObjectId(analyzed_data['candidate_id'])
             analyzed_data['user_id'] = ObjectId(analyzed_data['user_id'])
             await self._db().analyzed_data.insert_one(analyzed_data)
+            await self.sync_assessment_summaries([analyzed_data['candidate_id']])
             return True
 
         except Exception as e:
@@ -49,6 +90,7 @@ class AnalyzerService:
                 update_doc,
                 upsert=True
             )
+            await self.sync_assessment_summaries([candidate_id])
             return True
         except Exception as e:
             print(f"Failed to store analyzed data for candidate {candidate_id}: {e}")
@@ -119,7 +161,7 @@ class AnalyzerService:
 
     async def get_all_assessments(self, skip: int, limit: int, search: str,user_id: str) -> list:
         """
-        Retrieve paginated assessments with proper aggregation and projection.
+        Retrieve paginated assessments from the assessment_summary collection.
         
         :param skip: Number of documents to skip
         :param limit: Number of documents to return
@@ -128,12 +170,8 @@ class AnalyzerService:
         try:
             if isinstance(user_id, str):
                 user_id = ObjectId(user_id)     
-            
-            print("user_id",user_id)
-            print("Type os user_id",type(user_id))
-            print("Search ",search) 
 
-            match_filter = {"is_deleted": False, "user_id": user_id}
+            match_filter = {"user_id": user_id, "is_deleted": False, "analyzed": True}
 
             if search and search.strip():
                 match_filter["$or"] = [
@@ -143,68 +181,55 @@ class AnalyzerService:
                     {"email": {"$regex": search, "$options": "i"}}
                 ]
 
-            pipeline = [
-                {"$match": match_filter},
-                {"$sort": {"created_at": -1}},
-                {
-                    "$lookup": {
-                        "from": "analyzed_data",
-                        "localField": "_id",
-                        "foreignField": "candidate_id",
-                        "as": "result"
-                    }
-                },
-                {"$unwind": {"path": "$result"}},
-                {
-                    "$project": {
-                        "_id": 0,
-                        "updated_at": 0,
-                        "is_deleted": 0,
-                        "result._id": 0,
-                        "result.candidate_id": 0,
-                        "result.created_at": 0,
-                        "result.updated_at": 0,
-                        "result.is_deleted": 0
-                    }
-                },
-                {"$skip": skip},
-                {"$limit": limit}
-            ]
-
-            cursor = self._db().candidate.aggregate(pipeline)
+            cursor = self._db().assessment_summary.find(
+                match_filter, {"_id": 0, "user_id": 0, "is_deleted": 0, "analyzed": 0}
+            ).sort("created_at", -1).skip(skip).limit(limit)
             results = []
 
             async for doc in cursor:
-                result = doc.get("result", {})
-                communication_data = result.get("communication_data", {})
-                
-                created_at = doc.get("created_at")
-                date_only = created_at.date().isoformat() if created_at else None
-
-                assessment = {
-                    "candidate_name": doc.get("candidate_name"),
-                    "email": doc.get("email"),
-                    "phone": doc.get("phone"),
-                    "hr_name": doc.get("hr_name"),
-                    "job_position": doc.get("job_position"),
-                    "communication_score": communication_data.get("communication_score"),
-                    "resume_score": result.get("analyze_answer_response", {}).get("match_score"),
-                    "overall_score": result.get("technical_data", {}).get("overall_score"),
-                    "technical_score": result.get("technical_data", {}).get("technical_score"),
-                    "status": result.get("technical_data", {}).get("fit"),
-                    "date": date_only
-                }
-                results.append(assessment)
+                created_at = doc.pop("created_at", None)
+                doc["date"] = created_at.date().isoformat() if created_at else None
+                results.append(doc)
 
             # Get total count for pagination
-            total_count = await self._db().candidate.count_documents({"is_deleted": False})
+            total_count = await self._db().assessment_summary.count_documents(match_filter)
 
             return results, total_count
 
         except Exception as e:
-            print("Error in aggregation:", e)
+            print("Error in get_all_assessments:", e)
             return [], 0
 
+    async def refresh_assessment_summaries(self, candidate_ids: list) -> int:
+        """
+        Rebuild the assessment_summary documents of the given candidates from candidate and the
+        dashboard fields of analyzed_data (two $in reads and one bulk write). Summaries of
+        candidates that no longer exist are removed.
+        """
+        ids = list({ObjectId(cid) for cid in candidate_ids})
+        if not ids:
+            return 0
+        db = self._db()
+        candidates = {doc["_id"]: doc async for doc in db.candidate.find({"_id": {"$in": ids}})}
+        analyzed = {
+            doc["candidate_id"]: doc
+            async for doc in db.analyzed_data.find({"candidate_id": {"$in": ids}}, SUMMARY_SOURCE_FIELDS)
+        }
+        operations = [
+            ReplaceOne({"_id": cid}, assessment_summary(candidates[cid], analyzed.get(cid)), upsert=True)
+            if cid in candidates else DeleteOne({"_id": cid})
+            for cid in ids
+        ]
+        await db.assessment_summary.bulk_write(operations, ordered=False)
+        return len(candidates)
+
+    async def sync_assessment_summaries(self, candidate_ids: list):
+        """Keep the dashboard rows in step after a write; a failure here never fails the write itself."""
+        try:
+            await self.refresh_assessment_summaries(candidate_ids)
+        except Exception as e:
+            print(f"Failed to refresh assessment summaries of {candidate_ids}: {e}")
+
 
     async def add_communication_data(self, candidate_id: str, communication_data: dict) -> bool:
         try:
@@ -217,6 +242,7 @@ class AnalyzerService:
                 print("Failed to add communication data")
                 return False  
 
+            await self.sync_assessment_summaries([candidate_id])
             print("Communication data added successfully")
             return True  
 
@@ -224,6 +250,108 @@ class AnalyzerService:
             raise HTTPException(status_code=500, detail="Internal Server Error")
 
 
+    async def start_answer_recording(self, candidate_id: str, question_index: int, question: str, upload_id: str) -> bool:
+        """Register (or replace) the recording of one answer; its transcript is filled in by update_answer_recording."""
+        try:
+            now = datetime.utcnow()
+            await self._db().answer_recordings.update_one(
+                {"candidate_id": ObjectId(candidate_id), "question_index": question_index},
+                {
+                    "$set": {"question": question, "upload_id": upload_id, "state": "pending", "updated_at": now},
+                    "$unset": {"transcript": "", "metrics": "", "error": ""},
+                    "$setOnInsert": {"created_at": now}
+                },
+                upsert=True
+            )
+            return True
+        except Exception as e:
+            raise HTTPException(status_code=500, detail="Internal Server Error")
+
+    async def update_answer_recording(self, candidate_id: str, question_index: int, upload_id: str, fields: dict) -> bool:
+        # Matching on upload_id keeps a late result from overwriting a re-recorded answer.
+        res = await self._db().answer_recordings.update_one(
+            {"candidate_id": ObjectId(candidate_id), "question_index": question_index, "upload_id": upload_id},
+            {"$set": {**fields, "updated_at": datetime.utcnow()}}
+        )
+        return res.modified_count > 0
+
+    async def get_answer_recordings(self, candidate_id: str) -> list:
+        try:
+            cursor = self._db().answer_recordings.find(
+                {"candidate_id": ObjectId(candidate_id)},
+                {"_id": 0, "candidate_id": 0}
+            ).sort("question_index", 1)
+            return await cursor.to_list(length=None)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail="Internal Server Error")
+
+    async def get_existing_emails(self, emails: list) -> set:
+        """The subset of emails that already belong to a candidate (one query for a whole chunk)."""
+        try:
+            if not emails:
+                return set()
+            cursor = self._db().candidate.find({"email": {"$in": emails}, "is_deleted": False}, {"email": 1, "_id": 0})
+            return {doc["email"] for doc in await cursor.to_list(length=None)}
+        except Exception as e:
+            raise HTTPException(status_code=500, detail="Internal Server Error")
+
+    async def add_candidates_bulk(self, candidates: list) -> list:
+        try:
+            docs = []
+            for candidate in candidates:
+                candidate_data = AddCandidate(**candidate).dict()
+                candidate_data['user_id'] = ObjectId(candidate_data['user_id'])
+                docs.append(candidate_data)
+            result = await self._db().candidate.insert_many(docs, ordered=True)
+            return [str(inserted_id) for inserted_id in result.inserted_ids]
+        except Exception as e:
+            raise HTTPException(status_code=500, detail="Internal Server Error")
+
+    async def add_analyzed_data_bulk(self, analyzed_data: list) -> bool:
+        try:
+            docs = []
+            for data in analyzed_data:
+                data = AddAnalyzedData(**data).dict()
+                data['candidate_id'] = ObjectId(data['candidate_id'])
+                data['user_id'] = ObjectId(data['user_id'])
+                docs.append(data)
+            await self._db().analyzed_data.insert_many(docs, ordered=True)
+            await self.sync_assessment_summaries([data['candidate_id'] for data in docs])
+            return True
+        except Exception as e:
+            raise HTTPException(status_code=500, detail="Internal Server Error")
+
+    async def delete_candidates(self, candidate_ids: list) -> int:
+        res = await self._db().candidate.delete_many({"_id": {"$in": [ObjectId(cid) for cid in candidate_ids]}})
+        await self.sync_assessment_summaries(candidate_ids)
+        return res.deleted_count
+
+    async def create_resume_batch(self, batch: dict) -> str:
+        try:
+            batch_data = AddResumeBatch(**batch).dict()
+            batch_data['user_id'] = ObjectId(batch_data['user_id'])
+            result = await self._db().resume_batches.insert_one(batch_data)
+            return str(result.inserted_id)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail="Internal Server Error")
+
+    async def update_resume_batch(self, batch_id: str, fields: dict) -> bool:
+        """fields is a $set document, e.g. {"items.3.state": "done", "items.3.candidate_id": "..."}."""
+        res = await self._db().resume_batches.update_one(
+            {"_id": ObjectId(batch_id)},
+            {"$set": {**fields, "updated_at": datetime.utcnow()}}
+        )
+        return res.modified_count > 0
+
+    async def get_resume_batch_by_id(self, batch_id: str) -> dict:
+        return await self._db().resume_batches.find_one({"_id": ObjectId(batch_id)})
+
+    async def get_resume_batch(self, batch_id: str, user_id: str) -> dict:
+        try:
+            return await self._db().resume_batches.find_one({"_id": ObjectId(batch_id), "user_id": ObjectId(user_id)})
+        except Exception as e:
+            raise HTTPException(status_code=500, detail="Internal Server Error")
+
     async def get_candidate_by_email(self, email: str) -> dict:
         try:
             candidate = await self._db().candidate.find_one({"email": email, "is_deleted": False})
@@ -233,14 +361,18 @@ class AnalyzerService:
         except Exception as e:
             raise HTTPException(status_code=500, detail="Internal Server Error")
         
+    def _quiz_documents(self, candidate_uid: str, quiz_data: list, generation_id: str = None) -> list:
+        documents = []
+        for question in quiz_data:
+            document = AddQuizQuestions(candidate_id=candidate_uid, generation_id=generation_id, **question).dict(exclude_none=True)
+            document["candidate_id"] = ObjectId(candidate_uid)
+            documents.append(document)
+        return documents
+
     async def store_quiz_questions(self, candidate_uid: str, quiz_data: list) -> bool:
         try:
-            res = await self._db().analyzed_data.update_one(
-                {"candidate_id": ObjectId(candidate_uid)},  # use correct field
-                {"$push": {"quiz_questions": {"$each": quiz_data}}},  # append instead of overwrite
-                upsert=True  # create if it doesn't exist
-            )
-            if res:
+            res = await self._db().quiz_questions.insert_many(self._quiz_documents(candidate_uid, quiz_data))
+            if res.inserted_ids:
                 print("Quiz questions stored successfully")
                 return True
             print("Failed to store quiz questions")
@@ -248,44 +380,195 @@ class AnalyzerService:
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
 
+    async def store_quiz_section(self, candidate_uid: str, section: str, quiz_data: list) -> bool:
+        """
+        Insert one generated question set into quiz_questions and flag its section as ready.
+        A section that is already ready is left untouched, so a retried generation does not duplicate questions.
+
+        Overlapping stores of one section (a requeued job still running, a redelivered task) are settled by
+        a claim: each run records its generation in quiz_claims.{section} before inserting, and only the
+        run still holding the claim may flip the section to ready. A run that lost its claim removes just
+        its own questions; the winner then removes every other generation of the section.
+        """
+        try:
+            db = self._db()
+            candidate_id = ObjectId(candidate_uid)
+            generation_id = str(uuid.uuid4())
+            claimed = await db.analyzed_data.update_one(
+                {"candidate_id": candidate_id, f"quiz_sections.{section}": {"$ne": "ready"}},
+                {"$set": {f"quiz_claims.{section}": generation_id}}
+            )
+            if not claimed.matched_count:
+                print(f"Quiz section {section} was not stored (missing document or already ready)")
+                return False
+
+            await db.quiz_questions.insert_many(self._quiz_documents(candidate_uid, quiz_data, generation_id))
+            res = await db.analyzed_data.update_one(
+                {
+                    "candidate_id": candidate_id,
+                    f"quiz_sections.{section}": {"$ne": "ready"},
+                    f"quiz_claims.{section}": generation_id,
+                },
+                {"$set": {f"quiz_sections.{section}": "ready", "updated_at": datetime.utcnow()}}
+            )
+            if res.modified_count:
+                # Leftovers of runs that lost the claim or died before flagging the section
+                await db.quiz_questions.delete_many(
+                    {"candidate_id": candidate_id, "type": section, "generation_id": {"$ne": generation_id}}
+                )
+                print(f"Quiz section {section} stored successfully")
+                return True
+            await db.quiz_questions.delete_many({"candidate_id": candidate_id, "generation_id": generation_id})
+            print(f"Quiz section {section} was not stored (claimed by another run or already ready)")
+            return False
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
+
+    async def migrate_quiz_questions(self, candidate_uid: str) -> Optional[dict]:
+        """
+        Move a legacy embedded analyzed_data.quiz_questions array into the quiz_questions collection.
+        Returns the candidate's quiz_sections afterwards, or None when there was nothing to move.
+        """
+        db = self._db()
+        candidate_id = ObjectId(candidate_uid)
+        result = await db.analyzed_data.find_one(
+            {"candidate_id": candidate_id, "quiz_questions.0": {"$exists": True}},
+            {"quiz_questions": 1, "quiz_sections": 1}
+        )
+        if not result:
+            return None
+
+        operations = []
+        for question in result["quiz_questions"]:
+            question = {k: v for k, v in question.items() if k != "candidate_id"}
+            quiz_id = str(question.pop("quiz_id", None) or uuid.uuid4())
+            document = {"candidate_id": candidate_id, "quiz_id": quiz_id, "is_deleted": False, **question}
+            document.setdefault("created_at", result["_id"].generation_time.replace(tzinfo=None))
+            document.setdefault("updated_at", datetime.utcnow())
+            operations.append(UpdateOne(
+                {"candidate_id": candidate_id, "quiz_id": quiz_id}, {"$setOnInsert": document}, upsert=True
+            ))
+        await db.quiz_questions.bulk_write(operations, ordered=False)
+
+        sections = result.get("quiz_sections")
+        update = {"$unset": {"quiz_questions": ""}}
+        if sections is None:
+            # Documents written before per-section persistence stored every section at once
+            sections = {q.get("type"): "ready" for q in result["quiz_questions"]}
+            update["$set"] = {"quiz_sections": sections}
+        await db.analyzed_data.update_one({"_id": result["_id"]}, update)
+        print(f"Migrated {len(operations)} quiz questions of candidate {candidate_uid}")
+        return sections
+
+    async def mark_quiz_section(self, candidate_uid: str, section: str, state: str) -> bool:
+        try:
+            res = await self._db().analyzed_data.update_one(
+                {"candidate_id": ObjectId(candidate_uid), f"quiz_sections.{section}": {"$ne": "ready"}},
+                {"$set": {f"quiz_sections.{section}": state, "updated_at": datetime.utcnow()}}
+            )
+            return res.modified_count > 0
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
+
+    async def store_resume_analysis(self, candidate_uid: str, analysis: dict) -> bool:
+        try:
+            res = await self._db().analyzed_data.update_one(
+                {"candidate_id": ObjectId(candidate_uid), "resume_analysis": {"$ne": "ready"}},
+                {"$set": {"analyze_answer_response": analysis, "resume_analysis": "ready", "updated_at": datetime.utcnow()}}
+            )
+            if res.modified_count:
+                await self.sync_assessment_summaries([candidate_uid])
+            return res.modified_count > 0
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
+
+    async def mark_resume_analysis(self, candidate_uid: str, state: str) -> bool:
+        try:
+            res = await self._db().analyzed_data.update_one(
+                {"candidate_id": ObjectId(candidate_uid), "resume_analysis": {"$ne": "ready"}},
+                {"$set": {"resume_analysis": state, "updated_at": datetime.utcnow()}}
+            )
+            return res.modified_count > 0
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
+
+    async def get_upload_status(self, candidate_id: str) -> dict:
+        """Resume analysis (state and result) plus the per-section quiz readiness of one upload."""
+        try:
+            result = await self._db().analyzed_data.find_one(
+                {"candidate_id": ObjectId(candidate_id)},
+                {"resume_analysis": 1, "analyze_answer_response": 1, "quiz_sections": 1, "_id": 0}
+            )
+            if not result:
+                return None
+            sections = result.get("quiz_sections")
+            if sections is None:
+                sections = await self.migrate_quiz_questions(candidate_id) or {}
+            return {
+                # Documents written before async uploads were always analyzed up front
+                "resume_analysis": result.get("resume_analysis", "ready"),
+                "analysis": result.get("analyze_answer_response"),
+                "sections": sections,
+            }
+        except Exception as e:
+            print("Error in get_upload_status:", e)
+            return None
+
+    async def _find_quiz_questions(self, candidate_id: str, sections: dict = None) -> list:
+        query = {"candidate_id": ObjectId(candidate_id)}
+        if sections is not None:
+            query["type"] = {"$in": [section for section, state in sections.items() if state == "ready"]}
+        cursor = self._db().quiz_questions.find(query, QUIZ_QUESTION_FIELDS).sort("_id", 1)
+        return await cursor.to_list(length=None)
+
+    async def get_quiz_status(self, candidate_id: str) -> dict:
+        """Questions of the sections stored so far plus the per-section readiness flags."""
+        try:
+            result = await self._db().analyzed_data.find_one(
+                {"candidate_id": ObjectId(candidate_id)},
+                {"quiz_sections": 1, "_id": 0}
+            )
+            if not result:
+                return None
+            sections = result.get("quiz_sections")
+            if sections is None:
+                sections = await self.migrate_quiz_questions(candidate_id) or {}
+            # Only questions of ready sections are shown; a section is flagged once all of its questions are in
+            questions = await self._find_quiz_questions(candidate_id, sections)
+            if not questions and "ready" in sections.values() and await self.migrate_quiz_questions(candidate_id):
+                questions = await self._find_quiz_questions(candidate_id, sections)
+            return {"questions": questions, "sections": sections}
+        except Exception as e:
+            print("Error in get_quiz_status:", e)
+            return None
+
     async def get_quiz_question_by_id(self, candidate_uid: str, quiz_id: str) -> dict:
         try:
-            
-            analyzed_data = await self._db().analyzed_data.find_one({"candidate_id": ObjectId(candidate_uid)})
-            if analyzed_data and "quiz_questions" in analyzed_data:
-                for question in analyzed_data["quiz_questions"]:
-                    if str(question.get("quiz_id")) == str(quiz_id):
-                        return question
-            return {}
+            query = {"candidate_id": ObjectId(candidate_uid), "quiz_id": str(quiz_id)}
+            question = await self._db().quiz_questions.find_one(query, QUIZ_QUESTION_FIELDS)
+            if question is None and await self.migrate_quiz_questions(candidate_uid) is not None:
+                question = await self._db().quiz_questions.find_one(query, QUIZ_QUESTION_FIELDS)
+            return question or {}
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
         
     async def get_quiz_questions(self,candidate_id: str):
         try:
-
-            result = await self._db().analyzed_data.find_one({"candidate_id": ObjectId(candidate_id)}, {"quiz_questions": 1, "_id": 0})
-            if result:
-                return result["quiz_questions"]
-            else:
-                return None
+            questions = await self._find_quiz_questions(candidate_id)
+            if not questions and await self.migrate_quiz_questions(candidate_id) is not None:
+                questions = await self._find_quiz_questions(candidate_id)
+            return questions or None
         except Exception as e:
             print("Error in get_quiz_questions:", e)
             return None
 
     async def save_score(self, candidate_id: str, quiz_id: str, score_type: str, score: float) -> bool:
         try:
-            res = await self._db().analyzed_data.update_one(
-                {
-                    "candidate_id": ObjectId(candidate_id),
-                    "quiz_questions.quiz_id": quiz_id
-                },
-                {
-                    "$set": {
-                        "quiz_questions.$.type": score_type,
-                        "quiz_questions.$.score": score
-                    }
-                }
-            )
+            query = {"candidate_id": ObjectId(candidate_id), "quiz_id": str(quiz_id)}
+            update = {"$set": {"type": score_type, "score": score, "updated_at": datetime.utcnow()}}
+            res = await self._db().quiz_questions.update_one(query, update)
+            if res.matched_count == 0 and await self.migrate_quiz_questions(candidate_id) is not None:
+                res = await self._db().quiz_questions.update_one(query, update)
             
             if res.matched_count > 0:
                 print(f"Successfully updated quiz {quiz_id} for candidate {candidate_id}")
@@ -300,14 +583,13 @@ class AnalyzerService:
         
     async def get_score(self, candidate_id: str):
         try:
-            result = await self._db().analyzed_data.find_one(
-                {"candidate_id": ObjectId(candidate_id)},
-                {"quiz_questions": 1, "_id": 0}  # Only return quiz_questions field
-            )
+            questions = await self._find_quiz_questions(candidate_id)
+            if not questions and await self.migrate_quiz_questions(candidate_id) is not None:
+                questions = await self._find_quiz_questions(candidate_id)
             
-            if result and "quiz_questions" in result:
-                print(f"Found {len(result['quiz_questions'])} quiz questions for candidate {candidate_id}")
-                return result["quiz_questions"]
+            if questions:
+                print(f"Found {len(questions)} quiz questions for candidate {candidate_id}")
+                return questions
             else:
                 print(f"No quiz questions found for candidate {candidate_id}")
                 return []
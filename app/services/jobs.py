@@ -0,0 +1,153 @@
+from app.core.config import settings
+from app.utils.mongo import get_db
+from fastapi import HTTPException
+from app.models.job import AddJob
+from bson import ObjectId
+from datetime import datetime, timedelta
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+ACTIVE_STATES = ("queued", "running")
+
+
+def retry_delay(attempts: int) -> float:
+    return settings.JOB_RETRY_BACKOFF * (2 ** max(attempts - 1, 0))
+
+
+class JobService:
+
+    def _db(self):
+        return get_db()
+
+    async def ensure_indexes(self):
+        # Declared in the index registry; enqueue relies on the unique active_key index, so it is ensured here too
+        from app.utils.mongo_indexes import ensure_indexes
+        await ensure_indexes(["jobs"])
+
+    async def enqueue(self, kind: str, dedupe_key: str, payload: dict, max_attempts: int) -> tuple:
+        """
+        Create a queued job unless one for the same kind and key is already queued or running.
+        Returns (job, created).
+        """
+        active_key = f"{kind}:{dedupe_key}"
+        try:
+            job = AddJob(
+                kind=kind, dedupe_key=dedupe_key, payload=payload,
+                active_key=active_key, max_attempts=max_attempts
+            ).dict()
+            try:
+                result = await self._db().jobs.insert_one(job)
+                job["_id"] = result.inserted_id
+                return job, True
+            except DuplicateKeyError:
+                existing = await self._db().jobs.find_one({"active_key": active_key})
+                if existing:
+                    return existing, False
+                # The active job finished between the insert and the lookup; enqueue again.
+                job.pop("_id", None)
+                result = await self._db().jobs.insert_one(job)
+                job["_id"] = result.inserted_id
+                return job, True
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
+
+    async def get_job(self, job_id: str) -> dict:
+        return await self._db().jobs.find_one({"_id": ObjectId(job_id)})
+
+    async def get_latest_job(self, kind: str, dedupe_key: str) -> dict:
+        return await self._db().jobs.find_one({"kind": kind, "dedupe_key": dedupe_key}, sort=[("created_at", -1)])
+
+    async def claim(self, job_id: str, worker: str) -> dict:
+        """Atomically move a queued job to running; returns None if another worker got it first."""
+        now = datetime.utcnow()
+        return await self._db().jobs.find_one_and_update(
+            {"_id": ObjectId(job_id), "state": "queued"},
+            {
+                "$set": {"state": "running", "worker": worker, "started_at": now, "heartbeat_at": now, "updated_at": now},
+                "$inc": {"attempts": 1}
+            },
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def heartbeat(self, job_id: str, worker: str) -> bool:
+        res = await self._db().jobs.update_one(
+            {"_id": ObjectId(job_id), "state": "running", "worker": worker},
+            {"$set": {"heartbeat_at": datetime.utcnow()}}
+        )
+        return res.modified_count > 0
+
+    async def complete(self, job: dict):
+        now = datetime.utcnow()
+        await self._db().jobs.update_one(
+            {"_id": job["_id"], "state": "running", "worker": job["worker"]},
+            {
+                "$set": {
+                    "state": "succeeded", "finished_at": now, "updated_at": now,
+                    "duration_seconds": (now - job["started_at"]).total_seconds()
+                },
+                "$unset": {"active_key": ""}
+            }
+        )
+
+    async def fail(self, job: dict, error: str) -> str:
+        """Record a failed attempt; the job is queued again until max_attempts is reached. Returns the new state."""
+        now = datetime.utcnow()
+        update = {
+            "last_error": error, "updated_at": now,
+            "duration_seconds": (now - job["started_at"]).total_seconds()
+        }
+        if job["attempts"] < job["max_attempts"]:
+            state = "queued"
+            next_run_at = now + timedelta(seconds=retry_delay(job["attempts"]))
+            res = await self._db().jobs.update_one(
+                {"_id": job["_id"], "state": "running", "worker": job["worker"]},
+                {"$set": {**update, "state": state, "next_run_at": next_run_at}}
+            )
+        else:
+            state = "failed"
+            res = await self._db().jobs.update_one(
+                {"_id": job["_id"], "state": "running", "worker": job["worker"]},
+                {"$set": {**update, "state": state, "finished_at": now}, "$unset": {"active_key": ""}}
+            )
+        return state if res.modified_count else None
+
+    async def acquire_lock(self, name: str, holder: str, ttl: int) -> bool:
+        """Take a named lock for ttl seconds unless another holder has it; there is no release, it expires."""
+        now = datetime.utcnow()
+        try:
+            await self._db().locks.update_one(
+                {"_id": name, "expires_at": {"$lte": now}},
+                {"$set": {"holder": holder, "acquired_at": now, "expires_at": now + timedelta(seconds=ttl)}},
+                upsert=True
+            )
+            return True
+        except DuplicateKeyError:
+            return False
+
+    async def recover_orphans(self, stale_after: int) -> list:
+        """
+        Requeue running jobs whose worker stopped sending heartbeats (or fail them once attempts are exhausted)
+        and return (job id, seconds until its retry backoff expires) for every queued job so they can be
+        dispatched again.
+        """
+        cutoff = datetime.utcnow() - timedelta(seconds=stale_after)
+        orphaned = self._db().jobs.find({"state": "running", "heartbeat_at": {"$lt": cutoff}})
+        async for job in orphaned:
+            now = datetime.utcnow()
+            error = f"Worker {job.get('worker')} stopped responding"
+            if job["attempts"] < job["max_attempts"]:
+                update = {"$set": {"state": "queued", "last_error": error, "updated_at": now, "next_run_at": now}}
+            else:
+                update = {
+                    "$set": {"state": "failed", "last_error": error, "finished_at": now, "updated_at": now},
+                    "$unset": {"active_key": ""}
+                }
+            await self._db().jobs.update_one({"_id": job["_id"], "state": "running", "heartbeat_at": job["heartbeat_at"]}, update)
+            print(f"Recovered orphaned job {job['_id']} ({job['kind']} {job['dedupe_key']})")
+
+        now = datetime.utcnow()
+        queued = self._db().jobs.find({"state": "queued"}, {"_id": 1, "next_run_at": 1})
+        return [
+            (str(job["_id"]), max((job["next_run_at"] - now).total_seconds(), 0) if job.get("next_run_at") else 0)
+            async for job in queued
+        ]
@@ -0,0 +1,124 @@
+import io
+import math
+import shutil
+import logging
+import subprocess
+from typing import Optional, Tuple
+
+import numpy as np
+from scipy.io import wavfile
+from scipy.signal import resample_poly
+
+from app.core.config import settings
+from app.utils.speech_metrics import FRAME_SECONDS, audio_timing, frame_energy_db, voiced_frames
+from app.utils.workers import run_in_process
+
+PAD_SECONDS = 0.2
+MIN_SECONDS = 0.5
+
+
+def _ffmpeg() -> Optional[str]:
+    return shutil.which("ffmpeg")
+
+
+def check_audio_tools():
+    """Startup check: without ffmpeg only WAV uploads are preprocessed and timed; browser formats pass through untouched."""
+    if settings.AUDIO_PREPROCESS_ENABLED and not _ffmpeg():
+        logging.warning(
+            "ffmpeg not found on PATH; webm/ogg/mp3/m4a recordings will not be downmixed, resampled or trimmed. "
+            "Install ffmpeg (e.g. apt-get install ffmpeg) to enable audio preprocessing for them."
+        )
+
+
+def decode_audio(data: bytes, sample_rate: int) -> Optional[np.ndarray]:
+    """
+    Decode any container/codec to mono float32 samples in [-1, 1] at `sample_rate`.
+    Uses ffmpeg when installed; otherwise only WAV input can be decoded (returns None for the rest).
+    """
+    ffmpeg = _ffmpeg()
+    if ffmpeg:
+        proc = subprocess.run(
+            [ffmpeg, "-nostdin", "-loglevel", "error", "-i", "pipe:0",
+             "-ac", "1", "-ar", str(sample_rate), "-f", "s16le", "pipe:1"],
+            input=data, capture_output=True, check=True, timeout=settings.AUDIO_PREPROCESS_TIMEOUT,
+        )
+        return np.frombuffer(proc.stdout, dtype=np.int16).astype(np.float32) / 32768.0
+
+    if not (data[:4] == b"RIFF" and data[8:12] == b"WAVE"):
+        return None
+    rate, samples = wavfile.read(io.BytesIO(data))
+    if samples.dtype.kind == "i":
+        samples = samples.astype(np.float32) / float(np.iinfo(samples.dtype).max)
+    elif samples.dtype.kind == "u":
+        samples = (samples.astype(np.float32) - 128.0) / 128.0
+    else:
+        samples = samples.astype(np.float32)
+    if samples.ndim > 1:
+        samples = samples.mean(axis=1)
+    if rate != sample_rate:
+        divisor = math.gcd(rate, sample_rate)
+        samples = resample_poly(samples, sample_rate // divisor, rate // divisor).astype(np.float32)
+    return samples
+
+
+def trim_silence(samples: np.ndarray, sample_rate: int, threshold_db: float) -> np.ndarray:
+    """Cut leading and trailing silence, keeping a little padding around the speech."""
+    voiced = voiced_frames(frame_energy_db(samples, sample_rate), threshold_db)
+    if not voiced.any():
+        return samples[:int(MIN_SECONDS * sample_rate)]
+    frame = max(int(sample_rate * FRAME_SECONDS), 1)
+    pad = int(PAD_SECONDS * sample_rate)
+    indices = np.flatnonzero(voiced)
+    start = max(indices[0] * frame - pad, 0)
+    end = min((indices[-1] + 1) * frame + pad, len(samples))
+    return samples[start:end]
+
+
+def encode_audio(samples: np.ndarray, sample_rate: int) -> Tuple[bytes, str]:
+    """Re-encode mono samples compactly: Opus in Ogg with ffmpeg, 16-bit PCM WAV otherwise."""
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767).astype(np.int16)
+    ffmpeg = _ffmpeg()
+    if ffmpeg:
+        proc = subprocess.run(
+            [ffmpeg, "-nostdin", "-loglevel", "error", "-f", "s16le", "-ar", str(sample_rate), "-ac", "1",
+             "-i", "pipe:0", "-c:a", "libopus", "-b:a", settings.AUDIO_OPUS_BITRATE, "-f", "ogg", "pipe:1"],
+            input=pcm.tobytes(), capture_output=True, check=True, timeout=settings.AUDIO_PREPROCESS_TIMEOUT,
+        )
+        return proc.stdout, "audio/ogg"
+    buffer = io.BytesIO()
+    wavfile.write(buffer, sample_rate, pcm)
+    return buffer.getvalue(), "audio/wav"
+
+
+def preprocess_audio(data: bytes, mime_type: str, sample_rate: int, threshold_db: float) -> Tuple[bytes, str, Optional[dict]]:
+    """
+    Decode, downmix to mono, resample, trim leading/trailing silence and re-encode.
+    Runs in the process pool and also measures the clip's timing (speech_metrics.audio_timing) on the
+    untrimmed samples. Returns the input unchanged, and no timing, if it cannot be decoded.
+    """
+    samples = decode_audio(data, sample_rate)
+    if samples is None or samples.size == 0:
+        return data, mime_type, None
+    timing = audio_timing(samples, sample_rate, threshold_db)
+    samples = trim_silence(samples, sample_rate, threshold_db)
+    encoded, encoded_mime_type = encode_audio(samples, sample_rate)
+    if len(encoded) >= len(data):
+        return data, mime_type, timing
+    return encoded, encoded_mime_type, timing
+
+
+async def prepare_audio(data: bytes, mime_type: str) -> Tuple[bytes, str, Optional[dict]]:
+    """
+    Preprocess a clip off the event loop; any failure falls back to the original bytes. A clip that
+    hangs the decoder past AUDIO_PREPROCESS_TIMEOUT has its worker terminated rather than left busy.
+    """
+    if not settings.AUDIO_PREPROCESS_ENABLED:
+        return data, mime_type, None
+    try:
+        return await run_in_process(
+            preprocess_audio, data, mime_type, settings.AUDIO_SAMPLE_RATE, settings.AUDIO_VAD_THRESHOLD_DB,
+            timeout=settings.AUDIO_PREPROCESS_TIMEOUT, kill_on_timeout=True,
+        )
+    except Exception:
+        logging.exception("Audio preprocessing failed; sending the original clip")
+        return data, mime_type, None
@@ -0,0 +1,299 @@
+import asyncio
+import logging
+import os
+import re
+import shutil
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from pydantic import EmailStr, TypeAdapter, ValidationError
+
+from app.core.config import settings
+from app.services.analyzer import AnalyzerService
+from app.utils.documents import extract_resume
+from app.utils.llm import analyze_resume_with_gemini
+from app.utils.llm_scheduler import BACKGROUND
+from app.utils.uploads import SpooledUpload
+
+analyzer_service = AnalyzerService()
+
+EMAIL_RE = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
+PHONE_RE = re.compile(r"\+?\d[\d\s().-]{7,}\d")
+_email = TypeAdapter(EmailStr)
+_TICK = object()
+
+
+def contact_details(text: str) -> Tuple[Optional[str], Optional[str]]:
+    """First valid email address and phone number found in the resume text."""
+    email = None
+    for match in EMAIL_RE.finditer(text or ""):
+        try:
+            email = _email.validate_python(match.group(0).lower())
+            break
+        except ValidationError:
+            continue
+    phone = None
+    for match in PHONE_RE.finditer(text or ""):
+        digits = re.sub(r"\D", "", match.group(0))
+        if 8 <= len(digits) <= 15:
+            phone = match.group(0).strip()
+            break
+    return email, phone
+
+
+def candidate_name(filename: str) -> str:
+    return re.sub(r"[_\-.]+", " ", os.path.splitext(filename)[0]).strip() or filename
+
+
+class BatchProgress:
+    """Collects per-item state changes of a batch and writes them as a single update every BULK_PROGRESS_INTERVAL."""
+
+    def __init__(self, batch_id: str):
+        self.batch_id = batch_id
+        self.pending = {}
+
+    def set(self, index: int, **fields):
+        for key, value in fields.items():
+            self.pending[f"items.{index}.{key}"] = value
+
+    async def flush(self):
+        if not self.pending:
+            return
+        fields, self.pending = self.pending, {}
+        try:
+            await analyzer_service.update_resume_batch(self.batch_id, fields)
+        except Exception:
+            logging.exception(f"Failed to update progress of resume batch {self.batch_id}")
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(settings.BULK_PROGRESS_INTERVAL)
+            await self.flush()
+
+
+FINAL_ITEM_STATES = ("done", "duplicate", "failed")
+
+
+def batch_dir(batch_id: str) -> str:
+    return os.path.join(settings.BULK_STORAGE_DIR, batch_id)
+
+
+def batch_file(batch_id: str, index: int, filename: str) -> str:
+    return os.path.join(batch_dir(batch_id), f"{index}{os.path.splitext(filename)[-1].lower()}")
+
+
+async def store_batch_files(batch_id: str, files: List[Tuple[int, SpooledUpload]]):
+    """Keep a batch's resumes in BULK_STORAGE_DIR until its job is done, so a retried job still has them."""
+    os.makedirs(batch_dir(batch_id), exist_ok=True)
+    for index, file in files:
+        await file.save(batch_file(batch_id, index, file.filename))
+
+
+def remove_batch_files(batch_id: str):
+    shutil.rmtree(batch_dir(batch_id), ignore_errors=True)
+
+
+async def _extract(path: str) -> str:
+    suffix = os.path.splitext(path)[-1].lower()
+    try:
+        return await extract_resume(path, suffix)
+    except BrokenProcessPool:
+        # Another resume timed out and took the pool down with this one in flight; try once more.
+        return await extract_resume(path, suffix)
+
+
+class ResumeBatch:
+    """
+    Pipeline for one bulk upload: every resume is extracted (at most DOCUMENT_WORKERS at a time, so an
+    item only shows as "extracting" while a worker has it), then analyzed by Gemini at background
+    priority (at most BULK_ANALYSIS_CONCURRENCY at a time), and finished results are saved in chunks
+    of BULK_WRITE_SIZE with bulk inserts. Stages overlap, so extraction never waits for analysis.
+    Items already done, duplicate or failed are skipped, so a retried job resumes where the last stopped.
+    """
+
+    def __init__(self, batch: dict):
+        self.batch_id = str(batch["_id"])
+        self.user_id = str(batch["user_id"])
+        self.job_description = batch["job_description"]
+        self.hr_name = batch.get("hr_name")
+        self.job_position = batch.get("job_position")
+        self.items = batch["items"]
+        self.progress = BatchProgress(self.batch_id)
+        self.results: asyncio.Queue = asyncio.Queue()
+        self.seen_emails = set()
+
+    async def process(self, index: int, filename: str, extract_slots: asyncio.Semaphore,
+                      analysis_slots: asyncio.Semaphore):
+        try:
+            async with extract_slots:
+                self.progress.set(index, state="extracting")
+                try:
+                    text = await _extract(batch_file(self.batch_id, index, filename))
+                except asyncio.TimeoutError:
+                    self.progress.set(index, state="failed", error="The resume took too long to process.")
+                    return
+                except Exception as e:
+                    logging.warning(f"Failed to extract {filename}: {e!r}")
+                    self.progress.set(index, state="failed", error="The resume could not be read.")
+                    return
+
+            async with analysis_slots:
+                self.progress.set(index, state="analyzing")
+                analysis = await analyze_resume_with_gemini(self.job_description, text, priority=BACKGROUND)
+            if analysis is None:
+                self.progress.set(index, state="failed", error="AI usage limit reached.")
+                return
+            self.progress.set(index, state="saving")
+            await self.results.put((index, filename, text, analysis))
+        except Exception:
+            logging.exception(f"Resume {filename} of batch {self.batch_id} failed")
+            self.progress.set(index, state="failed", error="Resume analysis failed.")
+
+    async def save(self, chunk: List[tuple]):
+        contacts = [contact_details(text) for _, _, text, _ in chunk]
+        try:
+            existing = await analyzer_service.get_existing_emails([email for email, _ in contacts if email])
+        except Exception:
+            logging.exception(f"Email lookup for resume batch {self.batch_id} failed")
+            for index, *_ in chunk:
+                self.progress.set(index, state="failed", error="The candidate could not be saved.")
+            return
+
+        rows = []
+        for (index, filename, text, analysis), (email, phone) in zip(chunk, contacts):
+            if email and (email in existing or email in self.seen_emails):
+                self.progress.set(index, state="duplicate", email=email, error="Candidate with this email already exists.")
+                continue
+            if email:
+                self.seen_emails.add(email)
+            rows.append((index, filename, text, analysis, email, phone))
+        if not rows:
+            return
+
+        candidate_ids = []
+        try:
+            candidate_ids = await analyzer_service.add_candidates_bulk([
+                {
+                    "candidate_name": candidate_name(filename),
+                    "user_id": self.user_id,
+                    "email": email,
+                    "phone": phone,
+                    "hr_name": self.hr_name,
+                    "job_position": self.job_position,
+                }
+                for _, filename, _, _, email, phone in rows
+            ])
+            await analyzer_service.add_analyzed_data_bulk([
+                {
+                    "candidate_id": candidate_id,
+                    "user_id": self.user_id,
+                    "resume_text": text,
+                    "job_description": self.job_description,
+                    "analyze_answer_response": analysis,
+                }
+                for candidate_id, (_, _, text, analysis, _, _) in zip(candidate_ids, rows)
+            ])
+        except Exception:
+            logging.exception(f"Bulk insert for resume batch {self.batch_id} failed")
+            if candidate_ids:
+                try:
+                    await analyzer_service.delete_candidates(candidate_ids)
+                except Exception:
+                    logging.exception(f"Failed to remove the candidates of a failed chunk: {candidate_ids}")
+            for index, *_ in rows:
+                self.progress.set(index, state="failed", error="The candidate could not be saved.")
+            self.seen_emails.difference_update(email for *_, email, _ in rows if email)
+            return
+
+        for candidate_id, (index, _, text, _, email, _) in zip(candidate_ids, rows):
+            self.progress.set(index, state="done", candidate_id=candidate_id, email=email)
+        # Recorded right away, so a retried job does not insert these candidates again
+        await self.progress.flush()
+
+        # Imported here: the job registry imports this module for the resume_batch handler
+        from app.utils.jobs import submit_job
+        for candidate_id, (index, _, text, _, email, _) in zip(candidate_ids, rows):
+            try:
+                await submit_job("quiz_generation", candidate_id, {
+                    "candidate_id": candidate_id,
+                    "job_description": self.job_description,
+                    "extracted_text": text
+                })
+            except Exception:
+                logging.exception(f"Failed to queue quiz generation for {candidate_id}")
+
+    async def writer(self):
+        chunk = []
+        while True:
+            try:
+                result = await asyncio.wait_for(self.results.get(), settings.BULK_PROGRESS_INTERVAL)
+            except asyncio.TimeoutError:
+                result = _TICK
+            if result is not None and result is not _TICK:
+                chunk.append(result)
+            # Save full chunks right away, partial ones once the pipeline goes quiet or ends
+            if chunk and (result is None or result is _TICK or len(chunk) >= settings.BULK_WRITE_SIZE):
+                await self.save(chunk)
+                chunk = []
+            if result is None:
+                return
+
+    async def run(self):
+        ticker = asyncio.create_task(self.progress.run())
+        writer = asyncio.create_task(self.writer())
+        try:
+            extract_slots = asyncio.Semaphore(settings.DOCUMENT_WORKERS)
+            analysis_slots = asyncio.Semaphore(settings.BULK_ANALYSIS_CONCURRENCY)
+            await asyncio.gather(*(
+                self.process(item["index"], item["filename"], extract_slots, analysis_slots)
+                for item in self.items if item["state"] not in FINAL_ITEM_STATES
+            ))
+            await self.results.put(None)
+            await writer
+        finally:
+            ticker.cancel()
+            writer.cancel()
+            await self.progress.flush()
+
+
+async def run_resume_batch(batch_id: str):
+    """
+    Job handler for /upload-bulk. A failure propagates, so the job system retries the batch; the
+    resumes stay in BULK_STORAGE_DIR until the batch is finished either way.
+    """
+    batch = await analyzer_service.get_resume_batch_by_id(batch_id)
+    if not batch or batch["state"] == "finished":
+        return
+    await ResumeBatch(batch).run()
+    await analyzer_service.update_resume_batch(batch_id, {"state": "finished", "finished_at": datetime.utcnow()})
+    remove_batch_files(batch_id)
+
+
+async def fail_resume_batch(batch_id: str):
+    """Called once the last attempt has failed: give up on every unfinished item."""
+    batch = await analyzer_service.get_resume_batch_by_id(batch_id)
+    if batch:
+        fields = {
+            f"items.{item['index']}.{key}": value
+            for item in batch["items"] if item["state"] not in FINAL_ITEM_STATES
+            for key, value in (("state", "failed"), ("error", "Resume analysis failed."))
+        }
+        await analyzer_service.update_resume_batch(batch_id, {**fields, "state": "finished", "finished_at": datetime.utcnow()})
+    remove_batch_files(batch_id)
+
+
+def batch_summary(batch: dict) -> dict:
+    counts = {}
+    for item in batch["items"]:
+        counts[item["state"]] = counts.get(item["state"], 0) + 1
+    return {
+        "batch_id": str(batch["_id"]),
+        "state": batch["state"],
+        "total": batch["total"],
+        "completed": sum(counts.get(state, 0) for state in FINAL_ITEM_STATES),
+        "counts": counts,
+        "items": batch["items"],
+        "created_at": batch["created_at"].isoformat(),
+        "finished_at": batch["finished_at"].isoformat() if batch.get("finished_at") else None,
+    }
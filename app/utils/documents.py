@@ -0,0 +1,50 @@
+from typing import Union
+
+import fitz
+
+from app.core.config import settings
+from app.utils.docx_text import extract_docx_text
+from app.utils.workers import run_in_process
+
+SUPPORTED_RESUME_SUFFIXES = (".pdf", ".docx")
+
+
+class UnsupportedDocument(ValueError):
+    pass
+
+
+def _open_pdf(source: Union[bytes, str]):
+    if isinstance(source, str):
+        return fitz.open(source, filetype="pdf")
+    return fitz.open(stream=source, filetype="pdf")
+
+
+def extract_pdf_text(source: Union[bytes, str], max_pages: int) -> str:
+    with _open_pdf(source) as doc:
+        return "".join(doc[index].get_text("text") for index in range(min(doc.page_count, max_pages)))
+
+
+def extract_resume_text(source: Union[bytes, str], suffix: str, max_pages: int) -> str:
+    """
+    Extract resume text from the uploaded bytes (/upload, capped at RESUME_MAX_BYTES) or from the path
+    of a resume already stored on disk (bulk batches, which are then never copied to the worker).
+    Runs in the "documents" process pool.
+    """
+    if suffix == ".pdf":
+        return extract_pdf_text(source, max_pages)
+    if suffix == ".docx":
+        return extract_docx_text(source)
+    raise UnsupportedDocument(suffix)
+
+
+async def extract_resume(source: Union[bytes, str], suffix: str) -> str:
+    """
+    Extract text off the event loop with a per-document timeout and a page cap (PDF).
+    Raises UnsupportedDocument, asyncio.TimeoutError, or the parser's error for unreadable files.
+    """
+    if suffix not in SUPPORTED_RESUME_SUFFIXES:
+        raise UnsupportedDocument(suffix)
+    return await run_in_process(
+        extract_resume_text, source, suffix, settings.RESUME_MAX_PAGES,
+        timeout=settings.RESUME_EXTRACT_TIMEOUT, pool="documents", kill_on_timeout=True,
+    )
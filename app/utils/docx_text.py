@@ -0,0 +1,147 @@
+import io
+import posixpath
+import zipfile
+from typing import Dict, Iterator, List, Union
+
+from lxml import etree
+
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+BODY, P, R, HYPERLINK, TBL, TR, TC = (W + tag for tag in ("body", "p", "r", "hyperlink", "tbl", "tr", "tc"))
+TRPR, TCPR, GRID_BEFORE, GRID_SPAN, VMERGE = (W + tag for tag in ("trPr", "tcPr", "gridBefore", "gridSpan", "vMerge"))
+VAL, BR_TYPE = W + "val", W + "type"
+
+# Text equivalents of run content, as python-docx renders them (CT_R.text)
+RUN_TEXT = {W + "t": None, W + "tab": "\t", W + "ptab": "\t", W + "cr": "\n", W + "noBreakHyphen": "-"}
+
+OFFICE_DOCUMENT = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"
+PACKAGE_RELS = "{http://schemas.openxmlformats.org/package/2006/relationships}Relationship"
+
+
+def _run_text(r) -> str:
+    parts = []
+    for e in r:
+        if e.tag in RUN_TEXT:
+            parts.append(RUN_TEXT[e.tag] or e.text or "")
+        elif e.tag == W + "br":
+            parts.append("\n" if e.get(BR_TYPE, "textWrapping") == "textWrapping" else "")
+    return "".join(parts)
+
+
+def paragraph_text(p) -> str:
+    """Same as python-docx Paragraph.text: direct runs and runs of direct hyperlinks only."""
+    parts = []
+    for child in p:
+        if child.tag == R:
+            parts.append(_run_text(child))
+        elif child.tag == HYPERLINK:
+            parts.extend(_run_text(r) for r in child if r.tag == R)
+    return "".join(parts)
+
+
+def _val(parent, tag, default):
+    if parent is None:
+        return default
+    e = parent.find(tag)
+    if e is None:
+        return default
+    return e.get(VAL, default if tag != VMERGE else "continue")
+
+
+def _grid_span(tc) -> int:
+    return int(_val(tc.find(TCPR), GRID_SPAN, 1))
+
+
+def _vmerge(tc):
+    return _val(tc.find(TCPR), VMERGE, None)
+
+
+def _grid_before(tr) -> int:
+    return int(_val(tr.find(TRPR), GRID_BEFORE, 0))
+
+
+def _tc_at_grid_offset(tr, grid_offset: int):
+    remaining = grid_offset - _grid_before(tr)
+    for tc in tr.iterchildren(TC):
+        if remaining < 0:
+            break
+        if remaining == 0:
+            return tc
+        remaining -= _grid_span(tc)
+    raise ValueError(f"no `tc` element at grid_offset={grid_offset}")
+
+
+def _row_cells(rows: List, index: int) -> Iterator:
+    """The layout-grid cells of a row like python-docx _Row.cells: spans repeat, vMerge continues resolve upwards."""
+
+    def resolve(row_index: int, tc):
+        if _vmerge(tc) == "continue":
+            if row_index == 0:
+                raise ValueError("no tr above topmost tr in w:tbl")
+            tr = rows[row_index]
+            offset = _grid_before(tr) + sum(_grid_span(prev) for prev in tc.itersiblings(TC, preceding=True))
+            yield from resolve(row_index - 1, _tc_at_grid_offset(rows[row_index - 1], offset))
+            return
+        for _ in range(_grid_span(tc)):
+            yield tc
+
+    for tc in rows[index].iterchildren(TC):
+        yield from resolve(index, tc)
+
+
+def table_lines(tbl) -> List[str]:
+    """One tab-joined line per row with text, like extract_text_and_tables."""
+    rows = list(tbl.iterchildren(TR))
+    # Keyed by element: holding the proxies keeps lxml returning the same objects for merged cells
+    texts: Dict[object, str] = {}
+    lines = []
+    for index in range(len(rows)):
+        row_data = []
+        for tc in _row_cells(rows, index):
+            if tc not in texts:
+                texts[tc] = "\n".join(paragraph_text(p) for p in tc.iterchildren(P)).strip()
+            if texts[tc]:
+                row_data.append(texts[tc])
+        if row_data:
+            lines.append("\t".join(row_data))
+    return lines
+
+
+def _document_part(archive: zipfile.ZipFile) -> str:
+    try:
+        rels = etree.fromstring(archive.read("_rels/.rels"))
+        for rel in rels.iter(PACKAGE_RELS):
+            if rel.get("Type") == OFFICE_DOCUMENT:
+                return posixpath.normpath(rel.get("Target").lstrip("/"))
+    except KeyError:
+        pass
+    return "word/document.xml"
+
+
+def extract_docx_text(source: Union[bytes, str, io.IOBase], legacy_order: bool = False) -> str:
+    """
+    Stream the main document part with iterparse, keeping only the current top-level paragraph or table
+    in memory. Body paragraphs and top-level tables are emitted in document order; legacy_order=True
+    puts all paragraphs first and the tables after them, exactly like extract_text_and_tables.
+    """
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    paragraphs: List[str] = []
+    tables: List[str] = []
+    with zipfile.ZipFile(source) as archive:
+        with archive.open(_document_part(archive)) as part:
+            # Same parser options as python-docx, so whitespace handling is identical
+            for _, elem in etree.iterparse(part, events=("end",), tag=(P, TBL),
+                                           remove_blank_text=True, resolve_entities=False):
+                parent = elem.getparent()
+                if parent is None or parent.tag != BODY:
+                    continue
+                if elem.tag == P:
+                    text = paragraph_text(elem).strip()
+                    if text:
+                        paragraphs.append(text)
+                else:
+                    (tables if legacy_order else paragraphs).extend(table_lines(elem))
+                elem.clear(keep_tail=True)
+                while elem.getprevious() is not None:
+                    del parent[0]
+    return "\n".join(paragraphs + tables)
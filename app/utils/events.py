@@ -0,0 +1,120 @@
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Awaitable, Callable, Dict, Optional, Set
+
+from app.core.config import settings
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # redis is optional; without it other workers are reached by polling Mongo
+    aioredis = None
+
+CHANNEL_PREFIX = "taas:events:"
+
+
+class EventNotifier:
+    """
+    In-process waiter registry keyed by topic (e.g. "quiz:<candidate_id>").
+    publish() wakes local waiters immediately and, when Redis is configured, fans the event out
+    to every other worker through pub/sub. Waiters always re-check the source of truth (Mongo)
+    at least every EVENTS_POLL_INTERVAL seconds, which covers workers Redis cannot reach.
+    """
+
+    def __init__(self):
+        self._waiters: Dict[str, Set[asyncio.Future]] = defaultdict(set)
+        self._redis = None
+        self._redis_loop = None
+        self._listener: Optional[asyncio.Task] = None
+
+    def _wake(self, topic: str):
+        for future in self._waiters.pop(topic, set()):
+            if not future.done():
+                future.set_result(None)
+
+    def _get_redis(self):
+        if aioredis is None or not settings.EVENTS_REDIS_ENABLED or not settings.REDIS_URL:
+            return None
+        loop = asyncio.get_running_loop()
+        if self._redis is None or self._redis_loop is not loop:
+            self._redis = aioredis.from_url(settings.REDIS_URL)
+            self._redis_loop = loop
+            self._listener = None
+        return self._redis
+
+    async def _listen(self, client):
+        try:
+            pubsub = client.pubsub()
+            await pubsub.psubscribe(f"{CHANNEL_PREFIX}*")
+            async for message in pubsub.listen():
+                if message.get("type") == "pmessage":
+                    channel = message["channel"]
+                    if isinstance(channel, bytes):
+                        channel = channel.decode()
+                    self._wake(channel[len(CHANNEL_PREFIX):])
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logging.exception("Event listener stopped; falling back to polling")
+            self._listener = None
+
+    def _ensure_listener(self):
+        client = self._get_redis()
+        if client is not None and (self._listener is None or self._listener.done()):
+            self._listener = asyncio.ensure_future(self._listen(client))
+
+    async def publish(self, topic: str):
+        self._wake(topic)
+        client = self._get_redis()
+        if client is not None:
+            try:
+                await client.publish(f"{CHANNEL_PREFIX}{topic}", "1")
+            except Exception:
+                logging.exception(f"Failed to publish event {topic}")
+
+    async def wait(self, topic: str, timeout: float) -> bool:
+        """Wait for the next event on `topic`; returns False on timeout."""
+        self._ensure_listener()
+        future = asyncio.get_running_loop().create_future()
+        self._waiters[topic].add(future)
+        try:
+            await asyncio.wait_for(future, timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            waiters = self._waiters.get(topic)
+            if waiters is not None:
+                waiters.discard(future)
+                if not waiters:
+                    self._waiters.pop(topic, None)
+
+    async def wait_until(self, topic: str, check: Callable[[], Awaitable], timeout: float):
+        """
+        Return the first truthy result of `check()`, re-checking on every event for `topic`
+        and at least every EVENTS_POLL_INTERVAL seconds. Returns the last result on timeout.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            result = await check()
+            remaining = deadline - loop.time()
+            if result or remaining <= 0:
+                return result
+            await self.wait(topic, min(remaining, settings.EVENTS_POLL_INTERVAL))
+
+
+notifier = EventNotifier()
+
+
+def quiz_topic(candidate_id: str) -> str:
+    return f"quiz:{candidate_id}"
+
+
+def answers_topic(candidate_id: str) -> str:
+    return f"answers:{candidate_id}"
+
+
+def upload_topic(candidate_id: str) -> str:
+    """Stages of an upload in async mode: resume analysis and each quiz section."""
+    return f"upload:{candidate_id}"
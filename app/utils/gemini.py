@@ -0,0 +1,227 @@
+import copy
+import httpx
+import logging
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+from google import genai
+from google.genai import types
+from google.genai.errors import ClientError
+
+from app.core.config import settings
+from app.utils.llm_cache import llm_cache, make_cache_key, transcript_cache
+from app.utils.llm_scheduler import INTERACTIVE, llm_scheduler, estimate_tokens
+from app.utils.llm_resilience import CircuitOpenError, call_with_policy, get_breaker, get_policy, is_retryable, resilience_stats
+from app.utils.llm_routing import apply_thinking_budget, get_route
+
+_client: Optional[genai.Client] = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key onto one in-flight task.
+    The shared task is shielded, so a caller that disconnects does not cancel it for the others.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.counters = {"leaders": 0, "coalesced": 0}
+
+    async def do(self, key: str, factory: Callable[[], Awaitable]):
+        task = self._inflight.get(key)
+        if task is not None and not task.done():
+            self.counters["coalesced"] += 1
+            return copy.deepcopy(await asyncio.shield(task))
+
+        self.counters["leaders"] += 1
+        task = asyncio.ensure_future(factory())
+        self._inflight[key] = task
+
+        def _forget(done: asyncio.Task):
+            if self._inflight.get(key) is done:
+                del self._inflight[key]
+
+        task.add_done_callback(_forget)
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict:
+        return {**self.counters, "inflight": len(self._inflight)}
+
+
+single_flight = SingleFlight()
+fallback_counters = {"fallbacks": 0}
+# Token usage reported by Gemini, per model.
+usage_counters: Dict[str, Dict[str, int]] = {}
+
+
+def _record_usage(model: str, usage):
+    counters = usage_counters.setdefault(model, {"calls": 0, "prompt": 0, "output": 0, "thoughts": 0, "total": 0})
+    counters["calls"] += 1
+    counters["prompt"] += usage.prompt_token_count or 0
+    counters["output"] += usage.candidates_token_count or 0
+    counters["thoughts"] += usage.thoughts_token_count or 0
+    counters["total"] += usage.total_token_count or 0
+
+
+def get_gemini_client() -> genai.Client:
+    """Lazily create one pooled genai.Client per process (after fork) and reuse it."""
+    global _client
+    if _client is None:
+        limits = httpx.Limits(
+            max_connections=settings.GEMINI_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.GEMINI_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.GEMINI_KEEPALIVE_EXPIRY,
+        )
+        _client = genai.Client(
+            api_key=settings.GEMINI_API_KEY,
+            http_options=types.HttpOptions(
+                client_args={"limits": limits},
+                async_client_args={"limits": limits},
+            ),
+        )
+    return _client
+
+
+def reset_gemini_client():
+    """Drop the shared client, e.g. in a freshly forked worker process."""
+    global _client
+    _client = None
+
+
+async def _generate_with_policy(model: str, contents, config, priority: int, task: Optional[str],
+                                deadline: Optional[float] = None):
+    client = get_gemini_client()
+    cost = estimate_tokens(contents)
+
+    async def attempt(timeout: float, on_admitted):
+        async with llm_scheduler.slot(priority, cost):
+            on_admitted()
+            try:
+                response = await asyncio.wait_for(
+                    client.aio.models.generate_content(
+                        model=model,
+                        contents=contents,
+                        config=config,
+                    ),
+                    timeout=timeout,
+                )
+            except ClientError as e:
+                if e.code == 429:
+                    llm_scheduler.rate_limited()
+                raise
+
+        usage = getattr(response, "usage_metadata", None)
+        if usage is not None:
+            llm_scheduler.settle(cost, usage.total_token_count or 0)
+            _record_usage(model, usage)
+        return response
+
+    return await call_with_policy(task, get_breaker(model), attempt, deadline=deadline)
+
+
+async def generate_content(contents, config=None, task: Optional[str] = None, model: Optional[str] = None,
+                           priority: int = INTERACTIVE) -> types.GenerateContentResponse:
+    """
+    Run generate_content on the SDK's async surface so the event loop is never blocked.
+    The model and thinking budget come from the task's route unless `model` is given. Each attempt
+    is admitted by the scheduler (priority, RPM/TPM budgets) and the call follows the task's
+    resilience policy; if the primary model is slow, over quota or unhealthy, the route's
+    fallback model is tried.
+    """
+    response, _ = await _generate_with_fallback(contents, config, task, model, priority)
+    return response
+
+
+async def _generate_with_fallback(contents, config, task: Optional[str], model: Optional[str],
+                                  priority: int) -> Tuple[types.GenerateContentResponse, str]:
+    """
+    generate_content, also returning the model that produced the response. The fallback model only
+    gets what is left of the task's deadline, so a request never waits longer than one deadline.
+    """
+    route = get_route(task)
+    deadline_at = time.monotonic() + get_policy(task).deadline
+    candidates = [(model, None)] if model else [(route.model, route.thinking_budget)]
+    if not model and route.fallback_model:
+        candidates.append((route.fallback_model, route.fallback_thinking_budget))
+
+    for index, (candidate, thinking_budget) in enumerate(candidates):
+        try:
+            response = await _generate_with_policy(
+                candidate, contents, apply_thinking_budget(config, thinking_budget), priority, task,
+                deadline=deadline_at - time.monotonic(),
+            )
+            return response, candidate
+        except Exception as e:
+            is_last = index == len(candidates) - 1
+            if is_last or not (is_retryable(e) or isinstance(e, CircuitOpenError)):
+                raise
+            if deadline_at - time.monotonic() <= 0:
+                logging.warning(f"LLM task {task} failed on {candidate} ({e!r}) with no time left for a fallback")
+                raise
+            fallback_counters["fallbacks"] += 1
+            logging.warning(f"LLM task {task} failed on {candidate} ({e!r}), falling back to {candidates[index + 1][0]}")
+
+
+async def upload_file(file, config=None) -> types.File:
+    client = get_gemini_client()
+    return await client.aio.files.upload(file=file, config=config)
+
+
+async def delete_file(name: str):
+    client = get_gemini_client()
+    await client.aio.files.delete(name=name)
+
+
+def _to_plain(parsed):
+    """Turn response.parsed (pydantic models, lists of them or dicts) into plain data."""
+    if isinstance(parsed, list):
+        return [_to_plain(item) for item in parsed]
+    if hasattr(parsed, "model_dump"):
+        return parsed.model_dump()
+    return parsed
+
+
+async def generate_json(prompt: str, response_schema, task: Optional[str] = None, use_cache: bool = True,
+                        priority: int = INTERACTIVE):
+    """
+    Structured-output call returning plain parsed data.
+    Responses are cached by a hash of the task's model, the prompt and the response_schema. Empty
+    results and answers from the fallback model are not cached, so a retry asks the primary model again.
+    """
+    use_cache = use_cache and settings.LLM_CACHE_ENABLED
+    model = get_route(task).model
+    key = make_cache_key(model, prompt, response_schema)
+    if use_cache:
+        cached = await llm_cache.get(key)
+        if cached is not None:
+            return cached
+
+    async def fetch():
+        response, answered_by = await _generate_with_fallback(
+            contents=prompt,
+            config={
+                "response_mime_type": "application/json",
+                "response_schema": response_schema,
+            },
+            task=task,
+            model=None,
+            priority=priority,
+        )
+        data = _to_plain(response.parsed)
+        if use_cache and data and answered_by == model:
+            await llm_cache.set(key, data, model=model)
+        return data
+
+    # Identical prompts already in flight (double submits, retries) share one Gemini call.
+    return await single_flight.do(key, fetch)
+
+
+def llm_stats() -> dict:
+    return {
+        "cache": llm_cache.stats(),
+        "transcript_cache": transcript_cache.stats(),
+        "single_flight": single_flight.stats(),
+        "scheduler": llm_scheduler.stats(),
+        "resilience": {**resilience_stats(), **fallback_counters},
+        "usage": usage_counters,
+    }
@@ -0,0 +1,132 @@
+import os
+import socket
+import asyncio
+import logging
+from typing import Optional
+
+from app.core.config import settings
+from app.services.jobs import JobService, retry_delay
+from app.utils.bulk import run_resume_batch, fail_resume_batch
+from app.utils.common import process_quiz_questions, fail_pending_quiz_sections, process_uploaded_resume, fail_uploaded_resume
+
+# kind -> (handler, called with the same payload once the last attempt has failed)
+JOB_HANDLERS = {
+    "quiz_generation": (process_quiz_questions, fail_pending_quiz_sections),
+    # /upload in async mode: resume analysis followed by quiz generation
+    "resume_pipeline": (process_uploaded_resume, fail_uploaded_resume),
+    # /upload-bulk: every resume of the batch, resumed item by item when retried
+    "resume_batch": (run_resume_batch, fail_resume_batch),
+}
+
+job_service = JobService()
+
+
+def worker_id() -> str:
+    # Evaluated per call: Celery prefork children and uvicorn workers each have their own pid.
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+async def keep_alive(job_id: str, worker: str):
+    """Refresh the job heartbeat until cancelled, so startup recovery leaves the job alone."""
+    while True:
+        await asyncio.sleep(settings.JOB_HEARTBEAT_INTERVAL)
+        try:
+            await job_service.heartbeat(job_id, worker)
+        except Exception:
+            logging.exception(f"Heartbeat failed for job {job_id}")
+
+
+async def run_job(job_id: str) -> Optional[str]:
+    """
+    Claim and run one job. Returns the resulting state ("succeeded", "queued" for a retry, "failed"),
+    or None if the job was not queued (already claimed elsewhere or finished).
+    """
+    worker = worker_id()
+    job = await job_service.claim(job_id, worker)
+    if not job:
+        return None
+    handler, on_failure = JOB_HANDLERS[job["kind"]]
+    heartbeat = asyncio.ensure_future(keep_alive(job_id, worker))
+    try:
+        await handler(**job["payload"])
+        await job_service.complete(job)
+        return "succeeded"
+    except Exception as e:
+        logging.exception(f"Job {job_id} ({job['kind']}) failed on attempt {job['attempts']}")
+        state = await job_service.fail(job, f"{type(e).__name__}: {e}")
+        if state == "failed":
+            await on_failure(**job["payload"])
+        return state
+    finally:
+        heartbeat.cancel()
+
+
+class AsyncioJobExecutor:
+    """Runs jobs as tasks on the API worker's own event loop, at most JOB_MAX_CONCURRENCY at a time."""
+
+    def __init__(self, max_concurrency: int):
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._tasks = set()
+
+    async def submit(self, job_id: str, delay: float = 0):
+        task = asyncio.ensure_future(self._run(job_id, delay))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, job_id: str, delay: float):
+        if delay:
+            await asyncio.sleep(delay)
+        attempts = 0
+        while True:
+            async with self._semaphore:
+                state = await run_job(job_id)
+            if state != "queued":
+                return
+            attempts += 1
+            await asyncio.sleep(retry_delay(attempts))
+
+
+class CeleryJobExecutor:
+    """Sends jobs to the Celery "questions" queue so generation scales independently of the API."""
+
+    async def submit(self, job_id: str, delay: float = 0):
+        from celery_app import celery_app
+        await asyncio.to_thread(celery_app.send_task, "tasks.run_job_task", args=[job_id], countdown=delay or None)
+
+
+_executor = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        if settings.JOB_EXECUTOR == "celery":
+            _executor = CeleryJobExecutor()
+        else:
+            _executor = AsyncioJobExecutor(settings.JOB_MAX_CONCURRENCY)
+    return _executor
+
+
+async def submit_job(kind: str, dedupe_key: str, payload: dict) -> tuple:
+    """Enqueue a job (idempotent per kind and key) and dispatch it if it is new. Returns (job, created)."""
+    job, created = await job_service.enqueue(kind, dedupe_key, payload, settings.JOB_MAX_ATTEMPTS)
+    if created:
+        await get_executor().submit(str(job["_id"]))
+    return job, created
+
+
+async def recover_jobs():
+    """
+    Startup hook: requeue jobs orphaned by a dead worker and dispatch everything still queued, each
+    once its retry backoff has expired. Only the first API process to start within JOB_STALE_AFTER
+    does this, so several uvicorn/gunicorn workers do not each dispatch every job.
+    """
+    await job_service.ensure_indexes()
+    if not await job_service.acquire_lock("job_recovery", worker_id(), settings.JOB_STALE_AFTER):
+        return
+    jobs = await job_service.recover_orphans(settings.JOB_STALE_AFTER)
+    executor = get_executor()
+    for job_id, delay in jobs:
+        await executor.submit(job_id, delay)
+    if jobs:
+        print(f"Dispatched {len(jobs)} queued job(s)")
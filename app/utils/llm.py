@@ -1,18 +1,16 @@
-import os
+import io
 import logging
 import json
 from pydantic import BaseModel,Field
 from typing import List
-from google import genai
-from dotenv import load_dotenv
-from app.core.config import settings
-from pydantic import BaseModel, Field
-import asyncio
+from google.genai import types
 from google.genai.errors import ClientError
-
-load_dotenv()
-
-GEMINI_API_KEY = settings.GEMINI_API_KEY
+from app.core.config import settings
+from app.utils.audio import prepare_audio
+from app.utils.gemini import delete_file, generate_content, generate_json, single_flight, upload_file
+from app.utils.llm_cache import make_audio_cache_key, transcript_cache
+from app.utils.llm_routing import get_route
+from app.utils.llm_scheduler import BACKGROUND, INTERACTIVE
 
 
 class AnalyzeRessume(BaseModel):
@@ -24,6 +22,7 @@ class AnalyzeRessume(BaseModel):
 
 
 class KeyMetrics(BaseModel):
+    # Measured locally where possible (app/utils/speech_metrics.py); the model's estimates fill the gaps
     response_time: int = Field(description="Response time in seconds")
     filler_words: int = Field(description="Count of filler words")
     speech_rate: int = Field(description="Words per minute (wpm)")
@@ -37,7 +36,7 @@ class AnalyzeAnswer(BaseModel):
     key_metrics: KeyMetrics
     feedback: List[str] = Field(description="Feedback on communication performance")
 
-async def analyze_resume_with_gemini(job_description: str, resume_content: str):
+async def analyze_resume_with_gemini(job_description: str, resume_content: str, priority: int = INTERACTIVE):
     try:
         system_prompt = f"""
             You are an AI Resume-to-Job Matcher.  
@@ -59,20 +58,12 @@ async def analyze_resume_with_gemini(job_description: str, resume_content: str):
             Return only the JSON object in the exact format described above, without additional commentary.
         """
         
-        client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
-        response = client.models.generate_content(
-            model="gemini-2.5-pro",
-            contents=system_prompt,
-            config={
-                "response_mime_type": "application/json",
-                "response_schema": list[AnalyzeRessume],
-            },
-            # config=types.GenerateContentConfig(
-            #     thinking_config=types.ThinkingConfig(thinking_budget=0) # Disables thinking
-            # ),
+        data = await generate_json(
+            prompt=system_prompt,
+            response_schema=list[AnalyzeRessume],
+            task="resume_match",
+            priority=priority,
         )
-        event = response.parsed
-        data = [analyze.model_dump() for analyze in event]
         event_dict = data[0]
         return event_dict       
     except ClientError as e:
@@ -82,7 +73,7 @@ async def analyze_resume_with_gemini(job_description: str, resume_content: str):
         logging.exception("Exception occurred in analyze_resume_with_gemini")
         raise 
     
-async def analyze_answer_with_gemini(answer_obj:dict):
+async def analyze_answer_with_gemini(answer_obj:dict, key_metrics: dict = None):
     try:
         system_prompt = """
             You are an AI evaluator that analyzes communication performance across multiple questions and answers.
@@ -116,56 +107,94 @@ async def analyze_answer_with_gemini(answer_obj:dict):
             "clarity": 92,
             "professionalism": 97,
             "key_metrics": {
-                "response_time": "2.3s",
+                "response_time": 2,
                 "filler_words": 3,
-                "speech_rate": "145 wpm",
+                "speech_rate": 145,
                 "confidence_level": "High"
             },
             "feedback": [
                 "Clear and articulate communication",
-                "Professional tone throughout",
-                "Good use of examples and specifics",
-                "Confident delivery"
+                "Professional tone throughout"
             ]
             }
         """
 
         system_prompt += f"Input: {json.dumps(answer_obj)}"
-        client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
-        response = client.models.generate_content(
-            model="gemini-2.5-pro",
-            contents=system_prompt,
-            config={
-                "response_mime_type": "application/json",
-                "response_schema": list[AnalyzeAnswer],
-            },
-            # config=types.GenerateContentConfig(
-            #     thinking_config=types.ThinkingConfig(thinking_budget=0) # Disables thinking
-            # ),
+        data = await generate_json(
+            prompt=system_prompt,
+            response_schema=list[AnalyzeAnswer],
+            task="answer_analysis",
         )
-        event = response.parsed
-        data = [analyze.model_dump() for analyze in event]
         event_dict = data[0]
-        return event_dict
+        # Values measured from the audio and transcripts replace the model's estimates; those that could
+        # not be measured (no timing without ffmpeg) keep the estimate. A new dict, so the (possibly
+        # cached) model result is never modified.
+        measured = {name: value for name, value in (key_metrics or {}).items() if value is not None}
+        return {**event_dict, "key_metrics": {**(event_dict.get("key_metrics") or {}), **measured}}
     
     except:
         logging.exception("Exception occurred in analyze_resume_with_gemini")
         return None
-    
-async def transcribe_audio(audio_file_path: str):
+
+async def transcribe_audio(audio: bytes, mime_type: str = "audio/mpeg"):
+    """
+    Transcribe a clip, returning (text, timing). Identical audio (same content hash and model)
+    reuses the stored transcript and skips preprocessing, upload and generation entirely.
+    """
+    if not settings.TRANSCRIPT_CACHE_ENABLED:
+        return await _transcribe_clip(audio, mime_type)
+
+    model = get_route("transcription").model
+    key = make_audio_cache_key(model, audio)
+    cached = await transcript_cache.get(key)
+    if cached is not None:
+        return cached["text"], cached["timing"]
+
+    async def fetch():
+        text, timing = await _transcribe_clip(audio, mime_type)
+        result = {"text": text, "timing": timing}
+        if text:
+            await transcript_cache.set(key, result, model=model)
+        return result
+
+    # The same clip submitted twice at once (client retry) is transcribed only once.
+    result = await single_flight.do(key, fetch)
+    return result["text"], result["timing"]
+
+
+async def _transcribe_clip(audio: bytes, mime_type: str):
+    """
+    Preprocess a clip and transcribe it straight from memory: small clips go inline with the request,
+    larger ones through the Files API, and the uploaded file is deleted afterwards.
+    Returns the transcript and the clip timing measured during preprocessing (None if unavailable).
+    """
+    uploaded = None
     try:
-        client = genai.Client(api_key=GEMINI_API_KEY)
-        audio_part = client.files.upload(file=audio_file_path)
+        audio, mime_type, timing = await prepare_audio(audio, mime_type)
+        if len(audio) <= settings.TRANSCRIBE_INLINE_MAX_BYTES:
+            audio_part = types.Part.from_bytes(data=audio, mime_type=mime_type)
+        else:
+            uploaded = await upload_file(
+                file=io.BytesIO(audio),
+                config=types.UploadFileConfig(mime_type=mime_type),
+            )
+            audio_part = uploaded
 
         prompt = "Transcribe this audio clip."
 
-        response = client.models.generate_content(
-            model="gemini-2.5-pro", 
-            contents=[prompt, audio_part]
+        response = await generate_content(
+            contents=[prompt, audio_part],
+            task="transcription",
         )
-        return response.text
+        return response.text, timing
     except Exception as e:
         raise
+    finally:
+        if uploaded is not None:
+            try:
+                await delete_file(uploaded.name)
+            except Exception:
+                logging.exception(f"Failed to delete uploaded audio {uploaded.name}")
 
 
 async def generate_quiz_with_gemini(job_description: str, resume_content: str):
@@ -220,17 +249,12 @@ async def generate_quiz_with_gemini(job_description: str, resume_content: str):
         class QuizResponse(BaseModel):
             quiz: List[QuizQuestion] = Field(description="List of quiz questions")
 
-        client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
-        response = client.models.generate_content(
-            model="gemini-2.5-pro",
-            contents=system_prompt,
-            config={
-            "response_mime_type": "application/json",
-            "response_schema": list[QuizResponse],
-            },
+        data = await generate_json(
+            prompt=system_prompt,
+            response_schema=list[QuizResponse],
+            priority=BACKGROUND,
+            task="mcq_generation",
         )
-        event = response.parsed
-        data = [quiz.model_dump() for quiz in event]
         event_dict = data[0]
         return event_dict
     except:
@@ -328,17 +352,12 @@ async def generate_interview_questions(job_description: str, resume_content: str
         class InterviewQAResponse(BaseModel):
             questions: List[InterviewQA] = Field(description="List of interview questions and answers")
 
-        client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
-        response = client.models.generate_content(
-            model="gemini-2.5-pro",
-            contents=system_prompt,
-            config={
-                "response_mime_type": "application/json",
-                "response_schema": list[InterviewQAResponse],
-            },
+        data = await generate_json(
+            prompt=system_prompt,
+            response_schema=list[InterviewQAResponse],
+            priority=BACKGROUND,
+            task="coding_questions",
         )
-        event = response.parsed
-        data = [qa.model_dump() for qa in event]
         event_dict = data[0]
         return event_dict
     except Exception:
@@ -422,17 +441,12 @@ async def generate_interview_text_questions_questions(job_description: str, resu
         class InterviewQAResponse(BaseModel):
             questions: List[InterviewQA] = Field(description="List of interview questions and answers")
 
-        client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
-        response = client.models.generate_content(
-            model="gemini-2.5-pro",
-            contents=system_prompt,
-            config={
-                "response_mime_type": "application/json",
-                "response_schema": list[InterviewQAResponse],
-            },
+        data = await generate_json(
+            prompt=system_prompt,
+            response_schema=list[InterviewQAResponse],
+            priority=BACKGROUND,
+            task="text_questions",
         )
-        event = response.parsed
-        data = [qa.model_dump() for qa in event]
         event_dict = data[0]
         return event_dict
     except Exception:
@@ -470,23 +484,85 @@ async def score_interview_answer(question: str, user_answer: str):
 
         """
 
-        client = genai.Client(api_key=GEMINI_API_KEY)
-
-        response = client.models.generate_content(
-            model="gemini-2.5-pro",
-            contents=system_prompt,
-            config={
-                "response_mime_type": "application/json",
-                "response_schema": {
-                    "type": "object",
-                    "properties": {"overall_score": {"type": "number"}},
-                    "required": ["overall_score"],
-                },
+        return await generate_json(
+            prompt=system_prompt,
+            response_schema={
+                "type": "object",
+                "properties": {"overall_score": {"type": "number"}},
+                "required": ["overall_score"],
             },
-        )
-
-        return response.parsed  # dict like {"overall_score": 85.3}
+            task="answer_scoring",
+        )  # dict like {"overall_score": 85.3}
 
     except Exception:
         logging.exception("Exception occurred in score_interview_answer")
         return None
+
+
+# Fused generation: one structured call returns the MCQ, coding and text question sets,
+# so the job description and resume are only sent (and billed) once.
+
+async def generate_all_questions_with_gemini(job_description: str, resume_content: str):
+    """Returns (quiz_response, interview_questions, text_questions) shaped like the three separate generators."""
+    try:
+        system_prompt = f"""
+            You are an AI Interview Assessment Generator for technical recruiting.
+            Analyze the job description and the candidate's resume below, then return ONE JSON object with three sections.
+
+            ### Section "quiz" - 10 multiple-choice questions
+            - Exactly 10 questions, each with 4 options and only 1 correct answer ("correct_answer" must equal one of the options).
+            - Relevant to the job description and resume content.
+            - Frame ALL questions in second person ("you", "your") as if directly asking the candidate,
+              e.g. "What would you choose...", "How would you approach...", "Which option would you select...".
+
+            ### Section "coding_questions" - 5 technical interview questions with answers
+            - Each from a DIFFERENT category: System Design, Code Review, Problem Solving, Database Design, Performance Optimization.
+            - Match the seniority of the role, reference the candidate's actual projects or technologies when relevant,
+              and increase in complexity.
+            - Answers: 4-6 substantive sentences, direct answer first, then details, best practices and pitfalls.
+
+            ### Section "text_questions" - 5 experience-based questions with answers
+            - Each must relate to skills, technologies or experiences present in BOTH the resume and the job description,
+              referencing actual projects, roles or achievements from the resume.
+            - Avoid generic questions ("Tell me about yourself"), yes/no questions and buzzwords without substance.
+            - Answers: 3-5 sentences in first person, STAR format where applicable, with concrete examples and metrics.
+
+            ### Input
+            Job Description:
+            {job_description}
+
+            Candidate Resume:
+            {resume_content}
+
+            ### Output
+            Return only the JSON object with the keys "quiz", "coding_questions" and "text_questions", without additional commentary.
+        """
+
+        class QuizQuestion(BaseModel):
+            question: str = Field(description="Quiz question text")
+            options: List[str] = Field(description="List of 4 options")
+            correct_answer: str = Field(description="Correct answer for the question")
+
+        class InterviewQA(BaseModel):
+            question: str = Field(description="Interview question text")
+            answer: str = Field(description="Answer to the interview question")
+
+        class FusedQuestionsResponse(BaseModel):
+            quiz: List[QuizQuestion] = Field(description="List of 10 multiple-choice quiz questions")
+            coding_questions: List[InterviewQA] = Field(description="List of 5 technical interview questions and answers")
+            text_questions: List[InterviewQA] = Field(description="List of 5 experience-based interview questions and answers")
+
+        data = await generate_json(
+            prompt=system_prompt,
+            response_schema=FusedQuestionsResponse,
+            priority=BACKGROUND,
+            task="fused_questions",
+        )
+        return (
+            {"quiz": data["quiz"]},
+            {"questions": data["coding_questions"]},
+            {"questions": data["text_questions"]},
+        )
+    except Exception:
+        logging.exception("Exception occurred in generate_all_questions_with_gemini")
+        return None, None, None
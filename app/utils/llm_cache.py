@@ -0,0 +1,128 @@
+import copy
+import json
+import hashlib
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Optional
+
+from cachetools import TTLCache
+from pydantic import TypeAdapter
+
+from app.core.config import settings
+from app.utils.mongo import get_db
+
+
+def schema_fingerprint(response_schema) -> Any:
+    """JSON-serialisable form of a response_schema (pydantic type or plain dict)."""
+    if response_schema is None or isinstance(response_schema, dict):
+        return response_schema
+    return TypeAdapter(response_schema).json_schema()
+
+
+def make_cache_key(model: str, prompt: str, response_schema=None) -> str:
+    payload = json.dumps(
+        {"model": model, "prompt": prompt, "schema": schema_fingerprint(response_schema)},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def make_audio_cache_key(model: str, audio: bytes) -> str:
+    """Key for a transcript: the audio content hash plus the transcription model."""
+    return hashlib.sha256(f"{model}:".encode("utf-8") + hashlib.sha256(audio).digest()).hexdigest()
+
+
+class LLMCache:
+    """
+    Two-tier cache for LLM responses keyed by a content hash.
+    Values must be JSON/BSON friendly (dicts, lists, strings, numbers).
+    """
+
+    def __init__(self, maxsize: int, ttl: int, persistent: bool = False,
+                 persistent_ttl: int = 0, collection: Optional[str] = None):
+        self._memory = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.persistent = persistent and bool(collection)
+        self.persistent_ttl = persistent_ttl
+        self.collection = collection
+        self._index_ready = False
+        self.counters = {"memory_hits": 0, "persistent_hits": 0, "misses": 0, "stores": 0}
+
+    def _collection(self):
+        return get_db()[self.collection]
+
+    async def _ensure_index(self):
+        if not self._index_ready:
+            await self._collection().create_index("expires_at", expireAfterSeconds=0)
+            self._index_ready = True
+
+    async def get(self, key: str):
+        value = self._memory.get(key)
+        if value is not None:
+            self.counters["memory_hits"] += 1
+            return copy.deepcopy(value)
+
+        if self.persistent:
+            try:
+                doc = await self._collection().find_one(
+                    {"_id": key, "expires_at": {"$gt": datetime.utcnow()}},
+                    {"value": 1},
+                )
+                if doc is not None:
+                    self.counters["persistent_hits"] += 1
+                    self._memory[key] = copy.deepcopy(doc["value"])
+                    return copy.deepcopy(doc["value"])
+            except Exception:
+                logging.exception("LLM cache lookup failed")
+
+        self.counters["misses"] += 1
+        return None
+
+    async def set(self, key: str, value, **meta):
+        if value is None:
+            return
+        self._memory[key] = copy.deepcopy(value)
+        self.counters["stores"] += 1
+
+        if self.persistent:
+            try:
+                await self._ensure_index()
+                now = datetime.utcnow()
+                await self._collection().update_one(
+                    {"_id": key},
+                    {"$set": {
+                        "value": value,
+                        "created_at": now,
+                        "expires_at": now + timedelta(seconds=self.persistent_ttl),
+                        **meta,
+                    }},
+                    upsert=True,
+                )
+            except Exception:
+                logging.exception("LLM cache store failed")
+
+    def stats(self) -> dict:
+        lookups = self.counters["memory_hits"] + self.counters["persistent_hits"] + self.counters["misses"]
+        hits = lookups - self.counters["misses"]
+        return {
+            **self.counters,
+            "size": len(self._memory),
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+llm_cache = LLMCache(
+    maxsize=settings.LLM_CACHE_MAXSIZE,
+    ttl=settings.LLM_CACHE_TTL,
+    persistent=settings.LLM_CACHE_PERSISTENT,
+    persistent_ttl=settings.LLM_CACHE_PERSISTENT_TTL,
+    collection=settings.LLM_CACHE_COLLECTION,
+)
+
+transcript_cache = LLMCache(
+    maxsize=settings.TRANSCRIPT_CACHE_MAXSIZE,
+    ttl=settings.TRANSCRIPT_CACHE_TTL,
+    persistent=settings.TRANSCRIPT_CACHE_PERSISTENT,
+    persistent_ttl=settings.TRANSCRIPT_CACHE_RETENTION,
+    collection=settings.TRANSCRIPT_CACHE_COLLECTION,
+)
@@ -0,0 +1,251 @@
+import time
+import random
+import asyncio
+import logging
+from collections import deque
+from dataclasses import dataclass, replace
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+import httpx
+from google.genai.errors import ClientError, ServerError
+
+from app.core.config import settings
+
+
+class CircuitOpenError(Exception):
+    """Raised without calling upstream while the circuit breaker is open."""
+
+
+@dataclass(frozen=True)
+class ResiliencePolicy:
+    timeout: float = 60.0            # per-attempt deadline (seconds)
+    deadline: float = 180.0          # overall deadline including retries and backoff
+    retries: int = 2                 # extra attempts after the first one
+    backoff_base: float = 1.0
+    backoff_max: float = 20.0
+    hedge: bool = False              # send a duplicate request when the first one is slow
+    hedge_after: float = 30.0        # hedge delay until enough latency samples exist for a p95
+    hedge_min_samples: int = 20
+
+
+# Defaults per LLM task; LLM_POLICIES in settings overrides individual fields.
+DEFAULT_POLICIES: Dict[str, ResiliencePolicy] = {
+    "default": ResiliencePolicy(),
+    "resume_match": ResiliencePolicy(timeout=60, deadline=120, retries=2, hedge=True, hedge_after=30),
+    "answer_scoring": ResiliencePolicy(timeout=30, deadline=60, retries=2, hedge=True, hedge_after=15),
+    "answer_analysis": ResiliencePolicy(timeout=60, deadline=120, retries=2),
+    "transcription": ResiliencePolicy(timeout=60, deadline=120, retries=2, hedge=True, hedge_after=20),
+    "mcq_generation": ResiliencePolicy(timeout=120, deadline=600, retries=4, backoff_max=60),
+    "coding_questions": ResiliencePolicy(timeout=120, deadline=600, retries=4, backoff_max=60),
+    "text_questions": ResiliencePolicy(timeout=120, deadline=600, retries=4, backoff_max=60),
+    "fused_questions": ResiliencePolicy(timeout=180, deadline=600, retries=3, backoff_max=60),
+}
+
+
+def get_policy(task: Optional[str]) -> ResiliencePolicy:
+    policy = DEFAULT_POLICIES.get(task or "default", DEFAULT_POLICIES["default"])
+    overrides = settings.LLM_POLICIES.get(task or "default")
+    if overrides:
+        policy = replace(policy, **overrides)
+    return policy
+
+
+def is_retryable(error: BaseException) -> bool:
+    if isinstance(error, (asyncio.TimeoutError, httpx.TransportError, ServerError)):
+        return True
+    if isinstance(error, ClientError):
+        return error.code in (408, 429)
+    return False
+
+
+class CircuitBreaker:
+    """
+    closed -> open after `failure_threshold` consecutive failures; open -> half-open after
+    `reset_timeout`, letting a single probe through; the probe's outcome closes or reopens it.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probe_started = None
+
+    def allow(self) -> bool:
+        now = time.monotonic()
+        if self.state == "open" and now - self._opened_at >= self.reset_timeout:
+            self.state = "half_open"
+            self._probe_started = None
+        if self.state == "closed":
+            return True
+        # A probe that never reported back (e.g. its caller was cancelled) is replaced after reset_timeout.
+        if self.state == "half_open" and (self._probe_started is None or now - self._probe_started >= self.reset_timeout):
+            self._probe_started = now
+            return True
+        return False
+
+    def record_success(self):
+        self.state = "closed"
+        self.failures = 0
+        self._probe_started = None
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            if self.state != "open":
+                logging.warning(f"Circuit breaker for {self.name} opened after {self.failures} failures")
+            self.state = "open"
+            self._opened_at = time.monotonic()
+            self._probe_started = None
+
+    def stats(self) -> dict:
+        return {"state": self.state, "failures": self.failures}
+
+
+class LatencyTracker:
+    """Rolling window of successful call latencies, used to pick the hedge delay."""
+
+    def __init__(self, window: int = 200):
+        self._samples = deque(maxlen=window)
+
+    def add(self, seconds: float):
+        self._samples.append(seconds)
+
+    def p95(self) -> Optional[float]:
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+    def __len__(self):
+        return len(self._samples)
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_latencies: Dict[str, LatencyTracker] = {}
+counters = {"attempts": 0, "retries": 0, "timeouts": 0, "hedged": 0, "hedge_wins": 0, "short_circuited": 0}
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    breaker = _breakers.get(name)
+    if breaker is None:
+        breaker = _breakers[name] = CircuitBreaker(
+            name,
+            failure_threshold=settings.LLM_BREAKER_FAILURE_THRESHOLD,
+            reset_timeout=settings.LLM_BREAKER_RESET_TIMEOUT,
+        )
+    return breaker
+
+
+def _backoff(policy: ResiliencePolicy, attempt: int) -> float:
+    # Full jitter: uniform between 0 and the capped exponential step.
+    return random.uniform(0, min(policy.backoff_max, policy.backoff_base * (2 ** attempt)))
+
+
+async def _hedged(task: str, policy: ResiliencePolicy, factory: Callable[[Callable[[], None]], Awaitable]) -> Tuple[object, float]:
+    """
+    Run one attempt; if it runs slower than the task's p95 once the scheduler has admitted it, race a
+    duplicate against it. Returns the result and how long the winning attempt ran after admission.
+    """
+    tracker = _latencies.setdefault(task, LatencyTracker())
+    p95 = tracker.p95() if len(tracker) >= policy.hedge_min_samples else None
+    hedge_after = p95 if p95 is not None else policy.hedge_after
+    admitted_at = {}
+
+    def launch():
+        admitted = asyncio.Event()
+
+        def on_admitted():
+            admitted_at[future] = time.monotonic()
+            admitted.set()
+
+        future = asyncio.ensure_future(factory(on_admitted))
+        admitted_at[future] = time.monotonic()
+        return future, admitted
+
+    primary, primary_admitted = launch()
+    pending = {primary}
+    try:
+        if policy.hedge:
+            # Time queued for a scheduler slot never counts toward the hedge delay: a throttled queue
+            # would otherwise send duplicates into the very rate limit that made it wait.
+            admission = asyncio.ensure_future(primary_admitted.wait())
+            try:
+                await asyncio.wait({primary, admission}, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                admission.cancel()
+            if not primary.done():
+                done, _ = await asyncio.wait(pending, timeout=hedge_after)
+                if not done:
+                    counters["hedged"] += 1
+                    pending.add(launch()[0])
+
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for finished in done:
+                if finished.exception() is None:
+                    if finished is not primary:
+                        counters["hedge_wins"] += 1
+                    return finished.result(), time.monotonic() - admitted_at[finished]
+            if not pending:
+                raise done.pop().exception()
+    finally:
+        for leftover in pending:
+            leftover.cancel()
+
+
+async def call_with_policy(task: Optional[str], breaker: CircuitBreaker,
+                           factory: Callable[[float, Callable[[], None]], Awaitable], deadline: Optional[float] = None):
+    """
+    Run `factory(timeout, on_admitted)` under the task's policy: jittered exponential retries and
+    optional hedging, bounded by an overall deadline and guarded by the circuit breaker. The factory
+    applies the per-attempt timeout itself and calls on_admitted once it holds a scheduler slot, so
+    time spent queueing counts neither toward the timeout, the hedge delay nor the latency p95.
+    `deadline` overrides the policy's overall deadline, e.g. with what is left of it for a fallback.
+    """
+    task = task or "default"
+    policy = get_policy(task)
+    tracker = _latencies.setdefault(task, LatencyTracker())
+
+    async def attempt(on_admitted):
+        counters["attempts"] += 1
+        return await factory(policy.timeout, on_admitted)
+
+    async def run():
+        for attempt_no in range(policy.retries + 1):
+            if not breaker.allow():
+                counters["short_circuited"] += 1
+                raise CircuitOpenError(f"Circuit breaker for {breaker.name} is open")
+
+            try:
+                result, latency = await _hedged(task, policy, attempt)
+            except Exception as e:
+                if isinstance(e, asyncio.TimeoutError):
+                    counters["timeouts"] += 1
+                if not is_retryable(e):
+                    # Upstream answered (e.g. a 400), so it is healthy as far as the breaker is concerned.
+                    breaker.record_success()
+                    raise
+                breaker.record_failure()
+                if attempt_no == policy.retries:
+                    raise
+                counters["retries"] += 1
+                logging.warning(f"LLM task {task} attempt {attempt_no + 1} failed ({e!r}), retrying")
+                await asyncio.sleep(_backoff(policy, attempt_no))
+                continue
+
+            breaker.record_success()
+            tracker.add(latency)
+            return result
+
+    return await asyncio.wait_for(run(), timeout=policy.deadline if deadline is None else deadline)
+
+
+def resilience_stats() -> dict:
+    return {
+        **counters,
+        "breakers": {name: breaker.stats() for name, breaker in _breakers.items()},
+        "p95": {name: round(t.p95(), 3) for name, t in _latencies.items() if t.p95() is not None},
+    }
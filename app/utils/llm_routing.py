@@ -0,0 +1,31 @@
+from dataclasses import dataclass
+from typing import Optional
+
+from app.core.config import settings
+
+
+@dataclass(frozen=True)
+class TaskRoute:
+    model: str
+    thinking_budget: Optional[int] = None
+    fallback_model: Optional[str] = None
+    fallback_thinking_budget: Optional[int] = None
+
+
+def get_route(task: Optional[str]) -> TaskRoute:
+    """Resolve the model, thinking budget and fallback for an LLM task from settings."""
+    route = {
+        **settings.LLM_TASK_ROUTES.get(task, {}),
+        **settings.LLM_TASK_ROUTE_OVERRIDES.get(task, {}),
+    }
+    route.setdefault("model", settings.LLM_DEFAULT_MODEL)
+    return TaskRoute(**route)
+
+
+def apply_thinking_budget(config: Optional[dict], thinking_budget: Optional[int]) -> Optional[dict]:
+    """Return a copy of the generate_content config with the thinking budget set, if any."""
+    if thinking_budget is None:
+        return config
+    config = dict(config or {})
+    config["thinking_config"] = {"thinking_budget": thinking_budget}
+    return config
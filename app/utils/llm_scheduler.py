@@ -0,0 +1,166 @@
+import time
+import heapq
+import asyncio
+import itertools
+from contextlib import asynccontextmanager
+
+from app.core.config import settings
+
+# Priority classes: lower value is served first.
+INTERACTIVE = 0
+BACKGROUND = 1
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at `per_minute`; a budget of 0 means unlimited."""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self._updated = time.monotonic()
+
+    @property
+    def unlimited(self) -> bool:
+        return self.capacity <= 0
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def delay(self, amount: float, reserve: float = 0.0) -> float:
+        """Seconds until `amount` can be taken while leaving `reserve` (fraction of capacity) untouched."""
+        if self.unlimited:
+            return 0.0
+        self._refill()
+        # A single request larger than the whole budget would otherwise never be admitted.
+        need = min(amount + reserve * self.capacity, self.capacity)
+        if self.level >= need:
+            return 0.0
+        return (need - self.level) / self.rate
+
+    def take(self, amount: float):
+        if not self.unlimited:
+            self._refill()
+            self.level -= amount
+
+    def drain(self):
+        if not self.unlimited:
+            self._refill()
+            self.level = min(self.level, 0.0)
+
+
+class LLMScheduler:
+    """
+    Admission control in front of every Gemini call: a concurrency limit plus RPM/TPM token buckets.
+    Waiters are served strictly by priority, then FIFO. Background callers may only spend the
+    budget above `background_reserve`, which keeps headroom for interactive calls.
+    """
+
+    def __init__(self, max_concurrency: int, rpm: int, tpm: int, background_reserve: float):
+        self.max_concurrency = max_concurrency
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.background_reserve = background_reserve
+        self._waiters = []
+        self._seq = itertools.count()
+        self._active = 0
+        self._timer = None
+        self.counters = {"admitted": 0, "throttled": 0, "rate_limited": 0}
+
+    def _kick(self):
+        if self._timer is not None:
+            self._timer.cancel()
+        self._dispatch()
+
+    def _dispatch(self):
+        self._timer = None
+        while self._waiters and self._active < self.max_concurrency:
+            priority, _, cost, future = self._waiters[0]
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+
+            reserve = self.background_reserve if priority > INTERACTIVE else 0.0
+            wait = max(self.requests.delay(1, reserve), self.tokens.delay(cost, reserve))
+            if wait > 0:
+                self.counters["throttled"] += 1
+                self._timer = asyncio.get_running_loop().call_later(wait, self._dispatch)
+                return
+
+            heapq.heappop(self._waiters)
+            self.requests.take(1)
+            self.tokens.take(cost)
+            self._active += 1
+            self.counters["admitted"] += 1
+            future.set_result(None)
+
+    async def acquire(self, priority: int = INTERACTIVE, cost: int = 0):
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), cost, future))
+        self._kick()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+
+    def release(self):
+        self._active -= 1
+        self._kick()
+
+    def settle(self, estimated: int, actual: int):
+        """Charge the difference between the estimated and the reported token usage."""
+        if actual:
+            self.tokens.take(actual - estimated)
+
+    def rate_limited(self):
+        """Upstream answered 429: stop admitting until the request budget refills."""
+        self.counters["rate_limited"] += 1
+        self.requests.drain()
+
+    @asynccontextmanager
+    async def slot(self, priority: int = INTERACTIVE, cost: int = 0):
+        await self.acquire(priority, cost)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def stats(self) -> dict:
+        queued = [w for w in self._waiters if not w[3].done()]
+        return {
+            **self.counters,
+            "active": self._active,
+            "queued_interactive": sum(1 for w in queued if w[0] == INTERACTIVE),
+            "queued_background": sum(1 for w in queued if w[0] != INTERACTIVE),
+            "rpm_available": None if self.requests.unlimited else round(self.requests.level, 2),
+            "tpm_available": None if self.tokens.unlimited else round(self.tokens.level),
+        }
+
+
+def estimate_tokens(contents) -> int:
+    """Rough prompt size (about 4 characters per token) plus the expected output allowance."""
+    if isinstance(contents, str):
+        parts = [contents]
+    elif isinstance(contents, (list, tuple)):
+        parts = contents
+    else:
+        parts = [contents]
+    prompt_tokens = 0
+    for part in parts:
+        if isinstance(part, str):
+            prompt_tokens += len(part) // 4
+        else:
+            prompt_tokens += settings.LLM_MEDIA_TOKEN_ESTIMATE
+    return prompt_tokens + settings.LLM_OUTPUT_TOKEN_ESTIMATE
+
+
+llm_scheduler = LLMScheduler(
+    max_concurrency=settings.LLM_MAX_CONCURRENCY,
+    rpm=settings.LLM_RPM,
+    tpm=settings.LLM_TPM,
+    background_reserve=settings.LLM_BACKGROUND_RESERVE,
+)
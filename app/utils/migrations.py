@@ -0,0 +1,66 @@
+"""
+One-off data migrations and backfills. Each is idempotent and safe to run while the API is serving.
+
+    python -m app.utils.migrations quiz-questions       # move embedded analyzed_data.quiz_questions into their own collection
+    python -m app.utils.migrations assessment-summary   # rebuild the dashboard's assessment_summary from candidate and analyzed_data
+"""
+import asyncio
+import logging
+import sys
+
+from app.services.analyzer import AnalyzerService
+from app.utils.mongo import get_db
+from app.utils.mongo_indexes import ensure_indexes
+
+
+async def migrate_quiz_questions() -> int:
+    """
+    Candidates whose embedded quiz was moved. Readers migrate a candidate lazily on a miss too,
+    so this only saves those first requests the extra step.
+    """
+    await ensure_indexes(["quiz_questions"])
+    analyzer_service = AnalyzerService()
+    migrated = 0
+    cursor = get_db().analyzed_data.find({"quiz_questions.0": {"$exists": True}}, {"candidate_id": 1})
+    async for document in cursor:
+        try:
+            if await analyzer_service.migrate_quiz_questions(str(document["candidate_id"])) is not None:
+                migrated += 1
+        except Exception:
+            logging.exception(f"Failed to migrate the quiz of candidate {document['candidate_id']}")
+    return migrated
+
+
+async def backfill_assessment_summary(batch_size: int = 500) -> int:
+    """Rebuild every candidate's assessment_summary document, batch_size candidates per bulk write."""
+    await ensure_indexes(["assessment_summary"])
+    analyzer_service = AnalyzerService()
+    refreshed = 0
+    batch = []
+    async for document in get_db().candidate.find({}, {"_id": 1}):
+        batch.append(document["_id"])
+        if len(batch) >= batch_size:
+            refreshed += await analyzer_service.refresh_assessment_summaries(batch)
+            batch = []
+    if batch:
+        refreshed += await analyzer_service.refresh_assessment_summaries(batch)
+    return refreshed
+
+
+MIGRATIONS = {
+    "quiz-questions": migrate_quiz_questions,
+    "assessment-summary": backfill_assessment_summary,
+}
+
+
+async def _main(command: str) -> int:
+    migration = MIGRATIONS.get(command)
+    if migration is None:
+        print(__doc__)
+        return 2
+    print(f"{command}: {await migration()} candidates")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(_main(sys.argv[1] if len(sys.argv) > 1 else "")))
@@ -12,4 +12,10 @@ def get_db():
         _client = motor.motor_asyncio.AsyncIOMotorClient(settings.MONGO_URI)
         _db = _client[settings.MONGO_DB_NAME]
         print("Connected to MongoDB")
-    return _db
\ No newline at end of file
+    return _db
+
+def reset_db():
+    """Drop the shared client, e.g. in a freshly forked worker process; the next get_db() reconnects."""
+    global _client, _db
+    _client = None
+    _db = None
@@ -0,0 +1,182 @@
+"""
+Index registry: every index the hot queries rely on, per collection.
+
+    python -m app.utils.mongo_indexes create   # create missing indexes
+    python -m app.utils.mongo_indexes verify   # report missing or different indexes
+    python -m app.utils.mongo_indexes check    # explain the hot queries; exit 1 if any plans a COLLSCAN
+"""
+import asyncio
+import logging
+import sys
+from typing import Dict, Iterable, List, Optional
+
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+from app.core.config import settings
+from app.utils.mongo import get_db
+
+INDEXES: Dict[str, List[IndexModel]] = {
+    "candidate": [
+        # get_candidate_by_email / get_existing_emails; only live candidates are looked up
+        IndexModel([("email", ASCENDING)], partialFilterExpression={"is_deleted": False}),
+    ],
+    "assessment_summary": [
+        # Dashboard: one find on user_id, is_deleted and analyzed, sorted by newest first
+        IndexModel([("user_id", ASCENDING), ("is_deleted", ASCENDING), ("analyzed", ASCENDING), ("created_at", DESCENDING)]),
+    ],
+    "analyzed_data": [
+        # Every lookup by candidate_id
+        IndexModel([("candidate_id", ASCENDING)], unique=True),
+    ],
+    "quiz_questions": [
+        # get_quiz_question_by_id / save_score point reads and writes; the prefix serves a candidate's whole quiz
+        IndexModel([("candidate_id", ASCENDING), ("quiz_id", ASCENDING)], unique=True),
+    ],
+    "answer_recordings": [
+        IndexModel([("candidate_id", ASCENDING), ("question_index", ASCENDING)], unique=True),
+    ],
+    "users": [
+        IndexModel([("email", ASCENDING)], unique=True),
+    ],
+    "jobs": [
+        IndexModel([("active_key", ASCENDING)], unique=True, sparse=True),
+        IndexModel([("state", ASCENDING), ("heartbeat_at", ASCENDING)]),
+        IndexModel([("dedupe_key", ASCENDING), ("created_at", DESCENDING)]),
+    ],
+}
+
+_SAMPLE_ID = ObjectId()
+_SAMPLE_EMAIL = "index-check@example.com"
+
+# name -> (collection, find filter and optional sort)
+HOT_QUERIES = {
+    "candidate by email": ("candidate", {"filter": {"email": _SAMPLE_EMAIL, "is_deleted": False}}),
+    "analyzed_data by candidate_id": ("analyzed_data", {"filter": {"candidate_id": _SAMPLE_ID}}),
+    "quiz question": ("quiz_questions", {"filter": {"candidate_id": _SAMPLE_ID, "quiz_id": "sample"}}),
+    "quiz of a candidate": ("quiz_questions", {"filter": {"candidate_id": _SAMPLE_ID, "type": {"$in": ["mcqs_questions"]}}}),
+    "answer recordings": ("answer_recordings", {"filter": {"candidate_id": _SAMPLE_ID}, "sort": [("question_index", 1)]}),
+    "user by email": ("users", {"filter": {"email": _SAMPLE_EMAIL}}),
+    "latest job": ("jobs", {"filter": {"kind": "quiz_generation", "dedupe_key": "sample"}, "sort": [("created_at", -1)]}),
+    "orphaned jobs": ("jobs", {"filter": {"state": "running", "heartbeat_at": {"$lt": _SAMPLE_ID.generation_time}}}),
+    "dashboard": ("assessment_summary", {
+        "filter": {"user_id": _SAMPLE_ID, "is_deleted": False, "analyzed": True}, "sort": [("created_at", -1)],
+    }),
+}
+
+
+def _describe(model: IndexModel) -> dict:
+    spec = dict(model.document)
+    return {
+        "key": list(spec["key"].items()),
+        "unique": bool(spec.get("unique")),
+        "sparse": bool(spec.get("sparse")),
+        "partialFilterExpression": spec.get("partialFilterExpression"),
+    }
+
+
+async def ensure_indexes(collections: Optional[Iterable[str]] = None) -> List[str]:
+    """
+    Create the registry's indexes (existing identical ones are left alone). An index that cannot be
+    built, e.g. a unique index over duplicate data, is logged and returned but never stops startup.
+    """
+    db = get_db()
+    failed = []
+    for collection, models in INDEXES.items():
+        if collections is not None and collection not in collections:
+            continue
+        for model in models:
+            try:
+                await db[collection].create_indexes([model])
+            except OperationFailure as e:
+                name = model.document["name"]
+                logging.error(f"Could not create index {collection}.{name}: {e}")
+                failed.append(f"{collection}.{name}")
+    return failed
+
+
+async def verify_indexes() -> List[str]:
+    """Registry indexes that are missing or differ (keys, unique, sparse, partial filter) from the database."""
+    db = get_db()
+    problems = []
+    for collection, models in INDEXES.items():
+        existing = {}
+        for info in (await db[collection].index_information()).values():
+            existing[tuple(tuple(k) for k in info["key"])] = info
+        for model in models:
+            wanted = _describe(model)
+            info = existing.get(tuple(wanted["key"]))
+            if info is None:
+                problems.append(f"{collection}.{model.document['name']}: missing")
+            elif (bool(info.get("unique")), bool(info.get("sparse")), info.get("partialFilterExpression")) != \
+                    (wanted["unique"], wanted["sparse"], wanted["partialFilterExpression"]):
+                problems.append(f"{collection}.{model.document['name']}: options differ")
+    return problems
+
+
+async def bootstrap_indexes():
+    """Startup hook, per MONGO_INDEXES: "create" builds missing indexes, "verify" only reports them, "off" skips both."""
+    mode = settings.MONGO_INDEXES
+    if mode == "off":
+        return
+    if mode == "create":
+        await ensure_indexes()
+    problems = await verify_indexes()
+    for problem in problems:
+        logging.warning(f"Index check: {problem}")
+    if not problems:
+        print("All registry indexes are in place")
+
+
+def _plan_stages(node, stages: List[str]):
+    """Every plan stage in an explain document."""
+    if isinstance(node, dict):
+        if isinstance(node.get("stage"), str):
+            stages.append(node["stage"])
+        for key, value in node.items():
+            if key != "rejectedPlans":
+                _plan_stages(value, stages)
+    elif isinstance(node, list):
+        for value in node:
+            _plan_stages(value, stages)
+    return stages
+
+
+async def explain_hot_queries() -> Dict[str, List[str]]:
+    """Plan stages of every hot query, from explain."""
+    db = get_db()
+    plans = {}
+    for name, (collection, query) in HOT_QUERIES.items():
+        cursor = db[collection].find(query["filter"])
+        if query.get("sort"):
+            cursor = cursor.sort(query["sort"])
+        plans[name] = _plan_stages(await cursor.explain(), [])
+    return plans
+
+
+async def collscan_queries() -> List[str]:
+    """Names of the hot queries whose plan contains a COLLSCAN; empty when every one uses an index."""
+    return [name for name, stages in (await explain_hot_queries()).items() if "COLLSCAN" in stages]
+
+
+async def _main(command: str) -> int:
+    if command == "create":
+        failed = await ensure_indexes()
+        print("Failed: " + ", ".join(failed) if failed else "Indexes created")
+        return 1 if failed else 0
+    if command == "verify":
+        problems = await verify_indexes()
+        print("\n".join(problems) or "All registry indexes are in place")
+        return 1 if problems else 0
+    if command == "check":
+        plans = await explain_hot_queries()
+        for name, stages in plans.items():
+            print(f"{'COLLSCAN' if 'COLLSCAN' in stages else 'ok':9} {name}: {' > '.join(dict.fromkeys(stages))}")
+        return 1 if any("COLLSCAN" in stages for stages in plans.values()) else 0
+    print(__doc__)
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(_main(sys.argv[1] if len(sys.argv) > 1 else "")))
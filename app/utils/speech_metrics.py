@@ -0,0 +1,90 @@
+import re
+from typing import List, Optional
+
+import numpy as np
+
+FRAME_SECONDS = 0.03
+
+FILLER_WORDS = np.array(["um", "umm", "uh", "uhh", "uhm", "er", "erm", "ah", "hmm", "mm", "like", "basically", "literally"])
+FILLER_PHRASES = (("you", "know"), ("i", "mean"), ("sort", "of"), ("kind", "of"))
+_WORD = re.compile(r"[a-z']+")
+
+
+def frame_energy_db(samples: np.ndarray, sample_rate: int) -> np.ndarray:
+    """RMS level of consecutive 30 ms frames, in dBFS."""
+    frame = max(int(sample_rate * FRAME_SECONDS), 1)
+    count = len(samples) // frame
+    if count == 0:
+        return np.zeros(0, dtype=np.float32)
+    frames = samples[:count * frame].reshape(count, frame)
+    rms = np.sqrt(np.mean(frames ** 2, axis=1))
+    return 20 * np.log10(np.maximum(rms, 1e-10))
+
+
+def voiced_frames(energy_db: np.ndarray, threshold_db: float) -> np.ndarray:
+    """Energy VAD: a frame is voiced if it is above the absolute threshold and within 40 dB of the loudest frame."""
+    if energy_db.size == 0:
+        return np.zeros(0, dtype=bool)
+    return energy_db > max(threshold_db, energy_db.max() - 40)
+
+
+def audio_timing(samples: np.ndarray, sample_rate: int, threshold_db: float) -> dict:
+    """Duration, time to first speech and speaking span of one recording, from its samples."""
+    voiced = voiced_frames(frame_energy_db(samples, sample_rate), threshold_db)
+    duration = len(samples) / sample_rate
+    indices = np.flatnonzero(voiced)
+    if indices.size == 0:
+        return {"duration": duration, "first_speech": None, "speaking_time": 0.0, "voiced_time": 0.0}
+    return {
+        "duration": duration,
+        "first_speech": float(indices[0] * FRAME_SECONDS),
+        "speaking_time": float((indices[-1] - indices[0] + 1) * FRAME_SECONDS),
+        "voiced_time": float(indices.size * FRAME_SECONDS),
+    }
+
+
+def transcript_stats(text: str) -> dict:
+    """Word and filler-word counts of a transcript."""
+    tokens = np.array(_WORD.findall((text or "").lower()))
+    if tokens.size == 0:
+        return {"words": 0, "filler_words": 0}
+    fillers = int(np.isin(tokens, FILLER_WORDS).sum())
+    if tokens.size > 1:
+        first, second = tokens[:-1], tokens[1:]
+        for a, b in FILLER_PHRASES:
+            fillers += int(((first == a) & (second == b)).sum())
+    return {"words": int(tokens.size), "filler_words": fillers}
+
+
+def answer_metrics(text: str, timing: Optional[dict]) -> dict:
+    stats = transcript_stats(text)
+    metrics = {
+        "duration": None,
+        "response_time": None,
+        "speaking_time": None,
+        "speech_rate": None,
+        **stats,
+    }
+    if timing:
+        metrics["duration"] = round(timing["duration"], 2)
+        metrics["response_time"] = None if timing["first_speech"] is None else round(timing["first_speech"], 2)
+        metrics["speaking_time"] = round(timing["speaking_time"], 2)
+        if timing["speaking_time"] > 0:
+            metrics["speech_rate"] = round(stats["words"] * 60 / timing["speaking_time"])
+    return metrics
+
+
+def key_metrics(answers: List[dict]) -> dict:
+    """
+    Aggregate per-answer metrics into AnalyzeAnswer.key_metrics, as whole numbers: mean time to
+    first speech (s), total filler words and overall words per minute. Values that could not be
+    measured are None, and analyze_answer_with_gemini keeps the model's estimate for them.
+    """
+    response_times = [a["response_time"] for a in answers if a["response_time"] is not None]
+    rated = [a for a in answers if a["speaking_time"]]
+    speaking_seconds = sum(a["speaking_time"] for a in rated)
+    return {
+        "response_time": round(float(np.mean(response_times))) if response_times else None,
+        "filler_words": sum(a["filler_words"] for a in answers),
+        "speech_rate": round(sum(a["words"] for a in rated) * 60 / speaking_seconds) if speaking_seconds else None,
+    }
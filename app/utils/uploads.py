@@ -0,0 +1,254 @@
+import io
+import os
+import shutil
+import tempfile
+import zipfile
+from typing import List, Optional, Sequence
+
+from fastapi import HTTPException, Request, UploadFile, status
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+from multipart.multipart import parse_options_header
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import FormData, Headers
+from starlette.formparsers import MultiPartException, MultiPartParser
+from starlette.routing import Match
+
+from app.core.config import settings
+
+UPLOAD_CHUNK_SIZE = 64 * 1024
+# Room for the non-file form fields (job description, question text, ...) next to the file itself
+FORM_OVERHEAD = 256 * 1024
+
+
+class UploadTooLarge(HTTPException):
+    def __init__(self, limit: int):
+        super().__init__(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"The upload is too large. The limit is {round(limit / (1024 * 1024), 1):g} MB.",
+        )
+        self.limit = limit
+
+
+def upload_too_large_response(exc: UploadTooLarge) -> JSONResponse:
+    return JSONResponse(status_code=exc.status_code, content={"status": False, "message": exc.detail})
+
+
+async def upload_too_large_handler(request, exc: UploadTooLarge) -> JSONResponse:
+    return upload_too_large_response(exc)
+
+
+def body_limit(setting: str):
+    """
+    Mark an endpoint's request body limit: the named file-size setting plus room for the form fields.
+    Goes below the route decorator; UploadLimitMiddleware finds it through the matched route.
+    """
+    def decorator(endpoint):
+        endpoint.body_limit_setting = setting
+        return endpoint
+    return decorator
+
+
+def in_memory_uploads(setting: str):
+    """
+    Mark an endpoint whose uploaded files are parsed into memory, up to the named file-size setting
+    each, instead of Starlette's disk spool above 1 MB. Goes below the route decorator; needs UploadRoute.
+    """
+    def decorator(endpoint):
+        endpoint.in_memory_file_setting = setting
+        return endpoint
+    return decorator
+
+
+def request_body_limit(scope) -> int:
+    """Largest request body accepted by the route the request matches: its body_limit, else UPLOAD_MAX_REQUEST_BYTES."""
+    for route in getattr(scope.get("app"), "routes", []):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            setting = getattr(getattr(route, "endpoint", None), "body_limit_setting", None)
+            if setting:
+                return getattr(settings, setting) + FORM_OVERHEAD
+            break
+    return settings.UPLOAD_MAX_REQUEST_BYTES
+
+
+class UploadLimitMiddleware:
+    """
+    Reject oversized request bodies before they are parsed: a declared Content-Length above the limit is
+    answered with 413 without reading the body, and chunked bodies fail as soon as they cross it.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("POST", "PUT", "PATCH"):
+            await self.app(scope, receive, send)
+            return
+
+        limit = request_body_limit(scope)
+        length = Headers(scope=scope).get("content-length")
+        if length and length.isdigit() and int(length) > limit:
+            await upload_too_large_response(UploadTooLarge(limit))(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    # Raised inside form parsing; FastAPI re-raises HTTPExceptions and the app handler renders it
+                    raise UploadTooLarge(limit)
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+class InMemoryFormRequest(Request):
+    """A request whose multipart files are held in memory up to max_file_size each."""
+
+    def __init__(self, scope, receive, max_file_size: int):
+        super().__init__(scope, receive)
+        self.max_file_size = max_file_size
+
+    async def form(self, *, max_files=1000, max_fields=1000) -> FormData:
+        content_type, _ = parse_options_header(self.headers.get("Content-Type"))
+        if self._form is not None or content_type != b"multipart/form-data":
+            return await super().form(max_files=max_files, max_fields=max_fields)
+        parser = MultiPartParser(self.headers, self.stream(), max_files=max_files, max_fields=max_fields)
+        parser.max_file_size = self.max_file_size
+        try:
+            # Stored where Starlette keeps its parsed form, so the request still closes it
+            self._form = await parser.parse()
+        except MultiPartException as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=exc.message)
+        return self._form
+
+
+class UploadRoute(APIRoute):
+    """Route class that parses the uploads of @in_memory_uploads endpoints without writing them to disk."""
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+        setting = getattr(self.endpoint, "in_memory_file_setting", None)
+        if setting is None:
+            return handler
+
+        async def in_memory_handler(request: Request):
+            # Files above the limit are rejected by spool_upload; the body limit bounds the request as a whole
+            return await handler(InMemoryFormRequest(request.scope, request.receive, getattr(settings, setting)))
+
+        return in_memory_handler
+
+
+class SpooledUpload:
+    """
+    An uploaded file in the SpooledTemporaryFile Starlette parsed it into (memory up to 1 MB, disk above;
+    memory only for @in_memory_uploads endpoints), or a ZIP member in one of our own. Owned by whoever holds it and removed by close().
+    """
+
+    def __init__(self, file, filename: Optional[str], content_type: Optional[str], size: int):
+        self.file = file
+        self.filename = filename
+        self.content_type = content_type
+        self.size = size
+
+    @property
+    def in_memory(self) -> bool:
+        return not getattr(self.file, "_rolled", True)
+
+    def _read(self) -> bytes:
+        self.file.seek(0)
+        return self.file.read()
+
+    async def read(self) -> bytes:
+        if self.in_memory:
+            return self._read()
+        return await run_in_threadpool(self._read)
+
+    def _save(self, path: str):
+        self.file.seek(0)
+        with open(path, "wb") as f:
+            shutil.copyfileobj(self.file, f, UPLOAD_CHUNK_SIZE)
+
+    async def save(self, path: str):
+        await run_in_threadpool(self._save, path)
+
+    def close(self):
+        self.file.close()
+
+
+def _file_size(file) -> int:
+    file.seek(0, os.SEEK_END)
+    size = file.tell()
+    file.seek(0)
+    return size
+
+
+async def spool_upload(upload: UploadFile, max_bytes: int) -> SpooledUpload:
+    """
+    Take over the file Starlette already spooled the upload to, raising UploadTooLarge above max_bytes.
+    Nothing is copied: the UploadFile is left with an empty file, so closing the request's form data
+    (FastAPI does that when the endpoint returns) does not close ours and background tasks can use it.
+    """
+    size = upload.size
+    if size is None:
+        size = await run_in_threadpool(_file_size, upload.file)
+    if size > max_bytes:
+        raise UploadTooLarge(max_bytes)
+    spooled = SpooledUpload(upload.file, upload.filename, upload.content_type, size)
+    upload.file = io.BytesIO()
+    return spooled
+
+
+class InvalidArchive(ValueError):
+    pass
+
+
+def _expand_zip(file, suffixes: Sequence[str], max_files: int, max_member_bytes: int) -> List[SpooledUpload]:
+    files: List[SpooledUpload] = []
+    try:
+        file.seek(0)
+        with zipfile.ZipFile(file) as archive:
+            for info in archive.infolist():
+                name = info.filename.replace("\\", "/")
+                basename = os.path.basename(name)
+                if info.is_dir() or name.startswith("__MACOSX/") or basename.startswith("."):
+                    continue
+                if os.path.splitext(basename)[-1].lower() not in suffixes:
+                    continue
+                if len(files) >= max_files:
+                    raise InvalidArchive("The archive holds more resumes than a batch allows.")
+                # The declared size can lie, so the copy is bounded too
+                if info.file_size > max_member_bytes:
+                    raise UploadTooLarge(max_member_bytes)
+                member = SpooledUpload(
+                    tempfile.SpooledTemporaryFile(max_size=settings.UPLOAD_SPOOL_MEMORY), basename, None, 0
+                )
+                files.append(member)
+                with archive.open(info) as f:
+                    while chunk := f.read(UPLOAD_CHUNK_SIZE):
+                        if member.size + len(chunk) > max_member_bytes:
+                            raise UploadTooLarge(max_member_bytes)
+                        member.file.write(chunk)
+                        member.size += len(chunk)
+    except BaseException as e:
+        for member in files:
+            member.close()
+        if isinstance(e, zipfile.BadZipFile):
+            raise InvalidArchive("The ZIP archive could not be read.") from e
+        raise
+    return files
+
+
+async def expand_zip_upload(archive: SpooledUpload, suffixes: Sequence[str], max_files: int,
+                            max_member_bytes: int) -> List[SpooledUpload]:
+    """
+    Spool every member of an uploaded ZIP whose suffix is in suffixes (directories, hidden files and
+    macOS metadata are skipped), read straight from the uploaded archive. Raises InvalidArchive or
+    UploadTooLarge; nothing is left on disk then.
+    """
+    return await run_in_threadpool(_expand_zip, archive.file, suffixes, max_files, max_member_bytes)
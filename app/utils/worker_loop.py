@@ -0,0 +1,46 @@
+import asyncio
+import threading
+from typing import Optional
+
+
+class WorkerLoop:
+    """
+    One long-lived event loop per worker process, running in a daemon thread.
+    Celery task threads submit coroutines to it and block on the result, so jobs from every
+    pool thread interleave on the same loop and share its Motor and Gemini connections.
+    """
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None or self._loop.is_closed() or not self._thread.is_alive():
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name="worker-event-loop", daemon=True)
+                thread.start()
+                self._loop, self._thread = loop, thread
+            return self._loop
+
+    def run(self, coro, timeout: Optional[float] = None):
+        future = asyncio.run_coroutine_threadsafe(coro, self._ensure_started())
+        return future.result(timeout)
+
+    def reset(self):
+        """Forget the loop inherited from a parent process (after fork) without touching it."""
+        with self._lock:
+            self._loop = None
+            self._thread = None
+
+    def stop(self):
+        with self._lock:
+            if self._loop is not None and not self._loop.is_closed():
+                self._loop.call_soon_threadsafe(self._loop.stop)
+                self._thread.join(timeout=5)
+            self._loop = None
+            self._thread = None
+
+
+worker_loop = WorkerLoop()
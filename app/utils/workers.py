@@ -0,0 +1,184 @@
+import asyncio
+import functools
+import logging
+import multiprocessing
+import os
+import signal
+import threading
+import uuid
+import weakref
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Optional, Set
+
+from app.core.config import settings
+
+_pools: Dict[str, ProcessPoolExecutor] = {}
+# Calls submitted to each pool and not finished yet, and how many of those were abandoned on timeout
+_in_flight: Dict[ProcessPoolExecutor, int] = {}
+_abandoned: Dict[ProcessPoolExecutor, int] = {}
+_tracking = threading.RLock()
+# Admission per event loop and pool name, sized to the pool so a submitted call gets a worker right away
+_slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]" = weakref.WeakKeyDictionary()
+# Children report their pid when they start and the id of every call they pick up on their pool's queue;
+# a reader thread records the pids (to terminate a retired pool) and resolves the call futures
+_start_queues: Dict[ProcessPoolExecutor, multiprocessing.SimpleQueue] = {}
+_children: Dict[ProcessPoolExecutor, Set[int]] = {}
+_started: Dict[str, Future] = {}
+
+_worker_start_queue = None
+
+
+def _init_worker(start_queue):
+    global _worker_start_queue
+    _worker_start_queue = start_queue
+    start_queue.put((os.getpid(), None))
+
+
+def _run_tracked(call_id: str, call):
+    _worker_start_queue.put((os.getpid(), call_id))
+    return call()
+
+
+def _read_starts(start_queue, children: Set[int]):
+    while True:
+        message = start_queue.get()
+        if message is None:
+            return
+        pid, call_id = message
+        children.add(pid)
+        started = _started.pop(call_id, None)
+        if started is not None and not started.done():
+            started.set_result(None)
+
+
+def _pool_size(name: str) -> int:
+    return settings.DOCUMENT_WORKERS if name == "documents" else settings.CPU_WORKERS
+
+
+def _admission(name: str) -> asyncio.Semaphore:
+    slots = _slots.setdefault(asyncio.get_running_loop(), {})
+    if name not in slots:
+        slots[name] = asyncio.Semaphore(_pool_size(name))
+    return slots[name]
+
+
+def get_process_pool(name: str = "default") -> ProcessPoolExecutor:
+    """
+    Named pools for CPU-bound work (audio in "default", resume parsing in "documents") so it never
+    runs on the event loop and one kind of work cannot starve the other.
+    """
+    pool = _pools.get(name)
+    if pool is None:
+        # spawn: forking a process that already runs an event loop and client threads is unsafe
+        context = multiprocessing.get_context("spawn")
+        start_queue = context.SimpleQueue()
+        pool = ProcessPoolExecutor(
+            max_workers=_pool_size(name),
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(start_queue,),
+        )
+        children = _children[pool] = set()
+        threading.Thread(target=_read_starts, args=(start_queue, children), name=f"{name}-pool-starts", daemon=True).start()
+        _start_queues[pool] = start_queue
+        _pools[name] = pool
+    return pool
+
+
+def _shutdown(pool: ProcessPoolExecutor, kill: bool = False):
+    children = _children.pop(pool, set())
+    if kill:
+        # ProcessPoolExecutor cannot cancel a running call; terminating its children is the only way.
+        # A child running a call has always reported its pid, since it does so before starting the call.
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+    pool.shutdown(wait=False, cancel_futures=True)
+    start_queue = _start_queues.pop(pool, None)
+    if start_queue is not None:
+        start_queue.put(None)
+
+
+def _discard_pool(name: str, kill: bool = False):
+    pool = _pools.pop(name, None)
+    if pool is not None:
+        _shutdown(pool, kill)
+
+
+def _retire_pool(name: str, pool: ProcessPoolExecutor):
+    """
+    Take a pool with a hung call out of service. New calls get a fresh pool; the old one's children are
+    terminated as soon as none of its other calls is still running, so healthy calls are never failed.
+    """
+    if _pools.get(name) is pool:
+        del _pools[name]
+    with _tracking:
+        _abandoned[pool] = _abandoned.get(pool, 0) + 1
+        _reap(pool)
+
+
+def _reap(pool: ProcessPoolExecutor):
+    if pool in _abandoned and _in_flight.get(pool, 0) <= _abandoned[pool]:
+        del _abandoned[pool]
+        _shutdown(pool, kill=True)
+
+
+def _call_done(pool: ProcessPoolExecutor, future):
+    # Runs on the executor's management thread
+    with _tracking:
+        _in_flight[pool] -= 1
+        if not _in_flight[pool]:
+            del _in_flight[pool]
+            _abandoned.pop(pool, None)
+            return
+        _reap(pool)
+
+
+def shutdown_process_pool():
+    for name in list(_pools):
+        _discard_pool(name)
+
+
+async def run_in_process(fn, *args, timeout: Optional[float] = None, pool: str = "default",
+                         kill_on_timeout: bool = False, **kwargs):
+    """
+    Run a picklable module-level function in a process pool. A pool broken by a crashed child is
+    replaced for the next call. Calls wait for a free worker first, and the timeout runs from the
+    moment a child starts the call, so neither queueing nor worker start-up counts. On timeout the
+    caller is freed; with kill_on_timeout the pool is retired and its children are terminated once
+    its other calls have finished, so a pathological input cannot keep a worker busy.
+    """
+    async with _admission(pool):
+        executor = get_process_pool(pool)
+        call_id = uuid.uuid4().hex
+        started = _started[call_id] = Future()
+        try:
+            try:
+                future = executor.submit(_run_tracked, call_id, functools.partial(fn, *args, **kwargs))
+            except BrokenProcessPool:
+                logging.exception(f"Process pool {pool} broke; recreating it")
+                _discard_pool(pool)
+                raise
+            with _tracking:
+                _in_flight[executor] = _in_flight.get(executor, 0) + 1
+            future.add_done_callback(functools.partial(_call_done, executor))
+
+            result = asyncio.wrap_future(future)
+            # A call that fails before it starts (e.g. a broken pool) never reports its start
+            await asyncio.wait([asyncio.wrap_future(started), result], return_when=asyncio.FIRST_COMPLETED)
+            return await asyncio.wait_for(result, timeout=timeout)
+        except asyncio.TimeoutError:
+            if kill_on_timeout:
+                logging.warning(f"{getattr(fn, '__name__', fn)} timed out after {timeout}s; retiring the {pool} pool")
+                _retire_pool(pool, executor)
+            raise
+        except BrokenProcessPool:
+            logging.exception(f"Process pool {pool} broke; recreating it")
+            if _pools.get(pool) is executor:
+                _discard_pool(pool)
+            raise
+        finally:
+            _started.pop(call_id, None)
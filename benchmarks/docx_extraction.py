@@ -0,0 +1,162 @@
+"""
+DOCX text extraction: python-docx (extract_text_and_tables) vs. the streaming lxml extractor.
+
+Checks that both produce identical text on every document of the corpus (the streaming one with
+legacy_order=True, paragraphs before tables), then reports wall time and tracemalloc peak per
+extractor. The built-in corpus covers merged cells (gridSpan/vMerge), gridBefore rows, nested
+tables, hyperlinks, tabs and breaks, content controls, tracked insertions and a large table-heavy
+resume; --dir adds real files.
+
+    python benchmarks/docx_extraction.py
+    python benchmarks/docx_extraction.py --dir ~/resumes --runs 20
+"""
+import io
+import os
+import sys
+import glob
+import difflib
+import time
+import argparse
+import tracemalloc
+from copy import deepcopy
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from docx import Document
+from docx.enum.text import WD_BREAK
+from docx.oxml import parse_xml
+
+W_NS = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+
+
+def _save(doc) -> bytes:
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+def _formatting_doc() -> bytes:
+    doc = Document()
+    doc.add_paragraph("Jane Doe  ")
+    p = doc.add_paragraph("Senior\tEngineer")
+    run = p.add_run("line")
+    run.add_break()
+    run.add_text("next line")
+    p.add_run().add_break(WD_BREAK.PAGE)
+    p.add_run(" ")
+    doc.add_paragraph("   ")
+    doc.add_paragraph("")
+    body = doc.element.body
+    body.insert(len(body) - 1, parse_xml(
+        f'<w:p {W_NS} xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<w:r><w:t xml:space="preserve">Portfolio: </w:t></w:r>'
+        '<w:hyperlink r:id="rId99"><w:r><w:t>example.com</w:t></w:r></w:hyperlink>'
+        '<w:r><w:noBreakHyphen/><w:t>x</w:t><w:ptab w:relativeTo="margin" w:alignment="right" w:leader="none"/><w:cr/></w:r>'
+        '<w:ins w:id="1" w:author="a" w:date="2024-01-01T00:00:00Z"><w:r><w:t>tracked</w:t></w:r></w:ins>'
+        '<w:r><w:t xml:space="preserve"> </w:t></w:r><w:r><w:t>end</w:t></w:r>'
+        '</w:p>'
+    ))
+    body.insert(len(body) - 1, parse_xml(
+        f'<w:sdt {W_NS}><w:sdtContent><w:p><w:r><w:t>inside a content control</w:t></w:r></w:p></w:sdtContent></w:sdt>'
+    ))
+    doc.add_paragraph("After the control")
+    return _save(doc)
+
+
+def _tables_doc() -> bytes:
+    doc = Document()
+    doc.add_paragraph("Experience")
+    table = doc.add_table(rows=4, cols=4)
+    for r, row in enumerate(table.rows):
+        for c, cell in enumerate(row.cells):
+            cell.text = f"r{r}c{c}" if (r + c) % 3 else ""
+    table.cell(0, 0).merge(table.cell(0, 1))
+    table.cell(1, 2).merge(table.cell(3, 2))
+    table.cell(2, 0).merge(table.cell(3, 1))
+    table.cell(1, 3).add_paragraph("second paragraph")
+    nested = table.cell(3, 3).add_table(rows=2, cols=2)
+    nested.cell(0, 0).text = "nested"
+    doc.add_paragraph("Between tables")
+
+    table = doc.add_table(rows=3, cols=3)
+    for r, row in enumerate(table.rows):
+        for c, cell in enumerate(row.cells):
+            cell.text = f" t2 {r}{c} "
+    # A row that starts one grid column late
+    tr = table.rows[2]._tr
+    tr.remove(tr.tc_lst[0])
+    tr.get_or_add_trPr().append(parse_xml(f'<w:gridBefore {W_NS} w:val="1"/>'))
+    doc.add_paragraph("Skills")
+    return _save(doc)
+
+
+def _large_resume(tables: int = 150, rows: int = 8) -> bytes:
+    doc = Document()
+    template = doc.add_table(rows=rows, cols=4)
+    for r, row in enumerate(template.rows):
+        for c, cell in enumerate(row.cells):
+            cell.text = f"Project {r} detail {c}: built services, reduced latency, mentored engineers"
+    template.cell(0, 0).merge(template.cell(0, 1))
+    body = doc.element.body
+    tbl = template._tbl
+    for i in range(tables):
+        doc.add_paragraph(f"Section {i}: " + "achievements and responsibilities " * 5)
+        body.insert(len(body) - 1, deepcopy(tbl))
+    return _save(doc)
+
+
+def corpus(directory: str = None) -> dict:
+    documents = {
+        "formatting": _formatting_doc(),
+        "tables": _tables_doc(),
+        "large_resume": _large_resume(),
+    }
+    if directory:
+        for path in sorted(glob.glob(os.path.join(os.path.expanduser(directory), "*.docx"))):
+            with open(path, "rb") as f:
+                documents[os.path.basename(path)] = f.read()
+    return documents
+
+
+def _measure(fn, data: bytes, runs: int) -> dict:
+    started = time.perf_counter()
+    for _ in range(runs):
+        fn(io.BytesIO(data))
+    elapsed = (time.perf_counter() - started) / runs
+    tracemalloc.start()
+    fn(io.BytesIO(data))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"ms": round(elapsed * 1000, 2), "peak_kb": round(peak / 1024)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dir", help="directory with additional .docx files")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    from app.utils.common import extract_text_and_tables
+    from app.utils.docx_text import extract_docx_text
+
+    mismatches = 0
+    for name, data in corpus(args.dir).items():
+        expected = extract_text_and_tables(io.BytesIO(data))
+        actual = extract_docx_text(data, legacy_order=True)
+        same = expected == actual
+        mismatches += not same
+        print({
+            "document": name,
+            "kb": round(len(data) / 1024),
+            "identical": same,
+            "python_docx": _measure(extract_text_and_tables, data, args.runs),
+            "streaming": _measure(extract_docx_text, data, args.runs),
+        })
+        if not same:
+            diff = difflib.unified_diff(expected.splitlines(), actual.splitlines(), "python-docx", "streaming", lineterm="")
+            print("\n".join(list(diff)[:40]))
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Concurrent /api/analyzer/upload throughput: blocking Gemini calls vs. the async gateway.
+
+Gemini, Mongo and auth are replaced by in-process fakes so the benchmark measures
+only how the worker's event loop copes with slow model calls. Run with:
+
+    python benchmarks/upload_throughput.py --requests 20 --latency 2
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+for key, value in {
+    "GEMINI_API_KEY": "benchmark", "MONGO_URI": "mongodb://localhost:27017", "MONGO_DB_NAME": "benchmark",
+    "REDIS_URL": "redis://localhost:6379/0", "AES_KEY": "0" * 16, "IV_KEY": "0" * 16,
+    "SECRET_KEY": "benchmark", "ALGORITHM": "HS256", "ACCESS_TOKEN_EXPIRE_TIME": "1",
+}.items():
+    os.environ.setdefault(key, value)
+
+import fitz
+import httpx
+from bson import ObjectId
+
+from app.main import app
+from app.routes import analyzer as analyzer_routes
+from app.utils import gemini, llm
+from app.utils.auth import get_current_user
+
+ANALYSIS = llm.AnalyzeRessume(
+    match_score=80,
+    matched_skills=["python"],
+    missing_skills=["go"],
+    key_highlights=["benchmark"],
+    questions=["question"] * 5,
+)
+
+
+def _sample_pdf(i: int) -> bytes:
+    # Distinct text per upload so response caching does not short-circuit Gemini.
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_text((72, 72), f"Candidate {i}: Python developer with FastAPI and MongoDB experience.")
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def _install_fakes(mode: str, latency: float):
+    async def get_candidate_by_email(email):
+        return None
+
+    async def add_candidate_info(candidate):
+        return str(ObjectId())
+
+    async def add_analyzed_data(data):
+        return True
+
+    async def submit_job(*args, **kwargs):
+        return {}, True
+
+    analyzer_routes.analyzer_service.get_candidate_by_email = get_candidate_by_email
+    analyzer_routes.analyzer_service.add_candidate_info = add_candidate_info
+    analyzer_routes.analyzer_service.add_analyzed_data = add_analyzed_data
+    analyzer_routes.submit_job = submit_job
+    app.dependency_overrides[get_current_user] = lambda: {"_id": ObjectId()}
+
+    if mode == "blocking":
+        # The pre-gateway code path: a synchronous SDK call inside an async def.
+        async def analyze_resume_with_gemini(job_description, resume_content):
+            time.sleep(latency)
+            return ANALYSIS.model_dump()
+
+        analyzer_routes.analyze_resume_with_gemini = analyze_resume_with_gemini
+    else:
+        async def generate_content(model, contents, config=None):
+            await asyncio.sleep(latency)
+            return SimpleNamespace(parsed=[ANALYSIS], text=ANALYSIS.model_dump_json())
+
+        fake_client = SimpleNamespace(aio=SimpleNamespace(models=SimpleNamespace(generate_content=generate_content)))
+        gemini._client = fake_client
+        analyzer_routes.analyze_resume_with_gemini = llm.analyze_resume_with_gemini
+
+
+async def _run(mode: str, requests: int, latency: float) -> dict:
+    _install_fakes(mode, latency)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+
+        async def upload(i):
+            return await client.post(
+                "/api/analyzer/upload",
+                data={
+                    "candidate_name": f"Candidate {i}",
+                    "email": f"candidate{i}@example.com",
+                    "phone": "0000000000",
+                    "hr_name": "HR",
+                    "job_position": "Backend Engineer",
+                    "job_description": "Python, FastAPI, MongoDB",
+                },
+                files={"resume": ("resume.pdf", _sample_pdf(i), "application/pdf")},
+            )
+
+        async def probe():
+            # A cheap request issued while uploads are in flight; it stalls if the loop is blocked.
+            delay = latency / 10
+            issued = time.perf_counter() + delay
+            await asyncio.sleep(delay)
+            await client.get("/")
+            return time.perf_counter() - issued
+
+        started = time.perf_counter()
+        results = await asyncio.gather(probe(), *(upload(i) for i in range(requests)))
+        elapsed = time.perf_counter() - started
+
+    probe_latency, responses = results[0], results[1:]
+    ok = sum(1 for r in responses if r.status_code == 200)
+    return {
+        "mode": mode,
+        "requests": requests,
+        "ok": ok,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(ok / elapsed, 2),
+        "probe_latency_s": round(probe_latency, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20, help="concurrent uploads per mode")
+    parser.add_argument("--latency", type=float, default=2.0, help="simulated Gemini latency in seconds")
+    args = parser.parse_args()
+
+    for mode in ("blocking", "async"):
+        print(asyncio.run(_run(mode, args.requests, args.latency)))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 from celery import Celery
+from celery.signals import worker_process_init, worker_shutdown
 import subprocess
 import sys
 import os
@@ -10,27 +11,55 @@ REDIS_URL = settings.REDIS_URL
 celery_app = Celery(
     "worker",
     broker=REDIS_URL,  # Redis broker
-    # backend="redis://localhost:6379/1"  # Optional: for result storage
+    backend=settings.CELERY_RESULT_BACKEND or None,  # e.g. redis://localhost:6379/1; required for the quiz chord
 )
 
 celery_app.conf.task_routes = {
-    "tasks.process_job_task": {"queue": "questions"}
+    "tasks.process_job_task": {"queue": "questions"},
+    "tasks.run_job_task": {"queue": "questions"},
+    "tasks.generate_section_task": {"queue": "questions"},
+    "tasks.aggregate_quiz_sections_task": {"queue": "questions"},
 }
 celery_app.conf.task_serializer = "json"
 celery_app.conf.result_serializer = "json"
 celery_app.conf.accept_content = ["json"]
+celery_app.conf.result_expires = 3600
+# Generation tasks are long and mostly waiting on Gemini: take one at a time per pool thread,
+# and only ack once done so a killed worker's tasks are redelivered (job claims make that safe).
+celery_app.conf.worker_prefetch_multiplier = 1
+celery_app.conf.task_acks_late = True
+
+
+@worker_process_init.connect
+def _reset_process_state(**kwargs):
+    # A forked child must not reuse the parent's event loop or the clients bound to it.
+    from app.utils.mongo import reset_db
+    from app.utils.gemini import reset_gemini_client
+    from app.utils.worker_loop import worker_loop
+    worker_loop.reset()
+    reset_db()
+    reset_gemini_client()
+
+
+@worker_shutdown.connect
+def _stop_worker_loop(**kwargs):
+    from app.utils.worker_loop import worker_loop
+    worker_loop.stop()
+
 
 if __name__ == "__main__":
     cmd = [
-        sys.executable, 
+        sys.executable,
         "-m", "celery",
-        "-A", "tasks.celery_app",  
+        "-A", "tasks.celery_app",
         "worker",
         "--loglevel=info",
         "-Q", "questions",
-        "-c", "2"
+        # Threads share one event loop per process (app/utils/worker_loop.py), so concurrency is cheap
+        "-P", "threads",
+        "-c", str(settings.CELERY_WORKER_CONCURRENCY)
     ]
     subprocess.run(cmd)
 
-## Not Defined thread: # celery -A tasks.celery_app worker --loglevel=info -Q questions 
-## Defined thread:     # celery -A tasks.celery_app worker --loglevel=info -Q questions -c 2
\ No newline at end of file
+## Not Defined thread: # celery -A tasks.celery_app worker --loglevel=info -Q questions
+## Defined thread:     # celery -A tasks.celery_app worker --loglevel=info -Q questions -P threads -c 32
@@ -1,16 +1,46 @@
 from celery_app import celery_app
+from celery import chord
 import asyncio
 import sys
 from datetime import datetime
 from collections import defaultdict
 from datetime import timedelta
-from app.utils.common import process_quiz_questions
+from app.core.config import settings
+from app.utils.common import process_quiz_questions, store_section, fail_pending_quiz_sections, QUIZ_SECTIONS, SECTION_GENERATORS
+from app.utils.jobs import job_service, keep_alive, retry_delay
+from app.utils.worker_loop import worker_loop
+
+
+def quiz_fanout_enabled() -> bool:
+    # A chord needs a result backend to count finished subtasks.
+    return settings.CELERY_QUIZ_FANOUT and bool(settings.CELERY_RESULT_BACKEND)
+
+
+def fanout_worker(job_id: str) -> str:
+    return f"chord:{job_id}"
+
+
+def dispatch_quiz_chord(candidate_id_str, job_description, extracted_text, job_id=None):
+    """
+    One subtask per question section on the questions queue, then a single aggregation step. If a
+    subtask raises, Celery skips the aggregation and runs quiz_chord_failed_task instead.
+    """
+    header = [
+        generate_section_task.s(candidate_id_str, section, job_description, extracted_text, job_id)
+        for section in QUIZ_SECTIONS
+    ]
+    body = aggregate_quiz_sections_task.s(candidate_id_str, job_id)
+    return chord(header)(body.on_error(quiz_chord_failed_task.s(candidate_id_str, job_id)))
+
 
 @celery_app.task(name="tasks.process_job_task")
 def process_job_task(candidate_id_str,job_description,extracted_text):
     print(f"Starting process_job_task")
     sys.stdout.flush()
-    
+    if quiz_fanout_enabled():
+        dispatch_quiz_chord(candidate_id_str, job_description, extracted_text)
+        return
+
     async def _process_job_task(candidate_id_str,job_description,extracted_text):
         try:
             await process_quiz_questions(candidate_id_str,job_description,extracted_text)
@@ -18,11 +48,113 @@ def process_job_task(candidate_id_str,job_description,extracted_text):
             # Best-effort background job; failures are not propagated to the client
             print(f"Error in _process_job: {str(e)}")
             sys.stdout.flush()
-            pass
+            await fail_pending_quiz_sections(candidate_id_str)
 
-    # Run async code in separate event loop
-    asyncio.run(
+    # Run on the worker's persistent event loop so Mongo and Gemini connections are reused
+    worker_loop.run(
         _process_job_task(
             candidate_id_str,job_description,extracted_text
         )
     )
+
+
+@celery_app.task(name="tasks.run_job_task", bind=True, max_retries=None)
+def run_job_task(self, job_id):
+    # Attempts are counted on the job document; Celery only re-delivers the job while it is queued.
+    from app.utils.jobs import run_job
+
+    async def _claim_for_fanout(job_id):
+        job = await job_service.get_job(job_id)
+        if not job or job["kind"] != "quiz_generation":
+            return None, False
+        return await job_service.claim(job_id, fanout_worker(job_id)), True
+
+    if quiz_fanout_enabled():
+        job, is_quiz = worker_loop.run(_claim_for_fanout(job_id))
+        if is_quiz:
+            if job:
+                payload = job["payload"]
+                dispatch_quiz_chord(payload["candidate_id"], payload["job_description"], payload["extracted_text"], job_id)
+            return
+
+    async def _run_job_task(job_id):
+        state = await run_job(job_id)
+        job = await job_service.get_job(job_id) if state == "queued" else None
+        return state, job
+
+    state, job = worker_loop.run(_run_job_task(job_id))
+    print(f"Job {job_id} finished with state {state}")
+    sys.stdout.flush()
+    if state == "queued":
+        raise self.retry(countdown=retry_delay(job["attempts"]))
+
+
+@celery_app.task(name="tasks.generate_section_task", bind=True, max_retries=settings.CELERY_SECTION_MAX_RETRIES)
+def generate_section_task(self, candidate_id_str, section, job_description, extracted_text, job_id=None):
+    """Generate and store one question section; retried on its own before the section is marked failed."""
+
+    async def _generate():
+        heartbeat = None
+        if job_id:
+            await job_service.heartbeat(job_id, fanout_worker(job_id))
+            heartbeat = asyncio.ensure_future(keep_alive(job_id, fanout_worker(job_id)))
+        try:
+            return await SECTION_GENERATORS[section](job_description, extracted_text)
+        finally:
+            if heartbeat:
+                heartbeat.cancel()
+
+    try:
+        response = worker_loop.run(_generate())
+    except Exception as e:
+        print(f"Error generating {section} for candidate {candidate_id_str}: {str(e)}")
+        response = None
+    if not response and self.request.retries < self.max_retries:
+        raise self.retry(countdown=retry_delay(self.request.retries + 1))
+
+    try:
+        worker_loop.run(store_section(candidate_id_str, section, response))
+    except Exception as e:
+        # Always return a result so the chord body runs; it marks the section failed if it is still pending
+        print(f"Error storing {section} for candidate {candidate_id_str}: {str(e)}")
+        sys.stdout.flush()
+        return "failed"
+    return "ready" if response else "failed"
+
+
+@celery_app.task(name="tasks.aggregate_quiz_sections_task")
+def aggregate_quiz_sections_task(results, candidate_id_str, job_id=None):
+    """Chord callback: close out sections that never got stored and finish the job."""
+
+    async def _aggregate():
+        await fail_pending_quiz_sections(candidate_id_str)
+        if job_id:
+            job = await job_service.get_job(job_id)
+            if job and job["state"] == "running" and job["worker"] == fanout_worker(job_id):
+                await job_service.complete(job)
+
+    worker_loop.run(_aggregate())
+    sections = dict(zip(QUIZ_SECTIONS, results))
+    print(f"Quiz sections for candidate {candidate_id_str}: {sections}")
+    sys.stdout.flush()
+    return sections
+
+
+@celery_app.task(name="tasks.quiz_chord_failed_task")
+def quiz_chord_failed_task(request, exc, traceback, candidate_id_str, job_id=None):
+    """Chord errback: close out the sections and record the failed attempt, retrying the job while attempts remain."""
+
+    async def _fail():
+        await fail_pending_quiz_sections(candidate_id_str)
+        if not job_id:
+            return None, None
+        job = await job_service.get_job(job_id)
+        if not job or job["state"] != "running" or job["worker"] != fanout_worker(job_id):
+            return None, job
+        return await job_service.fail(job, f"{type(exc).__name__}: {exc}"), job
+
+    state, job = worker_loop.run(_fail())
+    print(f"Quiz chord for candidate {candidate_id_str} failed ({exc!r}); job {job_id} is {state}")
+    sys.stdout.flush()
+    if state == "queued":
+        run_job_task.apply_async(args=[job_id], countdown=retry_delay(job["attempts"]))
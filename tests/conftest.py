@@ -0,0 +1,12 @@
+import os
+
+from dotenv import load_dotenv
+
+# Settings requires these; unit tests never reach the services, so placeholders do when .env is absent
+load_dotenv()
+for name, value in {
+    "GEMINI_API_KEY": "test", "MONGO_URI": "mongodb://localhost:27017", "MONGO_DB_NAME": "assessment_test",
+    "REDIS_URL": "redis://localhost:6379/0", "AES_KEY": "0123456789abcdef", "IV_KEY": "0123456789abcdef",
+    "SECRET_KEY": "test", "ALGORITHM": "HS256", "ACCESS_TOKEN_EXPIRE_TIME": "60",
+}.items():
+    os.environ.setdefault(name, value)
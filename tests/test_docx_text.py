@@ -0,0 +1,36 @@
+import io
+
+from docx import Document
+
+from app.utils.docx_text import extract_docx_text
+
+
+def _resume() -> bytes:
+    doc = Document()
+    doc.add_paragraph("Jane Doe")
+    table = doc.add_table(rows=2, cols=2)
+    table.cell(0, 0).text = "Python"
+    table.cell(0, 1).text = "5 years"
+    table.cell(1, 0).text = "Go"
+    doc.add_paragraph("Experience")
+    merged = doc.add_table(rows=1, cols=2)
+    merged.cell(0, 0).merge(merged.cell(0, 1)).text = "Merged"
+    doc.add_paragraph("  ")
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+def test_document_order_is_the_default():
+    assert extract_docx_text(_resume()) == "Jane Doe\nPython\t5 years\nGo\nExperience\nMerged\tMerged"
+
+
+def test_legacy_order_puts_tables_last():
+    assert extract_docx_text(_resume(), legacy_order=True) == "Jane Doe\nExperience\nPython\t5 years\nGo\nMerged\tMerged"
+
+
+def test_matches_python_docx_in_legacy_order():
+    from app.utils.common import extract_text_and_tables
+
+    data = _resume()
+    assert extract_docx_text(data, legacy_order=True) == extract_text_and_tables(io.BytesIO(data))
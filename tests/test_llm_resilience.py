@@ -0,0 +1,189 @@
+import asyncio
+from dataclasses import replace
+
+import pytest
+from google.genai.errors import ClientError, ServerError
+
+from app.core.config import settings
+from app.utils import llm_resilience
+from app.utils.llm_resilience import (
+    CircuitBreaker, CircuitOpenError, LatencyTracker, ResiliencePolicy, _hedged, call_with_policy, is_retryable,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(llm_resilience, "time", fake)
+    return fake
+
+
+@pytest.fixture
+def policy(monkeypatch):
+    """Give a test task its own policy (no backoff) and fresh latency samples."""
+    def set_policy(task, **fields):
+        monkeypatch.setitem(settings.LLM_POLICIES, task, {"backoff_base": 0, **fields})
+        monkeypatch.delitem(llm_resilience._latencies, task, raising=False)
+        return llm_resilience.get_policy(task)
+    return set_policy
+
+
+def test_is_retryable():
+    assert is_retryable(asyncio.TimeoutError())
+    assert is_retryable(ServerError(503, {"error": {"message": "unavailable"}}))
+    assert is_retryable(ClientError(429, {"error": {"message": "quota"}}))
+    assert not is_retryable(ClientError(400, {"error": {"message": "bad request"}}))
+    assert not is_retryable(ValueError())
+
+
+def test_breaker_opens_probes_and_closes(clock):
+    breaker = CircuitBreaker("model", failure_threshold=2, reset_timeout=30)
+    breaker.record_failure()
+    assert breaker.allow() and breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+
+    clock.now += 30
+    # Half-open lets exactly one probe through
+    assert breaker.allow() and breaker.state == "half_open"
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.failures == 0 and breaker.allow()
+
+
+def test_breaker_failed_probe_reopens_and_lost_probe_is_replaced(clock):
+    breaker = CircuitBreaker("model", failure_threshold=1, reset_timeout=10)
+    breaker.record_failure()
+    clock.now += 10
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+
+    clock.now += 10
+    assert breaker.allow()
+    # The probe never reports back; another one is let through after reset_timeout
+    clock.now += 5
+    assert not breaker.allow()
+    clock.now += 5
+    assert breaker.allow()
+
+
+def test_latency_tracker_p95():
+    tracker = LatencyTracker(window=100)
+    assert tracker.p95() is None
+    for value in range(1, 101):
+        tracker.add(value / 100)
+    assert tracker.p95() == 0.96
+    tracker.add(5.0)
+    assert len(tracker) == 100 and tracker.p95() == 0.97
+
+
+def _slow_factory(slot: asyncio.Semaphore, seconds: float, launches: list):
+    async def factory(on_admitted):
+        launches.append(1)
+        async with slot:
+            on_admitted()
+            await asyncio.sleep(seconds)
+            return "ok"
+    return factory
+
+
+def test_queue_wait_neither_triggers_a_hedge_nor_counts_as_latency():
+    async def run():
+        policy = replace(ResiliencePolicy(), hedge=True, hedge_after=0.1)
+        launches = []
+        factory = _slow_factory(asyncio.Semaphore(1), 0.05, launches)
+        # Five calls share one slot: the last waits 0.2 s in the queue, longer than the hedge delay;
+        # counting that wait would hedge it and report about 0.25 s
+        results = await asyncio.gather(*(_hedged("t_queue", policy, factory) for _ in range(5)))
+        return results, launches
+
+    results, launches = asyncio.run(run())
+    assert len(launches) == 5
+    assert all(result == "ok" and latency < 0.15 for result, latency in results)
+
+
+def test_slow_admitted_call_is_hedged():
+    async def run():
+        policy = replace(ResiliencePolicy(), hedge=True, hedge_after=0.05)
+        calls = []
+
+        async def factory(on_admitted):
+            calls.append(1)
+            on_admitted()
+            await asyncio.sleep(1 if len(calls) == 1 else 0.01)
+            return len(calls)
+
+        hedge_wins = llm_resilience.counters["hedge_wins"]
+        result, latency = await _hedged("t_hedge", policy, factory)
+        return result, latency, llm_resilience.counters["hedge_wins"] - hedge_wins
+
+    result, latency, hedge_wins = asyncio.run(run())
+    assert result == 2 and hedge_wins == 1
+    # Measured from the winning attempt's own admission
+    assert latency < 0.5
+
+
+def test_call_with_policy_retries_retryable_errors(policy):
+    policy("t_retry", retries=2)
+    attempts = []
+
+    async def factory(timeout, on_admitted):
+        attempts.append(timeout)
+        on_admitted()
+        if len(attempts) < 3:
+            raise asyncio.TimeoutError()
+        return "ok"
+
+    breaker = CircuitBreaker("t_retry", failure_threshold=10, reset_timeout=30)
+    assert asyncio.run(call_with_policy("t_retry", breaker, factory)) == "ok"
+    assert len(attempts) == 3 and breaker.state == "closed"
+    assert len(llm_resilience._latencies["t_retry"]) == 1
+
+
+def test_call_with_policy_does_not_retry_client_errors(policy):
+    policy("t_client_error", retries=2)
+    attempts = []
+
+    async def factory(timeout, on_admitted):
+        attempts.append(1)
+        raise ClientError(400, {"error": {"message": "bad request"}})
+
+    breaker = CircuitBreaker("t_client_error", failure_threshold=1, reset_timeout=30)
+    with pytest.raises(ClientError):
+        asyncio.run(call_with_policy("t_client_error", breaker, factory))
+    # Upstream answered, so the breaker stays closed
+    assert len(attempts) == 1 and breaker.state == "closed"
+
+
+def test_open_breaker_short_circuits(policy):
+    policy("t_open", retries=3)
+    attempts = []
+
+    async def factory(timeout, on_admitted):
+        attempts.append(1)
+        raise ServerError(503, {"error": {"message": "unavailable"}})
+
+    breaker = CircuitBreaker("t_open", failure_threshold=2, reset_timeout=30)
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(call_with_policy("t_open", breaker, factory))
+    assert len(attempts) == 2 and breaker.state == "open"
+
+
+def test_deadline_override(policy):
+    policy("t_deadline", deadline=10, retries=0)
+
+    async def factory(timeout, on_admitted):
+        await asyncio.sleep(1)
+
+    breaker = CircuitBreaker("t_deadline", failure_threshold=10, reset_timeout=30)
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(call_with_policy("t_deadline", breaker, factory, deadline=0.05))
@@ -0,0 +1,134 @@
+import asyncio
+
+import pytest
+
+from app.core.config import settings
+from app.utils import llm_scheduler as scheduler_module
+from app.utils.llm_scheduler import BACKGROUND, INTERACTIVE, LLMScheduler, TokenBucket, estimate_tokens
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(scheduler_module, "time", fake)
+    return fake
+
+
+def test_bucket_refills_continuously(clock):
+    bucket = TokenBucket(60)
+    bucket.take(60)
+    assert bucket.delay(1) == pytest.approx(1.0)
+    clock.now += 0.5
+    assert bucket.delay(1) == pytest.approx(0.5)
+    clock.now += 120
+    assert bucket.delay(60) == 0.0
+    # Never refills above capacity
+    assert bucket.level == 60
+
+
+def test_bucket_reserve_and_oversized_requests(clock):
+    bucket = TokenBucket(100)
+    bucket.take(70)
+    assert bucket.delay(10) == 0.0
+    # 30 left, 20% of capacity held back: 10 more tokens need 0 s, 15 need (15 + 20 - 30) / (100 / 60) s
+    assert bucket.delay(10, reserve=0.2) == 0.0
+    assert bucket.delay(15, reserve=0.2) == pytest.approx(5 * 60 / 100)
+    # A request larger than the whole budget waits for a full bucket rather than forever
+    assert bucket.delay(500) == pytest.approx(70 * 60 / 100)
+
+
+def test_bucket_drain_and_unlimited(clock):
+    bucket = TokenBucket(60)
+    bucket.drain()
+    assert bucket.delay(1) == pytest.approx(1.0)
+    unlimited = TokenBucket(0)
+    unlimited.take(10 ** 6)
+    unlimited.drain()
+    assert unlimited.unlimited and unlimited.delay(10 ** 6) == 0.0
+
+
+def test_concurrency_limit_and_priority_order():
+    order = []
+
+    async def call(scheduler, name, priority):
+        async with scheduler.slot(priority):
+            order.append(name)
+            await asyncio.sleep(0.01)
+
+    async def run():
+        scheduler = LLMScheduler(max_concurrency=1, rpm=0, tpm=0, background_reserve=0)
+        first = asyncio.ensure_future(call(scheduler, "first", BACKGROUND))
+        await asyncio.sleep(0)
+        waiting = [
+            asyncio.ensure_future(call(scheduler, "background-1", BACKGROUND)),
+            asyncio.ensure_future(call(scheduler, "background-2", BACKGROUND)),
+            asyncio.ensure_future(call(scheduler, "interactive", INTERACTIVE)),
+        ]
+        await asyncio.sleep(0)
+        assert scheduler.stats()["active"] == 1
+        assert scheduler.stats()["queued_background"] == 2 and scheduler.stats()["queued_interactive"] == 1
+        await asyncio.gather(first, *waiting)
+        return scheduler
+
+    scheduler = asyncio.run(run())
+    # Interactive jumps the queue; equal priorities stay FIFO
+    assert order == ["first", "interactive", "background-1", "background-2"]
+    assert scheduler.stats()["active"] == 0 and scheduler.counters["admitted"] == 4
+
+
+def test_background_reserve_keeps_headroom_for_interactive():
+    async def run():
+        scheduler = LLMScheduler(max_concurrency=10, rpm=10, tpm=0, background_reserve=0.5)
+        for _ in range(5):
+            await scheduler.acquire(INTERACTIVE)
+        background = asyncio.ensure_future(scheduler.acquire(BACKGROUND))
+        await asyncio.sleep(0.01)
+        throttled = not background.done()
+        await scheduler.acquire(INTERACTIVE)
+        background.cancel()
+        return throttled, scheduler
+
+    throttled, scheduler = asyncio.run(run())
+    assert throttled
+    assert scheduler.counters["throttled"] >= 1
+    assert scheduler.stats()["active"] == 6
+
+
+def test_cancelled_waiter_does_not_leak_a_slot():
+    async def run():
+        scheduler = LLMScheduler(max_concurrency=1, rpm=0, tpm=0, background_reserve=0)
+        await scheduler.acquire()
+        waiter = asyncio.ensure_future(scheduler.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.sleep(0)
+        scheduler.release()
+        await asyncio.wait_for(scheduler.acquire(), 1)
+        return scheduler.stats()
+
+    stats = asyncio.run(run())
+    assert stats["active"] == 1 and stats["queued_interactive"] == 0
+
+
+def test_settle_and_rate_limited_charge_the_buckets(clock):
+    scheduler = LLMScheduler(max_concurrency=1, rpm=60, tpm=1000, background_reserve=0)
+    scheduler.settle(estimated=100, actual=400)
+    assert scheduler.tokens.level == 700
+    scheduler.settle(estimated=100, actual=0)
+    assert scheduler.tokens.level == 700
+    scheduler.rate_limited()
+    assert scheduler.requests.level == 0 and scheduler.counters["rate_limited"] == 1
+
+
+def test_estimate_tokens():
+    base = settings.LLM_OUTPUT_TOKEN_ESTIMATE
+    assert estimate_tokens("x" * 400) == 100 + base
+    assert estimate_tokens(["x" * 40, b"audio"]) == 10 + settings.LLM_MEDIA_TOKEN_ESTIMATE + base
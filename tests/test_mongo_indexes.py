@@ -0,0 +1,63 @@
+"""
+Every hot query must be served by an index. Runs against the MongoDB at MONGO_URI, in a scratch
+database that is dropped afterwards; skipped when the app is not configured or no server is reachable.
+"""
+import asyncio
+
+import pytest
+from pydantic import ValidationError
+
+
+def _settings():
+    try:
+        from app.core.config import settings
+    except ValidationError as e:
+        pytest.skip(f"App settings are not configured ({e.error_count()} missing or invalid)")
+    return settings
+
+
+async def _reachable(client) -> bool:
+    from pymongo.errors import PyMongoError
+
+    try:
+        await client.admin.command("ping")
+    except PyMongoError:
+        return False
+    return True
+
+
+async def _collscans(client, database: str):
+    from app.utils import mongo
+    from app.utils.mongo_indexes import collscan_queries, ensure_indexes
+
+    saved = mongo._client, mongo._db
+    mongo._client, mongo._db = client, client[database]
+    try:
+        # Creating the indexes also creates the collections, so explain plans real scans instead of EOF
+        assert await ensure_indexes() == []
+        return await collscan_queries()
+    finally:
+        mongo._client, mongo._db = saved
+        await client.drop_database(database)
+
+
+def test_hot_queries_use_indexes():
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    settings = _settings()
+    if not settings.MONGO_URI:
+        pytest.skip("MONGO_URI is not set")
+
+    async def run():
+        client = AsyncIOMotorClient(settings.MONGO_URI, serverSelectionTimeoutMS=2000)
+        try:
+            if not await _reachable(client):
+                return None
+            return await _collscans(client, f"{settings.MONGO_DB_NAME or 'assessment'}_index_check")
+        finally:
+            client.close()
+
+    collscans = asyncio.run(run())
+    if collscans is None:
+        pytest.skip(f"No MongoDB reachable at {settings.MONGO_URI}")
+    assert collscans == []
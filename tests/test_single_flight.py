@@ -0,0 +1,81 @@
+import asyncio
+
+from app.utils.gemini import SingleFlight
+
+
+def test_concurrent_calls_share_one_call_and_get_copies():
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"questions": ["q1"]}
+
+    async def run():
+        flight = SingleFlight()
+        return flight, await asyncio.gather(*(flight.do("key", fetch) for _ in range(3)))
+
+    flight, results = asyncio.run(run())
+    assert len(calls) == 1
+    assert flight.stats() == {"leaders": 1, "coalesced": 2, "inflight": 0}
+    assert all(result == {"questions": ["q1"]} for result in results)
+    # Followers get deep copies, so mutating one result never changes another
+    results[1]["questions"].append("q2")
+    assert results[0] == results[2] == {"questions": ["q1"]}
+
+
+def test_finished_calls_are_not_reused():
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        return len(calls)
+
+    async def run():
+        flight = SingleFlight()
+        return [await flight.do("key", fetch), await flight.do("key", fetch)]
+
+    assert asyncio.run(run()) == [1, 2]
+
+
+def test_cancelled_caller_does_not_cancel_the_shared_call():
+    async def fetch():
+        await asyncio.sleep(0.02)
+        return "done"
+
+    async def run():
+        flight = SingleFlight()
+        leader = asyncio.ensure_future(flight.do("key", fetch))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flight.do("key", fetch))
+        await asyncio.sleep(0)
+        leader.cancel()
+        return await follower
+
+    assert asyncio.run(run()) == "done"
+
+
+def test_errors_reach_every_caller():
+    async def fetch():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def run():
+        flight = SingleFlight()
+        return await asyncio.gather(flight.do("key", fetch), flight.do("key", fetch), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert [type(result) for result in results] == [ValueError, ValueError]
+
+
+def test_keys_do_not_share():
+    async def run():
+        flight = SingleFlight()
+
+        async def fetch(value):
+            await asyncio.sleep(0.01)
+            return value
+
+        return await asyncio.gather(flight.do("a", lambda: fetch("a")), flight.do("b", lambda: fetch("b")))
+
+    assert asyncio.run(run()) == ["a", "b"]
@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+
+from app.utils.speech_metrics import (
+    FRAME_SECONDS, answer_metrics, audio_timing, frame_energy_db, key_metrics, transcript_stats, voiced_frames,
+)
+
+RATE = 16000
+
+
+def _clip(silence: float, speech: float, trailing: float) -> np.ndarray:
+    """Silence, then a 0.5 amplitude tone, then silence again."""
+    tone = 0.5 * np.sin(2 * np.pi * 220 * np.arange(int(speech * RATE)) / RATE)
+    return np.concatenate([np.zeros(int(silence * RATE)), tone, np.zeros(int(trailing * RATE))]).astype(np.float32)
+
+
+def test_frame_energy_db():
+    frame = int(RATE * FRAME_SECONDS)
+    samples = np.concatenate([np.full(frame, 0.5), np.zeros(frame), np.zeros(frame // 2)]).astype(np.float32)
+    energy = frame_energy_db(samples, RATE)
+    # Only whole frames count; a constant 0.5 signal is -6 dBFS, silence sits at the -200 dB floor
+    assert energy.shape == (2,)
+    assert energy[0] == pytest.approx(20 * np.log10(0.5))
+    assert energy[1] == pytest.approx(-200)
+    assert frame_energy_db(np.zeros(10, dtype=np.float32), RATE).size == 0
+
+
+def test_voiced_frames_uses_threshold_and_relative_floor():
+    quiet = np.array([-30.0, -52.0, -65.0, -40.0])
+    assert voiced_frames(quiet, threshold_db=-60).tolist() == [True, True, False, True]
+    # Within 40 dB of the loudest frame is required as well
+    loud = np.array([-10.0, -52.0, -65.0, -30.0])
+    assert voiced_frames(loud, threshold_db=-60).tolist() == [True, False, False, True]
+    assert voiced_frames(np.zeros(0), -45).size == 0
+
+
+def test_audio_timing():
+    timing = audio_timing(_clip(0.6, 1.5, 0.9), RATE, threshold_db=-45)
+    assert timing["duration"] == pytest.approx(3.0)
+    assert timing["first_speech"] == pytest.approx(0.6, abs=FRAME_SECONDS)
+    assert timing["speaking_time"] == pytest.approx(1.5, abs=2 * FRAME_SECONDS)
+    assert timing["voiced_time"] == pytest.approx(1.5, abs=2 * FRAME_SECONDS)
+
+
+def test_audio_timing_of_silence():
+    timing = audio_timing(np.zeros(RATE, dtype=np.float32), RATE, threshold_db=-45)
+    assert timing == {"duration": 1.0, "first_speech": None, "speaking_time": 0.0, "voiced_time": 0.0}
+
+
+def test_transcript_stats_counts_filler_words_and_phrases():
+    stats = transcript_stats("Um, I mean it's, like, uh, kind of a basic API. You know?")
+    assert stats == {"words": 13, "filler_words": 6}
+    assert transcript_stats("") == transcript_stats(None) == {"words": 0, "filler_words": 0}
+
+
+def test_answer_metrics_with_and_without_timing():
+    text = "one two three four five six seven eight nine ten"
+    timing = {"duration": 6.004, "first_speech": 1.234, "speaking_time": 4.0, "voiced_time": 3.5}
+    assert answer_metrics(text, timing) == {
+        "duration": 6.0, "response_time": 1.23, "speaking_time": 4.0, "speech_rate": 150,
+        "words": 10, "filler_words": 0,
+    }
+    assert answer_metrics(text, None) == {
+        "duration": None, "response_time": None, "speaking_time": None, "speech_rate": None,
+        "words": 10, "filler_words": 0,
+    }
+
+
+def test_key_metrics_aggregates_answers():
+    answers = [
+        {"duration": 10, "response_time": 1.2, "speaking_time": 8.0, "speech_rate": 120, "words": 16, "filler_words": 2},
+        {"duration": 20, "response_time": 2.9, "speaking_time": 16.0, "speech_rate": 150, "words": 40, "filler_words": 1},
+        # Undecodable clip: only the transcript counts
+        {"duration": None, "response_time": None, "speaking_time": None, "speech_rate": None, "words": 30, "filler_words": 4},
+    ]
+    # Mean response time 2.05 s, (16 + 40) words over 24 speaking seconds = 140 wpm
+    assert key_metrics(answers) == {"response_time": 2, "filler_words": 7, "speech_rate": 140}
+
+
+def test_key_metrics_without_timing():
+    answers = [{"duration": None, "response_time": None, "speaking_time": None, "speech_rate": None,
+                "words": 5, "filler_words": 1}]
+    assert key_metrics(answers) == {"response_time": None, "filler_words": 1, "speech_rate": None}
@@ -0,0 +1,102 @@
+import asyncio
+import io
+
+import httpx
+import pytest
+from fastapi import FastAPI, File, UploadFile
+from starlette.datastructures import UploadFile as StarletteUploadFile
+
+from app.core.config import settings
+from app.utils.uploads import (
+    FORM_OVERHEAD, UploadLimitMiddleware, UploadTooLarge, body_limit, spool_upload, upload_too_large_handler,
+)
+
+LIMIT = 1000
+
+
+@pytest.fixture
+def app(monkeypatch):
+    monkeypatch.setattr(settings, "AUDIO_MAX_BYTES", LIMIT)
+    monkeypatch.setattr(settings, "UPLOAD_MAX_REQUEST_BYTES", FORM_OVERHEAD // 2)
+    app = FastAPI()
+    app.state.calls = 0
+
+    @app.post("/audio")
+    @body_limit("AUDIO_MAX_BYTES")
+    async def audio(recording: UploadFile = File(...)):
+        app.state.calls += 1
+        return {"size": len(await recording.read())}
+
+    @app.post("/other")
+    async def other(file: UploadFile = File(...)):
+        app.state.calls += 1
+        return {"size": len(await file.read())}
+
+    app.add_middleware(UploadLimitMiddleware)
+    app.add_exception_handler(UploadTooLarge, upload_too_large_handler)
+    return app
+
+
+def _post(app, path, **kwargs):
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            return await client.post(path, **kwargs)
+    return asyncio.run(run())
+
+
+def _multipart(field: str, size: int):
+    """A multipart body and its content type, for sending without httpx's own encoding."""
+    request = httpx.Request("POST", "http://test", files={field: ("a.webm", b"x" * size, "audio/webm")})
+    return request.read(), request.headers["content-type"]
+
+
+def _chunked(body: bytes, chunk: int = 16 * 1024):
+    async def stream():
+        for start in range(0, len(body), chunk):
+            yield body[start:start + chunk]
+    return stream()
+
+
+def test_declared_length_over_the_route_limit_is_rejected_unread(app):
+    body, content_type = _multipart("recording", LIMIT + FORM_OVERHEAD)
+    response = _post(app, "/audio", content=body, headers={"content-type": content_type})
+    assert response.status_code == 413
+    assert response.json()["status"] is False
+    assert app.state.calls == 0
+
+
+def test_chunked_body_is_counted_as_it_streams(app):
+    body, content_type = _multipart("recording", LIMIT + FORM_OVERHEAD)
+    response = _post(app, "/audio", content=_chunked(body), headers={"content-type": content_type})
+    assert "content-length" not in response.request.headers
+    assert response.status_code == 413
+    assert app.state.calls == 0
+
+
+def test_chunked_body_under_the_limit_passes(app):
+    body, content_type = _multipart("recording", LIMIT)
+    response = _post(app, "/audio", content=_chunked(body, 100), headers={"content-type": content_type})
+    assert response.status_code == 200 and response.json() == {"size": LIMIT}
+
+
+def test_unmarked_routes_use_the_request_limit(app):
+    body, content_type = _multipart("file", FORM_OVERHEAD // 2)
+    assert _post(app, "/other", content=body, headers={"content-type": content_type}).status_code == 413
+    body, content_type = _multipart("file", LIMIT + 10)
+    assert _post(app, "/other", content=body, headers={"content-type": content_type}).status_code == 200
+
+
+def test_spool_upload_takes_over_the_file_and_checks_its_size():
+    async def run(size, max_bytes):
+        file = io.BytesIO(b"x" * size)
+        upload = StarletteUploadFile(file, filename="a.webm")
+        spooled = await spool_upload(upload, max_bytes)
+        return file, upload, spooled
+
+    file, upload, spooled = asyncio.run(run(10, 10))
+    assert spooled.file is file and spooled.size == 10 and spooled.filename == "a.webm"
+    # Closing the request's form no longer closes the file the caller now owns
+    assert upload.file is not file
+    assert asyncio.run(spooled.read()) == b"x" * 10
+    with pytest.raises(UploadTooLarge):
+        asyncio.run(run(11, 10))